@@ -0,0 +1,163 @@
+"""
+Append-only audit journal for Risk Analytics Platform
+One JSON line per run in journal.jsonl. Large payloads (config, result dicts)
+are stored once under objects/ by SHA256 of their canonical JSON and referenced
+as {"$blob": "<hash>"}, so identical configs are not duplicated. A SQLite sidecar
+index maps run_time / git_commit to the line's byte offset for O(1) lookups.
+
+    <audit_dir>/journal.jsonl
+    <audit_dir>/objects/<hh>/<hash>.json
+    <audit_dir>/index.sqlite
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import pandas as pd
+
+
+JOURNAL_NAME = "journal.jsonl"
+INDEX_NAME = "index.sqlite"
+BLOB_KEY = "$blob"
+
+
+def _canonical(value) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _blob_path(audit_dir: Path, digest: str) -> Path:
+    return Path(audit_dir) / "objects" / digest[:2] / f"{digest}.json"
+
+
+def put_blob(audit_dir: Path, value) -> str:
+    """Store a payload by content hash (no-op if already present); returns the hash."""
+    data = _canonical(value)
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(audit_dir, digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return digest
+
+
+def get_blob(audit_dir: Path, digest: str):
+    """Load a payload stored with put_blob."""
+    with open(_blob_path(audit_dir, digest), "rb") as f:
+        return json.loads(f.read())
+
+
+def _connect(audit_dir: Path) -> "sqlite3.Connection":
+    import sqlite3
+    conn = sqlite3.connect(Path(audit_dir) / INDEX_NAME)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_time TEXT NOT NULL,
+            git_commit TEXT,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_run_time ON runs(run_time)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_git_commit ON runs(git_commit)")
+    return conn
+
+
+def append_run(audit_dict: Dict[str, Any], audit_dir: Path, blob_min_bytes: int = 256) -> int:
+    """
+    Append one run record to the journal and index it.
+    Top-level dict/list values whose JSON is at least blob_min_bytes are moved to
+    content-addressed blobs. Returns the run_id.
+    """
+    audit_dir = Path(audit_dir)
+    audit_dir.mkdir(parents=True, exist_ok=True)
+
+    record = {}
+    for key, value in audit_dict.items():
+        if isinstance(value, (dict, list)) and len(_canonical(value)) >= blob_min_bytes:
+            record[key] = {BLOB_KEY: put_blob(audit_dir, value)}
+        else:
+            record[key] = value
+
+    line = json.dumps(record, default=str).encode("utf-8") + b"\n"
+    with open(audit_dir / JOURNAL_NAME, "ab") as f:
+        offset = f.seek(0, os.SEEK_END)
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+    conn = _connect(audit_dir)
+    try:
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO runs (run_time, git_commit, offset, length) VALUES (?, ?, ?, ?)",
+                (str(audit_dict.get("run_time")), audit_dict.get("git_commit"), offset, len(line)),
+            )
+        return int(cur.lastrowid)
+    finally:
+        conn.close()
+
+
+def _resolve(audit_dir: Path, record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        k: get_blob(audit_dir, v[BLOB_KEY]) if isinstance(v, dict) and set(v) == {BLOB_KEY} else v
+        for k, v in record.items()
+    }
+
+
+def load_run(
+    audit_dir: Path,
+    run_id: Optional[int] = None,
+    run_time: Optional[str] = None,
+    git_commit: Optional[str] = None,
+    resolve: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    Load one run by run_id, run_time or git_commit (latest run for that commit);
+    with no key, the latest run. Blob references are resolved unless resolve=False.
+    """
+    audit_dir = Path(audit_dir)
+    if not (audit_dir / INDEX_NAME).exists():
+        return None
+
+    if run_id is not None:
+        where, params = "run_id = ?", (run_id,)
+    elif run_time is not None:
+        where, params = "run_time = ?", (run_time,)
+    elif git_commit is not None:
+        where, params = "git_commit = ?", (git_commit,)
+    else:
+        where, params = "1 = 1", ()
+
+    conn = _connect(audit_dir)
+    try:
+        row = conn.execute(
+            f"SELECT offset, length FROM runs WHERE {where} ORDER BY run_id DESC LIMIT 1", params
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+
+    with open(audit_dir / JOURNAL_NAME, "rb") as f:
+        f.seek(row[0])
+        record = json.loads(f.read(row[1]))
+    return _resolve(audit_dir, record) if resolve else record
+
+
+def list_runs(audit_dir: Path) -> pd.DataFrame:
+    """Index of all journaled runs (run_id, run_time, git_commit)."""
+    audit_dir = Path(audit_dir)
+    if not (audit_dir / INDEX_NAME).exists():
+        return pd.DataFrame(columns=["run_id", "run_time", "git_commit"])
+    conn = _connect(audit_dir)
+    try:
+        return pd.read_sql_query("SELECT run_id, run_time, git_commit FROM runs ORDER BY run_id", conn)
+    finally:
+        conn.close()
@@ -0,0 +1,272 @@
+"""
+Multi-book batch runner for Risk Analytics Platform
+Runs the main pipeline for many books in one invocation. The shared instruments
+table is read once and placed in shared memory; each book runs in a worker process
+that attaches it read-only (a book overriding data.instruments_file reads its own).
+Writes per-book outputs plus a firm-level summary.
+
+    python batch.py configs/books/*.yaml [--base configs/risk_config.yaml] [--workers 4]
+"""
+
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root / "src"))
+
+import argparse
+import copy
+import logging
+import os
+import time
+import traceback
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+from risk_analytics.utils import load_config, ensure_dirs
+from risk_analytics.risk_models import calculate_var_es, calculate_performance
+from risk_analytics.scenario_executor import export_snapshot, attach_snapshot
+from risk_analytics.reporting import save_firm_summary
+from risk_analytics.main import load_book_data, run_pipeline
+from risk_analytics.stress import clear_factor_cache
+
+
+logger = logging.getLogger("risk_analytics.batch")
+
+# Per-process shared instruments table (and the file it was read from), attached by _init_worker
+_SHARED: Dict[str, Any] = {}
+
+
+def _merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge override into a copy of base (dicts merge, other values replace)."""
+    merged = copy.deepcopy(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def load_book_configs(base_config: Dict[str, Any], book_config_paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Book configs are partial YAML files merged over the base config. The book name
+    is config["book"], defaulting to the file stem; names must be unique.
+    """
+    configs, seen = [], set()
+    for path in book_config_paths:
+        override = load_config(str(path)) or {}
+        config = _merge(base_config, override)
+        config["book"] = str(override.get("book") or Path(path).stem)
+        if config["book"] in seen:
+            raise ValueError(f"Duplicate book name '{config['book']}' ({path})")
+        seen.add(config["book"])
+        # Books that do not choose an output directory write under <output_dir>/books/<book>
+        if "output_dir" not in (override.get("reporting") or {}):
+            config["reporting"]["output_dir"] = str(
+                Path(base_config["reporting"]["output_dir"]) / "books" / config["book"]
+            )
+        configs.append(config)
+    return configs
+
+
+def _limit_inner_workers(config: Dict[str, Any], inner_workers: int) -> Dict[str, Any]:
+    """Cap per-book scenario/render pools so books x workers does not oversubscribe the host."""
+    config = copy.deepcopy(config)
+    execution = config.get("execution") or {}
+    config["execution"] = execution
+    # Only cap a scenario pool the book opted into; unset stays serial
+    if execution.get("max_workers"):
+        execution["max_workers"] = min(execution["max_workers"], inner_workers)
+    reporting = config["reporting"]
+    reporting["render_workers"] = min(reporting.get("render_workers", 2), inner_workers)
+    return config
+
+
+# ---------------------------------
+# Worker
+# ---------------------------------
+def _init_worker(shm_name, spec, instruments_file):
+    """Process-pool initializer: attach the shared instruments table once per worker."""
+    from multiprocessing import shared_memory
+    # Workers share the parent's resource tracker; the parent unlinks the block
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _SHARED.update({"instruments": attach_snapshot(shm, spec), "instruments_file": instruments_file, "shm": shm})
+
+
+def _run_book(config: Dict[str, Any], root: str) -> Dict[str, Any]:
+    """Run the pipeline for one book; failures are returned rather than raised."""
+    started = time.perf_counter()
+    book = config["book"]
+    # Books share the interpreter in serial runs and reused pool workers:
+    # never let one book's cached factor covariance serve the next
+    clear_factor_cache()
+    try:
+        root = Path(root)
+        # A book overriding data.instruments_file reads its own table instead of the shared one
+        shared = config["data"]["instruments_file"] == _SHARED.get("instruments_file")
+        df, input_files = load_book_data(config, root, instruments=_SHARED.get("instruments") if shared else None)
+        summary = run_pipeline(df, config, root / config["reporting"]["output_dir"], input_files)
+        summary["status"] = "ok"
+    except Exception as e:
+        logger.error(f"Book '{book}' failed: {e}", exc_info=True)
+        summary = {"book": book, "status": "failed", "error": f"{type(e).__name__}: {e}",
+                   "traceback": traceback.format_exc()}
+    summary["elapsed_seconds"] = time.perf_counter() - started
+    return summary
+
+
+# ---------------------------------
+# Firm-Level Aggregation
+# ---------------------------------
+def firm_summary(summaries: List[Dict[str, Any]], var_levels, risk_free_rate: float = 0.0):
+    """
+    Combine per-book results.
+
+    Returns:
+        (book_summary, firm, firm_daily_pnl): one row per book; firm-level NAV,
+        daily-P&L VaR/ES and performance with the diversification benefit versus
+        the sum of standalone book VaR/ES; date x book daily P&L with a FIRM column
+    """
+    rows, pnl = [], {}
+    for s in summaries:
+        row = {"book": s["book"], "status": s["status"], "elapsed_seconds": s.get("elapsed_seconds")}
+        if s["status"] == "ok":
+            pnl[s["book"]] = s["daily_pnl"]
+            row.update({
+                "initial_nav": s["initial_nav"],
+                "latest_nav": s["latest_nav"],
+                "total_return": s["total_return"],
+                **{f"trade_{k}": v for k, v in s["var_results"].items() if not k.endswith("_pctNAV")},
+                **calculate_var_es(s["daily_pnl"], levels=var_levels),
+                **s["performance"],
+                "output_dir": s["output_dir"],
+            })
+        else:
+            row["error"] = s.get("error")
+        rows.append(row)
+    book_summary = pd.DataFrame(rows)
+
+    if not pnl:
+        return book_summary, {"books": len(summaries), "books_ok": 0}, pd.DataFrame()
+
+    firm_daily_pnl = pd.DataFrame(pnl).sort_index().fillna(0.0)
+    firm_daily_pnl.index.name = "date"
+    firm_daily_pnl["FIRM"] = firm_daily_pnl.sum(axis=1)
+
+    ok = book_summary[book_summary["status"] == "ok"]
+    initial_nav = float(ok["initial_nav"].sum())
+    firm_nav = initial_nav + firm_daily_pnl["FIRM"].cumsum()
+    firm_var = calculate_var_es(firm_daily_pnl["FIRM"], levels=var_levels)
+
+    firm = {
+        "books": len(summaries),
+        "books_ok": int(len(ok)),
+        "books_failed": sorted(book_summary.loc[book_summary["status"] != "ok", "book"]),
+        "initial_nav": initial_nav,
+        "latest_nav": float(firm_nav.iloc[-1]),
+        "total_return": float((firm_nav.iloc[-1] - initial_nav) / initial_nav) if initial_nav else None,
+        **firm_var,
+        "performance": calculate_performance(firm_nav, risk_free_rate=risk_free_rate),
+    }
+    # Diversification: standalone book VaR/ES summed vs firm VaR/ES (both on daily P&L)
+    for key, value in firm_var.items():
+        if value is not None and key in ok.columns:
+            standalone = float(ok[key].sum())
+            firm[f"{key}_sum_of_books"] = standalone
+            firm[f"{key}_diversification"] = standalone - value
+    return book_summary, firm, firm_daily_pnl
+
+
+# ---------------------------------
+# Batch Entry Point
+# ---------------------------------
+def run_batch(
+    book_config_paths: List[str],
+    base_config_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    root: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    Run the pipeline for several books and write the firm summary.
+
+    Args:
+        book_config_paths: partial YAML configs, one per book
+        base_config_path: shared config (default <root>/configs/risk_config.yaml)
+        max_workers: concurrent books (default batch.max_workers or CPU count)
+        root: project root data/output paths are relative to
+
+    Returns:
+        Firm summary dictionary
+    """
+    root = Path(root or project_root)
+    base_config_path = base_config_path or root / "configs" / "risk_config.yaml"
+    base_config = load_config(str(base_config_path))
+    configs = load_book_configs(base_config, book_config_paths)
+    if not configs:
+        raise ValueError("No book configs given")
+
+    cpus = os.cpu_count() or 1
+    if max_workers is None:
+        max_workers = (base_config.get("batch", {}) or {}).get("max_workers", cpus)
+    workers = max(1, min(int(max_workers), len(configs)))
+    configs = [_limit_inner_workers(c, max(1, cpus // workers)) for c in configs]
+
+    # Shared reference data: read once, shared read-only with every worker
+    instruments_file = base_config["data"]["instruments_file"]
+    instruments = pd.read_csv(root / instruments_file)
+    logger.info(f"Running {len(configs)} books on {workers} workers "
+                f"(shared instruments {instruments.shape})")
+
+    started = time.perf_counter()
+    if workers <= 1:
+        _SHARED.update({"instruments": instruments, "instruments_file": instruments_file})
+        try:
+            summaries = [_run_book(c, str(root)) for c in configs]
+        finally:
+            _SHARED.clear()
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        shm, spec = export_snapshot(instruments)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shm.name, spec, instruments_file)) as pool:
+                summaries = list(pool.map(_run_book, configs, [str(root)] * len(configs)))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    book_summary, firm, firm_daily_pnl = firm_summary(
+        summaries,
+        base_config["risk"]["var_levels"],
+        risk_free_rate=base_config["performance"]["risk_free_rate"],
+    )
+    firm["elapsed_seconds"] = time.perf_counter() - started
+    firm_dir = root / base_config["reporting"]["output_dir"] / "firm"
+    ensure_dirs(firm_dir)
+    save_firm_summary(book_summary, firm, firm_daily_pnl, firm_dir)
+
+    logger.info("=" * 80)
+    logger.info(f"Batch completed: {firm['books_ok']}/{firm['books']} books in {firm['elapsed_seconds']:.1f}s")
+    if firm.get("books_failed"):
+        logger.warning(f"Failed books: {firm['books_failed']}")
+    logger.info(f"Firm summary saved to: {firm_dir}")
+    logger.info("=" * 80)
+    return firm
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the risk pipeline for several books")
+    parser.add_argument("book_configs", nargs="+", help="Per-book YAML configs (merged over the base config)")
+    parser.add_argument("--base", default=None, help="Base config (default configs/risk_config.yaml)")
+    parser.add_argument("--workers", type=int, default=None, help="Books run concurrently")
+    args = parser.parse_args(argv)
+
+    firm = run_batch(args.book_configs, args.base, args.workers)
+    return 0 if firm.get("books_ok", 0) == firm.get("books", 0) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Startup-time benchmark for Risk Analytics Platform
+Imports the CLI and worker entry modules in fresh interpreters with
+`python -X importtime`, reports the slowest imports and fails when the median
+cold-start import time exceeds the budget or a deferred module is imported eagerly.
+
+    python bench_startup.py --budget-ms 900 --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+# Modules the CLI and its workers import at start-up
+DEFAULT_MODULES = ("risk_analytics.main", "risk_analytics.scenario_executor")
+
+# Modules that must only be imported on first use
+DEFERRED_MODULES = ("matplotlib", "yaml", "sqlite3", "concurrent.futures.process", "multiprocessing.shared_memory")
+
+# The package lives in <src>/risk_analytics, so <src> goes on PYTHONPATH
+PACKAGE_PARENT = Path(__file__).resolve().parents[1]
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Parse `-X importtime` output into rows of module, self_us, cumulative_us and
+    depth (nesting level, 0 for top-level imports).
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append({
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            })
+        except ValueError:
+            continue
+    return rows
+
+
+def measure_import(module: str, python: Optional[str] = None) -> Dict[str, Any]:
+    """Import one module in a fresh interpreter and return its import-time breakdown."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(PACKAGE_PARENT), env.get("PYTHONPATH")) if p)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = parse_importtime(proc.stderr)
+    total_us = sum(r["cumulative_us"] for r in rows if r["depth"] == 0)
+    return {
+        "module": module,
+        "total_ms": total_us / 1000.0,
+        "imported": {r["module"] for r in rows},
+        "rows": rows,
+    }
+
+
+def benchmark(module: str, runs: int = 5, python: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Median cold-start import time of a module over several runs, plus the
+    slowest imports (by self time) of the median run.
+    """
+    samples = [measure_import(module, python) for _ in range(max(runs, 1))]
+    samples.sort(key=lambda s: s["total_ms"])
+    median = samples[len(samples) // 2]
+    return {
+        "module": module,
+        "median_ms": statistics.median(s["total_ms"] for s in samples),
+        "min_ms": samples[0]["total_ms"],
+        "max_ms": samples[-1]["total_ms"],
+        "imported": median["imported"],
+        "slowest": sorted(median["rows"], key=lambda r: r["self_us"], reverse=True)[:10],
+    }
+
+
+def check_budget(
+    modules=DEFAULT_MODULES,
+    budget_ms: float = 900.0,
+    runs: int = 5,
+    deferred=DEFERRED_MODULES,
+    python: Optional[str] = None,
+) -> bool:
+    """Benchmark each module and print a report; returns True when all are within budget."""
+    ok = True
+    for module in modules:
+        result = benchmark(module, runs, python)
+        eager = sorted(m for m in deferred if m in result["imported"])
+        within = result["median_ms"] <= budget_ms and not eager
+        ok = ok and within
+
+        print(f"{'✅' if within else '❌'} {module}: median {result['median_ms']:.1f} ms "
+              f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f}, budget {budget_ms:.0f} ms)")
+        for row in result["slowest"]:
+            print(f"      {row['self_us'] / 1000:8.1f} ms self  {row['cumulative_us'] / 1000:8.1f} ms cum  {row['module']}")
+        if eager:
+            print(f"    imported at start-up but should be deferred: {', '.join(eager)}")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check cold-start import time against a budget")
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("RISK_ANALYTICS_STARTUP_BUDGET_MS", 900)))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--python", default=None, help="Interpreter to benchmark (default: current)")
+    args = parser.parse_args(argv)
+    return 0 if check_budget(args.modules, args.budget_ms, args.runs, python=args.python) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
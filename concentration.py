@@ -0,0 +1,91 @@
+"""
+Concentration metrics for portfolio analytics
+Per-date sector weights and concentration statistics (HHI, effective number of
+bets, max weight, top-5 share) over the whole history, computed from one
+date x sector matrix with vectorized row operations.
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger("risk_analytics.concentration")
+
+
+def weights_from_exposure(exposure: pd.DataFrame) -> pd.DataFrame:
+    """
+    Row-normalize a date x bucket exposure matrix by each date's total absolute
+    exposure, so weights are signed and their absolute values sum to 1.
+    Dates with no exposure are dropped.
+    """
+    if exposure.empty:
+        return exposure.copy()
+    values = exposure.to_numpy(dtype=float)
+    total = np.abs(values).sum(axis=1)
+    keep = total > 0
+    weights = values[keep] / total[keep, None]
+    return pd.DataFrame(weights, index=exposure.index[keep], columns=exposure.columns)
+
+
+def sector_weight_history(
+    df: pd.DataFrame,
+    sector_exposure: Optional[pd.DataFrame] = None,
+    sector_col: str = "sector",
+    value_col: str = "market_cap_usd",
+    date_col: str = "date",
+) -> pd.DataFrame:
+    """
+    Date x sector weights for the full history.
+    Uses the position ledger's date x sector exposure when given; otherwise one
+    pivot of value_col by date and sector from the trade frame.
+    """
+    if sector_exposure is None or sector_exposure.empty:
+        if sector_col not in df.columns or value_col not in df.columns:
+            return pd.DataFrame()
+        sector_exposure = df.pivot_table(
+            index=date_col, columns=sector_col, values=value_col, aggfunc="sum", fill_value=0.0
+        )
+    weights = weights_from_exposure(sector_exposure)
+    weights.index.name = date_col
+    weights.columns.name = sector_col
+    return weights
+
+
+def concentration_metrics(weights: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
+    """
+    Concentration statistics per date (row) of a weight matrix.
+
+    Returns:
+        DataFrame indexed like weights with hhi, effective_n (1 / HHI),
+        diversification_score ((1 - HHI) * 100), max_weight, max_weight_bucket,
+        top<top_n>_share and n_buckets (non-zero weights). Absolute weights are used.
+    """
+    columns = ["hhi", "effective_n", "diversification_score", "max_weight",
+               "max_weight_bucket", f"top{top_n}_share", "n_buckets"]
+    if weights.empty:
+        return pd.DataFrame(columns=columns, index=weights.index)
+
+    w = np.abs(weights.to_numpy(dtype=float))
+    n_cols = w.shape[1]
+    hhi = np.einsum("ij,ij->i", w, w)
+    max_pos = w.argmax(axis=1)
+    k = min(top_n, n_cols)
+    top_k = np.partition(w, n_cols - k, axis=1)[:, n_cols - k:].sum(axis=1)
+
+    with np.errstate(divide="ignore"):
+        effective_n = np.where(hhi > 0, 1.0 / hhi, np.nan)
+
+    metrics = pd.DataFrame({
+        "hhi": hhi,
+        "effective_n": effective_n,
+        "diversification_score": (1.0 - hhi) * 100.0,
+        "max_weight": w[np.arange(len(w)), max_pos],
+        "max_weight_bucket": weights.columns.to_numpy()[max_pos],
+        f"top{top_n}_share": top_k,
+        "n_buckets": (w > 0).sum(axis=1),
+    }, index=weights.index)
+    logger.info(f"Concentration metrics for {len(metrics)} dates x {n_cols} buckets")
+    return metrics
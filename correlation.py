@@ -0,0 +1,321 @@
+"""
+Correlation service for Risk Analytics Platform
+Pearson (pairwise-complete, like pandas), rank-based Spearman and Kendall tau-b
+via Knight's merge-sort algorithm (sort by x, count discordant pairs as
+inversions of y), vectorized across columns so a full matrix needs one sort per
+column instead of O(n^2) comparisons per pair. Rolling correlation over the whole
+history is built from windowed cross-product sums, either for selected pairs
+(date x pair) or as a stream of full matrices updated incrementally.
+"""
+
+import logging
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger("risk_analytics.correlation")
+
+METHODS = ("pearson", "spearman", "kendall")
+
+
+def _dense_rank(values: np.ndarray) -> np.ndarray:
+    """Dense integer ranks 0..m-1 of each column of a 2-D array (ties share a rank)."""
+    order = np.argsort(values, axis=0, kind="stable")
+    ordered = np.take_along_axis(values, order, axis=0)
+    step = np.zeros(values.shape, dtype=np.int64)
+    step[1:] = ordered[1:] != ordered[:-1]
+    ranks = np.empty(values.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, np.cumsum(step, axis=0), axis=0)
+    return ranks
+
+
+def _tie_pairs(ranks: np.ndarray) -> np.ndarray:
+    """Per column, the number of pairs sharing a value: sum of t(t-1)/2 over tie groups."""
+    n, k = ranks.shape
+    keys = (ranks + np.arange(k) * (n + 1)).ravel()
+    counts = np.bincount(keys, minlength=k * (n + 1)).reshape(k, n + 1)
+    return (counts * (counts - 1) // 2).sum(axis=1)
+
+
+def count_inversions(ranks: np.ndarray) -> np.ndarray:
+    """
+    Per column of an (n, k) integer array with values in [0, n), the number of
+    pairs p < q with ranks[p] > ranks[q].
+
+    Bottom-up merge sort over all columns at once: at each width the sorted left
+    and right halves of every block pair are merged with two searchsorted calls
+    on block-offset keys, which also count the right elements overtaking left ones.
+    """
+    n, k = ranks.shape
+    if n < 2:
+        return np.zeros(k, dtype=np.int64)
+    size = 1 << (n - 1).bit_length()
+    span = n + 1
+    # Padding with n (above every rank) at the end adds no inversions
+    merged = np.full((k, size), n, dtype=np.int64)
+    merged[:, :n] = ranks.T
+    total = np.zeros(k, dtype=np.int64)
+
+    width = 1
+    while width < size:
+        groups = size // (2 * width)
+        blocks = merged.reshape(k, groups, 2, width)
+        left, right = blocks[:, :, 0, :], blocks[:, :, 1, :]
+        group_id = np.arange(k * groups).reshape(k, groups, 1)
+        left_keys = (left + group_id * span).ravel()
+        right_keys = (right + group_id * span).ravel()
+        base = group_id * width
+
+        left_le = np.searchsorted(left_keys, right_keys, side="right").reshape(k, groups, width) - base
+        right_lt = np.searchsorted(right_keys, left_keys, side="left").reshape(k, groups, width) - base
+        total += (width - left_le).sum(axis=(1, 2))
+
+        pos = np.arange(width)
+        out = np.empty((k, groups, 2 * width), dtype=np.int64)
+        np.put_along_axis(out, pos + right_lt, left, axis=2)
+        np.put_along_axis(out, pos + left_le, right, axis=2)
+        merged = out.reshape(k, size)
+        width *= 2
+    return total
+
+
+def _kendall_against(x_rank: np.ndarray, y_ranks: np.ndarray, n_pairs: int,
+                     x_ties: int, y_ties: np.ndarray) -> np.ndarray:
+    """Kendall tau-b of one ranked column against each column of y_ranks."""
+    n = len(x_rank)
+    order = np.argsort(x_rank, kind="stable")
+    y_sorted = y_ranks[order]
+    discordant = count_inversions(y_sorted)
+    joint_ties = np.zeros(y_ranks.shape[1], dtype=np.int64)
+    if x_ties:
+        # Pairs tied in x were counted as inversions when y disagrees; remove them
+        composite = _dense_rank(x_rank[order][:, None] * (n + 1) + y_sorted)
+        discordant = discordant - count_inversions(composite)
+        joint_ties = _tie_pairs(composite)
+    numerator = n_pairs - x_ties - y_ties + joint_ties - 2 * discordant
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return numerator / np.sqrt((n_pairs - x_ties) * (n_pairs - y_ties).astype(float))
+
+
+def kendall_tau(x: Sequence[float], y: Sequence[float]) -> float:
+    """Kendall tau-b of two series in O(n log n); pairs with a missing value are dropped."""
+    values = np.column_stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)])
+    values = values[~np.isnan(values).any(axis=1)]
+    n = len(values)
+    if n < 2:
+        return np.nan
+    ranks = _dense_rank(values)
+    ties = _tie_pairs(ranks)
+    return float(_kendall_against(ranks[:, 0], ranks[:, 1:], n * (n - 1) // 2, ties[0], ties[1:])[0])
+
+
+def kendall_matrix(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Kendall tau-b matrix over pairwise-complete rows (as DataFrame.corr and
+    pearson_matrix). For each column, every later column observed wherever it
+    is shares one stable sort and one vectorized merge-count; pairs whose
+    missing values differ fall back to kendall_tau on their common rows.
+    """
+    values = frame.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    k = values.shape[1]
+    result = np.full((k, k), np.nan)
+    for i in range(k):
+        rows = valid[:, i]
+        later = np.arange(i, k)
+        complete = valid[rows][:, later].all(axis=0)
+        batch = later[complete]
+        n = int(rows.sum())
+        if n >= 2:
+            ranks = _dense_rank(values[rows][:, batch])
+            ties = _tie_pairs(ranks)
+            tau = _kendall_against(ranks[:, 0], ranks, n * (n - 1) // 2, ties[0], ties)
+            result[i, batch] = tau
+            result[batch, i] = tau
+        for j in later[~complete]:
+            result[i, j] = result[j, i] = kendall_tau(values[:, i], values[:, j])
+    return pd.DataFrame(result, index=frame.columns, columns=frame.columns)
+
+
+def pearson_matrix(frame: pd.DataFrame, min_periods: int = 2) -> pd.DataFrame:
+    """
+    Pearson matrix over pairwise-complete observations (as DataFrame.corr), from
+    masked cross-product matrices instead of a loop over pairs.
+    """
+    values = frame.to_numpy(dtype=float)
+    mask = ~np.isnan(values)
+    # Centering first keeps the sums of squares well conditioned
+    centered = np.where(mask, values - np.nanmean(values, axis=0), 0.0) if len(values) else values
+    m = mask.astype(float)
+    n = m.T @ m
+    sx = centered.T @ m
+    sxx = (centered * centered).T @ m
+    sxy = centered.T @ centered
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sxy - sx * sx.T
+        corr = cov / np.sqrt((n * sxx - sx * sx) * (n * sxx - sx * sx).T)
+    corr = np.clip(corr, -1.0, 1.0)
+    corr[n < min_periods] = np.nan
+    return pd.DataFrame(corr, index=frame.columns, columns=frame.columns)
+
+
+def spearman_matrix(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Spearman matrix over pairwise-complete rows (as DataFrame.corr): Pearson on
+    average ranks. Columns are ranked once over their own observations, which
+    is exact for pairs observed on the same rows; pairs whose missing values
+    differ are re-ranked on their common rows.
+    """
+    corr = pearson_matrix(frame.rank(method="average")).to_numpy(copy=True)
+    m = (~np.isnan(frame.to_numpy(dtype=float))).astype(float)
+    n = m.T @ m
+    counts = np.diag(n)
+    differs = (n != counts[:, None]) | (n != counts[None, :])
+    for i, j in zip(*np.nonzero(np.triu(differs, 1))):
+        common = frame.iloc[:, [i, j]].dropna()
+        corr[i, j] = corr[j, i] = pearson_matrix(common.rank(method="average")).iat[0, 1]
+    return pd.DataFrame(corr, index=frame.columns, columns=frame.columns)
+
+
+def correlation_matrix(frame: pd.DataFrame, method: str = "pearson") -> pd.DataFrame:
+    """Correlation matrix of frame's columns by method (pearson / spearman / kendall)."""
+    method = method.lower()
+    if method == "pearson":
+        return pearson_matrix(frame)
+    if method == "spearman":
+        return spearman_matrix(frame)
+    if method == "kendall":
+        return kendall_matrix(frame)
+    raise ValueError(f"Unknown correlation method '{method}' (expected one of {', '.join(METHODS)})")
+
+
+def top_pairs(corr: pd.DataFrame, n: int = 5) -> pd.DataFrame:
+    """The n off-diagonal pairs with the largest absolute correlation (row, column, value)."""
+    values = corr.to_numpy(dtype=float)
+    rows, cols = np.triu_indices(len(values), k=1)
+    pair_values = values[rows, cols]
+    strength = np.nan_to_num(np.abs(pair_values), nan=-1.0)
+    n = min(n, len(pair_values))
+    if n == 0:
+        return pd.DataFrame(columns=["row", "column", "value"])
+    pick = np.argpartition(-strength, n - 1)[:n]
+    pick = pick[np.argsort(-strength[pick], kind="stable")]
+    return pd.DataFrame({
+        "row": corr.index.to_numpy()[rows[pick]],
+        "column": corr.columns.to_numpy()[cols[pick]],
+        "value": pair_values[pick],
+    })
+
+
+def _centered(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Values minus their column mean over the masked entries, zero where masked out."""
+    count = mask.sum(axis=0)
+    mean = np.where(mask, values, 0.0).sum(axis=0) / np.maximum(count, 1)
+    return np.where(mask, values - mean, 0.0)
+
+
+def _window_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sums over window rows (fewer at the start) via one cumulative sum."""
+    cum = np.cumsum(values, axis=0)
+    out = cum.copy()
+    out[window:] -= cum[:-window]
+    return out
+
+
+def rolling_correlation(
+    frame: pd.DataFrame,
+    window: int,
+    pairs: Optional[List[Tuple[str, str]]] = None,
+    min_periods: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Rolling Pearson correlation through the whole history for the given column
+    pairs (default: every pair), as a date x pair frame with (row, column)
+    MultiIndex columns. Matches frame[a].rolling(window).corr(frame[b]).
+
+    Windowed sums come from cumulative sums taken block by block, each block
+    re-centered on its own mean, so level series (e.g. VaR) with long histories
+    do not lose precision to cancellation in the running totals.
+
+    For full matrices at instrument scale use iter_rolling_correlation, which
+    streams them instead of materializing every pair.
+    """
+    columns = list(frame.columns)
+    if pairs is None:
+        rows, cols = np.triu_indices(len(columns), k=1)
+        pairs = [(columns[i], columns[j]) for i, j in zip(rows, cols)]
+    min_periods = window if min_periods is None else min_periods
+    index = pd.MultiIndex.from_tuples(pairs, names=["row", "column"])
+    if not pairs:
+        return pd.DataFrame(index=frame.index, columns=index, dtype=float)
+
+    position = {c: i for i, c in enumerate(columns)}
+    values = frame.to_numpy(dtype=float)
+    x_all = values[:, [position[a] for a, _ in pairs]]
+    y_all = values[:, [position[b] for _, b in pairs]]
+    mask_all = ~(np.isnan(x_all) | np.isnan(y_all))
+
+    n_rows = len(values)
+    corr = np.full(x_all.shape, np.nan)
+    block = max(window, 256)
+    for start in range(0, n_rows, block):
+        # Rows [start, stop) need their trailing windows, which begin at lo
+        lo, stop = max(0, start - window + 1), min(n_rows, start + block)
+        mask = mask_all[lo:stop]
+        x, y = _centered(x_all[lo:stop], mask), _centered(y_all[lo:stop], mask)
+        n = _window_sum(mask.astype(float), window)
+        sx, sy = _window_sum(x, window), _window_sum(y, window)
+        sxx, syy, sxy = _window_sum(x * x, window), _window_sum(y * y, window), _window_sum(x * y, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            part = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+        part[n < min_periods] = np.nan
+        corr[start:stop] = part[start - lo:]
+    corr = np.clip(corr, -1.0, 1.0)
+    return pd.DataFrame(corr, index=frame.index, columns=index)
+
+
+def iter_rolling_correlation(
+    frame: pd.DataFrame,
+    window: int,
+    min_periods: Optional[int] = None,
+) -> Iterator[Tuple[object, np.ndarray]]:
+    """
+    Yield (date, k x k Pearson matrix) for each row once min_periods complete
+    observations are in the window. Cross-product sums are updated with the
+    entering and leaving rows (O(k^2) per step), so memory stays O(k^2)
+    regardless of history length. Every `window` steps the sums are rebuilt
+    from the rows in the window, re-centered on their mean, so rounding error
+    does not accumulate over long histories.
+    """
+    min_periods = window if min_periods is None else min_periods
+    values = frame.to_numpy(dtype=float)
+    mask = ~np.isnan(values)
+    m = mask.astype(float)
+    k = values.shape[1]
+    first = slice(0, window)
+    center = np.where(mask[first], values[first], 0.0).sum(axis=0) / np.maximum(m[first].sum(axis=0), 1)
+
+    n, sx, sxx, sxy = (np.zeros((k, k)) for _ in range(4))
+    for t, date in enumerate(frame.index):
+        if t and t % window == 0:
+            rows = slice(t - window, t)
+            center = np.where(mask[rows], values[rows], 0.0).sum(axis=0) / np.maximum(m[rows].sum(axis=0), 1)
+            v, w = np.where(mask[rows], values[rows] - center, 0.0), m[rows]
+            n, sx, sxx, sxy = w.T @ w, v.T @ w, (v * v).T @ w, v.T @ v
+        for row, sign in ((t, 1.0), (t - window, -1.0)):
+            if row < 0:
+                continue
+            v, w = np.where(mask[row], values[row] - center, 0.0), m[row]
+            n += sign * np.outer(w, w)
+            sx += sign * np.outer(v, w)
+            sxx += sign * np.outer(v * v, w)
+            sxy += sign * np.outer(v, v)
+        if t + 1 < min_periods:
+            continue
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = (n * sxy - sx * sx.T) / np.sqrt((n * sxx - sx * sx) * (n * sxx - sx * sx).T)
+        corr = np.clip(corr, -1.0, 1.0)
+        corr[n < min_periods] = np.nan
+        yield date, corr
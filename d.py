@@ -3,11 +3,37 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import numpy as np
 import os
+import sys
+import glob
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional, Dict, List
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+try:
+    from risk_analytics.dashboard_bundle import open_bundle
+except ImportError:  # pyarrow missing: fall back to the per-table CSVs
+    open_bundle = None
+from risk_analytics.correlation import correlation_matrix, rolling_correlation, top_pairs
+from risk_analytics.downsample import downsample_frame
+from risk_analytics.risk_models import var_es_matrix
+from risk_analytics.limits import load_rules, evaluate_limits
+from risk_analytics.event_store import record_event, query_events, count_events, distinct_values, stored_limits
+
+# Parsed artifacts are shared across sessions. pandas >= 3 is always copy-on-write,
+# so a shallow copy per session is enough; older pandas gets a deep copy instead
+# of changing pandas semantics process-wide
+SHARED_FRAMES_COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
+
+
+def session_copy(df: pd.DataFrame) -> pd.DataFrame:
+    """A session's own view of a shared cached frame; writes never reach the cache."""
+    return df.copy(deep=not SHARED_FRAMES_COPY_ON_WRITE)
+
 # ============================================================================
 # CONFIGURATION & CONSTANTS
 # ============================================================================
@@ -469,17 +495,90 @@ st.markdown("""
 # DATA LOADING FUNCTIONS
 # ============================================================================
 
-@st.cache_data(ttl=300)
-def load_csv_safe(path: str) -> pd.DataFrame:
+def _file_signature(path: str):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
     try:
-        if not os.path.exists(path):
-            return pd.DataFrame()
-        df = pd.read_csv(path)
-        df.columns = df.columns.str.strip()
-        df = df.drop_duplicates()
-        return df
-    except:
-        return pd.DataFrame()
+        st_ = os.stat(path)
+    except OSError:
+        return None
+    return (st_.st_mtime_ns, st_.st_size)
+
+
+def _parse_csv(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip()
+    return df.drop_duplicates()
+
+
+class ArtifactStore:
+    """
+    Process-wide cache of parsed dashboard artifacts keyed by file (mtime, size).
+    Each artifact is parsed once per change and shared read-only by all sessions;
+    a file that has not changed costs one stat per rerun.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._entries: Dict[str, tuple] = {}
+
+    def _path_lock(self, path: str) -> threading.Lock:
+        # One lock per file: different artifacts parse concurrently, the same one once
+        with self._lock:
+            return self._path_locks.setdefault(path, threading.Lock())
+
+    def get(self, path: str, parser=_parse_csv, default=pd.DataFrame):
+        """Parsed artifact at path; default() when the file is missing or unreadable."""
+        signature = _file_signature(path)
+        if signature is None:
+            return default()
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != signature:
+            with self._path_lock(path):
+                entry = self._entries.get(path)
+                if entry is None or entry[0] != signature:
+                    try:
+                        entry = (signature, parser(path))
+                    except Exception:
+                        entry = (signature, default())
+                    self._entries[path] = entry
+        return entry[1]
+
+    def changed(self) -> List[str]:
+        """Paths whose file changed (or disappeared) since they were parsed."""
+        return [p for p, (sig, _) in list(self._entries.items()) if _file_signature(p) != sig]
+
+    def invalidate(self, paths: List[str]):
+        with self._lock:
+            for p in paths:
+                self._entries.pop(p, None)
+
+    def last_modified(self) -> Optional[datetime]:
+        if not self._entries:
+            return None
+        return datetime.fromtimestamp(max(sig[0] for sig, _ in self._entries.values()) / 1e9)
+
+
+@st.cache_resource(show_spinner=False)
+def artifact_store() -> ArtifactStore:
+    return ArtifactStore()
+
+
+def load_csv_safe(path: str) -> pd.DataFrame:
+    return session_copy(artifact_store().get(path))
+
+def load_bundle():
+    """Memory-mapped dashboard bundle written by main.py, or None if absent."""
+    if open_bundle is None:
+        return None
+    return artifact_store().get(PATHS["dashboard_bundle"], parser=open_bundle, default=lambda: None)
+
+
+def load_table(name: str, csv_key: str) -> pd.DataFrame:
+    """Table from the dashboard bundle when it has one, else the standalone CSV."""
+    if bundle is not None and name in bundle:
+        return session_copy(bundle.frame(name))
+    return load_csv_safe(PATHS[csv_key])
 
 def assess_data_quality(df: pd.DataFrame) -> str:
     if df.empty:
@@ -499,23 +598,40 @@ def assess_data_quality(df: pd.DataFrame) -> str:
 PATHS = {
     "risk_metrics": os.path.join(BASE_PATH, "Risk Analytics Module", "daily_risk_metrics.csv"),
     "sector_exposure": os.path.join(BASE_PATH, "Risk Analytics Module", "sector_exposure.csv"),
+    "sector_weights_history": os.path.join(BASE_PATH, "Risk Analytics Module", "sector_weights_history.csv"),
+    "concentration_metrics": os.path.join(BASE_PATH, "Risk Analytics Module", "concentration_metrics.csv"),
+    "limit_events": os.path.join(BASE_PATH, "Risk Analytics Module", "limit_events.csv"),
+    "limit_history": os.path.join(BASE_PATH, "Risk Analytics Module", "limit_history.csv"),
+    "factor_exposures": os.path.join(BASE_PATH, "Risk Analytics Module", "factor_exposures.csv"),
+    "factor_betas_rolling": os.path.join(BASE_PATH, "Risk Analytics Module", "factor_betas_rolling.csv"),
     "backtest_results": os.path.join(BASE_PATH, "Backtesting Framework & Strategies", "backtest_results.csv"),
     "backtest_wf": os.path.join(BASE_PATH, "Backtesting Framework & Strategies", "backtest_results_walkforward.csv"),
     "target_weights": os.path.join(BASE_PATH, "Portfolio Optimization Module", "target_weights.csv"),
     "trade_recommendations": os.path.join(BASE_PATH, "Portfolio Optimization Module", "trade_recommendations.csv"),
     "portfolio_risk_returns": os.path.join(BASE_PATH, "Portfolio Optimization Module", "portfolio_risk_return.csv"),
-    "tca_summary": os.path.join(BASE_PATH, "Transaction Cost Analysis (TCA)", "weekly_tca_summary.csv")
+    "tca_summary": os.path.join(BASE_PATH, "Transaction Cost Analysis (TCA)", "weekly_tca_summary.csv"),
+    "dashboard_bundle": os.path.join(BASE_PATH, "dashboard_bundle.arrow"),
+    "event_store": os.path.join(BASE_PATH, "events.sqlite")
 }
 
 with st.spinner("Loading portfolio data..."):
-    risk_metrics = load_csv_safe(PATHS["risk_metrics"])
-    sector_exposure = load_csv_safe(PATHS["sector_exposure"])
+    bundle = load_bundle()
+    risk_metrics = load_table("daily_risk_metrics", "risk_metrics")
+    sector_exposure = load_table("sector_exposure", "sector_exposure")
+    sector_weights_history = load_table("sector_weights_history", "sector_weights_history")
+    concentration_metrics = load_table("concentration_metrics", "concentration_metrics")
     backtest_results = load_csv_safe(PATHS["backtest_results"])
     backtest_wf = load_csv_safe(PATHS["backtest_wf"])
     target_weights = load_csv_safe(PATHS["target_weights"])
     trade_recommendations = load_csv_safe(PATHS["trade_recommendations"])
-    portfolio_risk_returns = load_csv_safe(PATHS["portfolio_risk_returns"])
+    portfolio_risk_returns = load_table("portfolio_risk_return", "portfolio_risk_returns")
     tca_summary = load_csv_safe(PATHS["tca_summary"])
+    limit_events = load_table("limit_events", "limit_events")
+    limit_history = load_table("limit_history", "limit_history")
+    factor_exposures_table = load_table("factor_exposures", "factor_exposures")
+    factor_betas_rolling = load_table("factor_betas_rolling", "factor_betas_rolling")
+    risk_horizons = session_copy(bundle.frame("risk_horizons")) if bundle is not None else pd.DataFrame()
+    risk_correlations = session_copy(bundle.frame("risk_correlations")) if bundle is not None else pd.DataFrame()
 
 # ============================================================================
 # UTILITY FUNCTIONS
@@ -624,6 +740,260 @@ def create_gauge_chart(value: float, title: str, max_val: float,
     
     return fig
 
+
+# Factor beta table (factors.factor_betas): non-factor columns and display names
+FACTOR_META_COLUMNS = ["series", "level", "alpha", "r_squared", "observations"]
+FACTOR_LABELS = {
+    "rates_bps": "Interest Rate Beta (per bp)",
+    "vol": "Volatility Beta",
+    "momentum": "Momentum Factor",
+    "size": "Size Factor (small - big)",
+}
+
+
+def factor_label(factor: str) -> str:
+    return FACTOR_LABELS.get(factor, f"{factor} Sector Beta")
+
+
+# Per-strategy return files written by the pipeline (strategy_returns_<STRATEGY>.csv)
+STRATEGY_RETURNS_DIR = os.path.join(BASE_PATH, "..", "..", "outputs")
+STRATEGY_RETURNS_PATTERN = "strategy_returns_*.csv"
+
+
+def discover_strategy_files(directory: str = STRATEGY_RETURNS_DIR) -> Dict[str, str]:
+    """Strategy name -> return file for every strategy_returns_*.csv in directory."""
+    prefix = STRATEGY_RETURNS_PATTERN.split("*")[0]
+    return {
+        os.path.basename(path)[len(prefix):-len(".csv")]: path
+        for path in sorted(glob.glob(os.path.join(directory, STRATEGY_RETURNS_PATTERN)))
+    }
+
+
+def load_strategy_returns(strategy_files: Dict[str, str], min_rows: int = 30) -> pd.DataFrame:
+    """
+    Observation x strategy matrix of returns (pct change of pnl_usd), with the
+    files read concurrently through the artifact store (parsed once per change).
+    Rows are aligned on the files' date column when they have one.
+    """
+    if not strategy_files:
+        return pd.DataFrame()
+    with ThreadPoolExecutor(max_workers=min(8, len(strategy_files))) as pool:
+        frames = dict(zip(strategy_files, pool.map(load_csv_safe, strategy_files.values())))
+    
+    columns = {}
+    for name, frame in frames.items():
+        if 'pnl_usd' not in frame.columns or len(frame) <= min_rows:
+            continue
+        returns = frame['pnl_usd'].pct_change()
+        if 'date' in frame.columns:
+            returns.index = pd.to_datetime(frame['date'], errors='coerce')
+        columns[name] = returns.iloc[1:].replace([np.inf, -np.inf], np.nan)
+    return pd.DataFrame(columns) if columns else pd.DataFrame()
+
+
+def artifact_signature(paths) -> tuple:
+    """(path, mtime_ns, size) per file: a cache key that is cheap to hash and changes with the files."""
+    return tuple((path, *(_file_signature(path) or (None, None))) for path in paths)
+
+
+@st.cache_data(show_spinner=False)
+def strategy_risk_metrics(strategy_files: Dict[str, str], signature: tuple) -> pd.DataFrame:
+    """
+    VaR/ES 95/99 and annualized volatility (all in %) per strategy, from one
+    partial sort per group of strategies sharing an observation count.
+    VaR/ES keep the dashboard's sign convention (return quantiles, so losses < 0).
+    Cached on the files' artifact_signature; returns come from the artifact store.
+    """
+    returns = load_strategy_returns(strategy_files)
+    metrics = pd.DataFrame(index=returns.columns, columns=["VaR_95", "ES_95", "VaR_99", "ES_99", "Volatility"],
+                           dtype=float)
+    values = returns.to_numpy(dtype=float).T
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=1)
+    for count in np.unique(counts[counts > 0]):
+        rows = np.flatnonzero(counts == count)
+        # Same count per row: compacting the valid values keeps a rectangular matrix
+        block = values[rows][valid[rows]].reshape(len(rows), count)
+        tails = var_es_matrix(block, [0.95, 0.99])
+        for key, tail in tails.items():
+            metrics.iloc[rows, metrics.columns.get_loc(key)] = -tail * 100
+    metrics["Volatility"] = returns.std() * np.sqrt(252) * 100
+    return metrics
+
+
+# Limit rules on tables only the dashboard loads (the pipeline persists the rest)
+DASHBOARD_LIMIT_SOURCES = ("target_weights", "tca_summary")
+
+
+def dashboard_limit_rules() -> List[Dict]:
+    """
+    Rules for DASHBOARD_LIMIT_SOURCES as the pipeline last ran them (its configured
+    limits, persisted in the event store); the defaults until the store exists.
+    """
+    try:
+        rules = stored_limits(PATHS["event_store"])
+    except Exception as e:
+        st.warning(f"Stored limit rules unavailable, using defaults: {e}")
+        rules = []
+    return [r for r in (rules or load_rules()) if r["source"] in DASHBOARD_LIMIT_SOURCES]
+
+
+@st.cache_data(show_spinner=False)
+def dashboard_limit_events(rules: List[Dict], signature: tuple) -> pd.DataFrame:
+    """
+    Breach events for DASHBOARD_LIMIT_SOURCES, evaluated once per change of the
+    rules or of the source files (signature: their artifact_signature).
+    """
+    sources = {name: load_csv_safe(PATHS[name]) for name in DASHBOARD_LIMIT_SOURCES}
+    return evaluate_limits(rules, sources)["events"]
+
+
+def alerts_from_events(events: pd.DataFrame) -> List[Dict]:
+    """
+    Active breach events as alert cards (values in display units). Each card's
+    id (rule, source, breach start) is stable across reruns, unlike its timestamp,
+    which falls back to now() for undated sources.
+    """
+    if events.empty:
+        return []
+    active = events[events["active"].astype(str).str.lower() == "true"]
+    scale = active["display_scale"].astype(float)
+    current = active["current_value"].astype(float)
+    limit = active["limit"].astype(float)
+    # How far past the limit the latest value is (negative while held by hysteresis)
+    beyond = np.where(active["direction"] == "below", limit - current, current - limit)
+    # Sources without dates (e.g. weekly TCA rows) start at a row number, not a timestamp
+    dated = ~active["start"].map(lambda v: isinstance(v, (int, float, np.number)))
+    started = pd.to_datetime(active["start"].where(dated), errors="coerce")
+    return [
+        {
+            'id': f"{row.rule}:{row.source}:{row.start}",
+            'severity': row.severity,
+            'category': row.category,
+            'metric': row.label,
+            'current_value': cur,
+            'limit': lim,
+            'breach_pct': pct,
+            'timestamp': start.to_pydatetime() if not pd.isna(start) else datetime.now(),
+            'recommendation': row.recommendation,
+        }
+        for row, cur, lim, pct, start in zip(
+            active.itertuples(index=False), current * scale, limit * scale,
+            beyond / limit.abs().replace(0, np.nan) * 100, started
+        )
+    ]
+
+
+def log_event(event_type: str, message: str, **fields):
+    """Record a dashboard action in the event store; the dashboard keeps working if it is not writable."""
+    try:
+        record_event(PATHS["event_store"], event_type, message, user="dashboard", **fields)
+    except Exception as e:
+        st.warning(f"Event not recorded: {e}")
+
+
+def log_report(name: str, file_path: str):
+    log_event("report", f"{name} generated", category="Reporting", severity="INFO",
+              payload={"path": str(file_path)})
+
+
+# Long series are cut to the visible range and reduced to about two points per
+# horizontal pixel before they are sent to the browser; above WEBGL_MIN_POINTS
+# the trace is drawn with WebGL
+CHART_PIXEL_WIDTH = 1000
+WEBGL_MIN_POINTS = 1000
+
+
+def zoom_range(n: int, key: str) -> Optional[tuple]:
+    """
+    Observation range slider for a chart of n points, shown only when the series
+    has more points than the chart draws. Narrowing it re-queries the series at
+    higher resolution.
+    """
+    if n <= 2 * CHART_PIXEL_WIDTH:
+        return None
+    return st.slider("Zoom (observations)", 0, n - 1, (0, n - 1), key=key)
+
+
+def chart_points(data, x_range: Optional[tuple] = None, method: str = "minmax"):
+    """
+    Visible, downsampled slice of a Series or DataFrame (index = x axis).
+
+    Returns:
+        (reduced data, use_webgl)
+    """
+    if x_range is not None:
+        data = data.iloc[x_range[0]:x_range[1] + 1]
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    reduced = downsample_frame(frame, 2 * CHART_PIXEL_WIDTH, method=method)
+    if isinstance(data, pd.Series):
+        reduced = reduced.iloc[:, 0]
+    return reduced, len(reduced) > WEBGL_MIN_POINTS
+
+
+def ts_scatter(x, y, use_webgl: bool = False, **kwargs):
+    """go.Scatter, or go.Scattergl for large point counts (which has no spline lines)."""
+    if not use_webgl:
+        return go.Scatter(x=x, y=y, **kwargs)
+    line = kwargs.get('line')
+    if isinstance(line, dict) and line.get('shape') == 'spline':
+        kwargs['line'] = {**line, 'shape': 'linear'}
+    return go.Scattergl(x=x, y=y, **kwargs)
+
+# Percentiles kept from each simulation: the 25/50/75 quartiles and both tails of
+# every confidence level on the 90-99% slider, so moving it never re-simulates
+MC_PERCENTILES = np.unique(np.r_[np.arange(0.5, 5.01, 0.5), [25.0, 50.0, 75.0], np.arange(95.0, 99.51, 0.5)])
+
+
+@st.cache_data(show_spinner="Running simulation...", max_entries=32)
+def simulate_distribution(dist_type: str, mean: float, std: float, num_simulations: int,
+                          empirical: Optional[np.ndarray] = None, seed: int = 42,
+                          bins: int = 50) -> Dict:
+    """
+    Seeded Monte Carlo draws reduced server-side to histogram bins, summary
+    statistics and MC_PERCENTILES; the raw samples never leave this function.
+    """
+    rng = np.random.default_rng(seed)
+    if dist_type == "Normal":
+        simulated = rng.normal(mean, std, num_simulations)
+    elif dist_type == "Student-t":
+        simulated = rng.standard_t(5, num_simulations)  # 5 degrees of freedom
+        simulated *= std
+        simulated += mean
+    else:  # Empirical
+        simulated = rng.choice(empirical, size=num_simulations, replace=True)
+    
+    counts, edges = np.histogram(simulated, bins=bins)
+    sample_mean = simulated.mean()
+    centered = simulated - sample_mean
+    m2 = np.dot(centered, centered) / num_simulations
+    centered *= centered
+    m4 = np.dot(centered, centered) / num_simulations
+    m3 = np.dot(centered, simulated - sample_mean) / num_simulations
+    
+    return {
+        "counts": counts,
+        "edges": edges,
+        "percentiles": dict(zip(MC_PERCENTILES, np.percentile(simulated, MC_PERCENTILES))),
+        "mean": sample_mean,
+        "std": np.sqrt(m2),
+        "skew": m3 / m2 ** 1.5 if m2 > 0 else 0.0,
+        "kurtosis": m4 / m2 ** 2 - 3.0 if m2 > 0 else 0.0,
+        "min": simulated.min(),
+        "max": simulated.max(),
+    }
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_correlation(columns: tuple, window: int, method: str, data: pd.DataFrame) -> pd.DataFrame:
+    """Correlation matrix memoized by (columns, window, method) and the window's data."""
+    return correlation_matrix(data[list(columns)], method)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_rolling_correlation(columns: tuple, window: int, data: pd.DataFrame) -> pd.DataFrame:
+    """Rolling Pearson correlation of every column pair over the full history."""
+    return rolling_correlation(data[list(columns)], window)
+
 # ============================================================================
 # PREMIUM SIDEBAR NAVIGATION
 # ============================================================================
@@ -661,8 +1031,8 @@ st.sidebar.success("All Systems Operational")
 
 st.sidebar.markdown("### Data Freshness")
 st.sidebar.info(f"""
-**Last Updated:** {datetime.now().strftime('%Y-%m-%d %H:%M')}  
-**Next Refresh:** {(datetime.now() + timedelta(hours=1)).strftime('%H:%M')}
+**Last Updated:** {(artifact_store().last_modified() or datetime.now()).strftime('%Y-%m-%d %H:%M')}  
+**Next Refresh:** on file change
 """)
 
 quality_risk = assess_data_quality(risk_metrics)
@@ -700,7 +1070,9 @@ st.sidebar.markdown("### Quick Actions")
 col_r, col_e = st.sidebar.columns(2)
 with col_r:
     if st.button("Refresh", use_container_width=True):
-        st.cache_data.clear()
+        # Only artifacts whose (mtime, size) changed are dropped and re-parsed
+        changed_artifacts = artifact_store().changed()
+        artifact_store().invalidate(changed_artifacts)
         st.rerun()
 with col_e:
     if st.button("Export", use_container_width=True):
@@ -1137,15 +1509,19 @@ elif section == "Risk Analytics":
     
     # Interactive Risk Profile Selector
     col_selector1, col_selector2, col_selector3 = st.columns([2, 2, 1])
+    # Horizons and their scale factors come precomputed in the bundle when available
+    if not risk_horizons.empty:
+        horizon_scale = dict(zip(risk_horizons["horizon"], risk_horizons["scale"]))
+    else:
+        horizon_scale = {name: np.sqrt(days) for name, days in {"1-Day": 1, "5-Day": 5, "10-Day": 10, "Monthly": 22}.items()}
     with col_selector1:
         risk_horizon = st.selectbox(
             "Risk Horizon",
-            ["1-Day", "5-Day", "10-Day", "Monthly"],
+            list(horizon_scale),
             index=0,
             help="Select time horizon for risk calculations"
         )
-    horizon_map = {"1-Day": 1, "5-Day": 5, "10-Day": 10, "Monthly": 22}
-    scaling_factor = np.sqrt(horizon_map[risk_horizon])
+    scaling_factor = horizon_scale[risk_horizon]
 
     risk_metrics_scaled = risk_metrics.copy()
     for col in ["VaR_95", "ES_95", "VaR_99", "ES_99"]:
@@ -1196,42 +1572,17 @@ elif section == "Risk Analytics":
     
     st.markdown("<div class='section-header'><h3>📊 Strategy-Level Risk Breakdown</h3></div>", unsafe_allow_html=True)
     
-    # Check if strategy-level data exists
-    strategy_files = {
-        'ARBITRAGE': os.path.join(BASE_PATH, "..", "..", "outputs", "strategy_returns_ARBITRAGE.csv"),
-        'MARKET_MAKING': os.path.join(BASE_PATH, "..", "..", "outputs", "strategy_returns_MARKET_MAKING.csv"),
-        'MEAN_REVERSION': os.path.join(BASE_PATH, "..", "..", "outputs", "strategy_returns_MEAN_REVERSION.csv"),
-        'MOMENTUM': os.path.join(BASE_PATH, "..", "..", "outputs", "strategy_returns_MOMENTUM.csv"),
-        'PAIRS_TRADING': os.path.join(BASE_PATH, "..", "..", "outputs", "strategy_returns_PIRS_TRADING.csv")
-    }
-
+    # Strategy return files are discovered, loaded concurrently and scored in one batch
+    strategy_files = discover_strategy_files()
+    strategy_returns = load_strategy_returns(strategy_files)
     strategy_risk_data = {}
-    
-    # Load and calculate VaR/ES for each strategy
-    for strategy_name, file_path in strategy_files.items():
-        try:
-            if os.path.exists(file_path):
-                strategy_df = pd.read_csv(file_path)
-                if 'pnl_usd' in strategy_df.columns and len(strategy_df) > 30:
-                    returns = strategy_df['pnl_usd'].pct_change().dropna()
-                    
-                    # Calculate VaR and ES
-                    var_95 = np.percentile(returns, 5) * 100
-                    es_95 = returns[returns <= np.percentile(returns, 5)].mean() * 100
-                    var_99 = np.percentile(returns, 1) * 100
-                    es_99 = returns[returns <= np.percentile(returns, 1)].mean() * 100
-                    volatility = returns.std() * np.sqrt(252) * 100
-                    
-                    strategy_risk_data[strategy_name] = {
-                        'VaR_95': var_95,
-                        'ES_95': es_95,
-                        'VaR_99': var_99,
-                        'ES_99': es_99,
-                        'Volatility': volatility,
-                        'returns': returns
-                    }
-        except Exception as e:
-            continue
+    if not strategy_returns.empty:
+        strategy_metrics = strategy_risk_metrics(strategy_files, artifact_signature(strategy_files.values()))
+        for strategy_name, row in strategy_metrics.iterrows():
+            strategy_risk_data[strategy_name] = {
+                **row.to_dict(),
+                'returns': strategy_returns[strategy_name].dropna()
+            }
     if strategy_risk_data:
         # Create tabs for different views
         tab_strat1, tab_strat2, tab_strat3 = st.tabs(["VaR/ES Comparison", "Individual Strategy Analysis", "Risk Contribution"])
@@ -1473,20 +1824,33 @@ elif section == "Risk Analytics":
     
     st.markdown("<div class='section-header'><h3>🔬 Factor Exposure Analysis</h3></div>", unsafe_allow_html=True)
     
-    # Simulate factor exposures (in production, calculate from actual data)
-    # These would come from regression analysis against market factors
-    factor_exposures = {
-        'Interest Rate Beta': -0.25,  # Negative = benefits from rate decreases
-        'FX Beta (USD)': 0.15,
-        'Equity Market Beta': 0.85,
-        'Credit Spread Beta': -0.40,
-        'Volatility Beta (VIX)': -0.60,
-        'Momentum Factor': 0.45,
-        'Size Factor': -0.20,
-        'Value Factor': 0.30,
-        'Quality Factor': 0.55,
-        'Liquidity Factor': 0.25
-    }
+    # Betas estimated by the pipeline (factors.factor_betas) for the portfolio,
+    # every strategy and every instrument against the same factor returns
+    factor_exposures = {}
+    factor_table = factor_exposures_table
+    factor_cols = [c for c in factor_table.columns if c not in FACTOR_META_COLUMNS]
+    if not factor_table.empty and factor_cols and 'series' in factor_table.columns:
+        series_level = dict(zip(factor_table['series'].astype(str), factor_table['level']))
+        col_series, col_fit = st.columns([2, 1])
+        with col_series:
+            factor_series = st.selectbox(
+                "Exposure of",
+                list(series_level),
+                format_func=lambda s: f"{s} ({series_level[s]})",
+                key="factor_series",
+            )
+        fit = factor_table[factor_table['series'].astype(str) == factor_series].iloc[0]
+        with col_fit:
+            st.metric("R² / Observations", f"{fit['r_squared']:.2f}" if pd.notna(fit['r_squared']) else "N/A",
+                      f"{int(fit['observations'])} days", delta_color="off")
+        factor_exposures = {
+            factor_label(f): float(fit[f]) for f in factor_cols if pd.notna(fit[f])
+        }
+    
+    if not factor_exposures:
+        st.info("ℹ️ Factor exposures not available. Run the pipeline to estimate factor betas.")
+        factor_exposures = {factor_label(f): 0.0 for f in factor_cols} or {"No factors": 0.0}
+        factor_series = "Portfolio"
     
     col_factor_chart, col_factor_radar = st.columns([1.5, 1])
     with col_factor_chart:
@@ -1505,9 +1869,9 @@ elif section == "Risk Analytics":
             x=values,
             orientation='h',
             marker=dict(color=colors_factors, line=dict(color='rgba(255,255,255,0.2)', width=1)),
-            text=[f'{v:+.2f}' for v in values],
+            text=[f'{v:+.3g}' for v in values],
             textposition='outside',
-            hovertemplate='<b>%{y}</b><br>Beta: %{x:+.2f}<extra></extra>'
+            hovertemplate='<b>%{y}</b><br>Beta: %{x:+.3g}<extra></extra>'
         ))
         fig_factors.add_vline(x=0, line_width=2, line_color=COLORS['text'])
         
@@ -1528,7 +1892,7 @@ elif section == "Risk Analytics":
         
         # Prepare data for radar chart (normalize to 0-1 scale)
         normalized_factors = {k: abs(v) for k, v in factor_exposures.items()}
-        max_exposure = max(normalized_factors.values())
+        max_exposure = max(normalized_factors.values(), default=0)
         normalized_values = [v/max_exposure for v in normalized_factors.values()] if max_exposure > 0 else [0] * len(normalized_factors)
         
         fig_radar = go.Figure()
@@ -1573,10 +1937,10 @@ elif section == "Risk Analytics":
                     <div style='background: rgba(255, 107, 107, 0.1); padding: 0.75rem; margin: 0.5rem 0; border-radius: 8px; border-left: 3px solid {COLORS['danger']};'>
                         <div style='display: flex; justify-content: space-between;'>
                             <span style='font-weight: 600;'>{factor}</span>
-                            <span style='color: {COLORS['danger']}; font-weight: 700;'>{beta:+.2f}</span>
+                            <span style='color: {COLORS['danger']}; font-weight: 700;'>{beta:+.3g}</span>
                         </div>
                         <div style='font-size: 0.75rem; color: {COLORS['text']}; margin-top: 0.25rem;'>
-                            Portfolio benefits when this factor decreases
+                            {factor_series} benefits when this factor decreases
                         </div>
                     </div>
                 """, unsafe_allow_html=True)
@@ -1589,14 +1953,67 @@ elif section == "Risk Analytics":
                     <div style='background: rgba(72, 219, 251, 0.1); padding: 0.75rem; margin: 0.5rem 0; border-radius: 8px; border-left: 3px solid {COLORS['success']};'>
                         <div style='display: flex; justify-content: space-between;'>
                             <span style='font-weight: 600;'>{factor}</span>
-                            <span style='color: {COLORS['success']}; font-weight: 700;'>{beta:+.2f}</span>
+                            <span style='color: {COLORS['success']}; font-weight: 700;'>{beta:+.3g}</span>
                         </div>
                         <div style='font-size: 0.75rem; color: {COLORS['text']}; margin-top: 0.25rem;'>
-                            Portfolio benefits when this factor increases
+                            {factor_series} benefits when this factor increases
                         </div>
                     </div>
                 """, unsafe_allow_html=True)
     
+    # Betas through time for the selected series (style drift), from the pipeline's
+    # rolling / exponentially weighted estimates (factors.rolling_factor_betas)
+    if not factor_betas_rolling.empty and 'series' in factor_betas_rolling.columns:
+        drift = factor_betas_rolling[factor_betas_rolling['series'].astype(str) == factor_series]
+        drift_cols = [c for c in drift.columns if c not in ("date", "series")]
+        if not drift.empty and drift_cols:
+            st.markdown(f"##### Factor Beta Drift — {factor_series}")
+            drift = drift.set_index('date')[drift_cols].dropna(how='all')
+            drift_factors = st.multiselect(
+                "Factors", drift_cols, default=drift_cols[:min(4, len(drift_cols))],
+                format_func=factor_label, key="factor_drift_factors",
+            )
+            drift_points, drift_gl = chart_points(drift[drift_factors], zoom_range(len(drift), key="zoom_factor_drift"))
+            fig_drift = go.Figure()
+            for factor in drift_points.columns:
+                fig_drift.add_trace(ts_scatter(drift_points.index, drift_points[factor], drift_gl,
+                                               mode='lines', name=factor_label(factor)))
+            fig_drift.add_hline(y=0, line_width=1, line_color=COLORS['text'])
+            fig_drift.update_layout(
+                height=350,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(color=COLORS['text'], family='Inter'),
+                xaxis=dict(title="Date", gridcolor='rgba(102, 126, 234, 0.1)'),
+                yaxis=dict(title="Beta", gridcolor='rgba(102, 126, 234, 0.1)'),
+                hovermode='x unified'
+            )
+            st.plotly_chart(fig_drift, use_container_width=True, key="factor_drift")
+    
+    if not factor_table.empty and factor_cols:
+        with st.expander("🧮 Factor Betas by Strategy & Instrument", expanded=False):
+            level_pick = st.radio("Level", ["strategy", "instrument"], horizontal=True, key="factor_level")
+            level_table = factor_table[factor_table['level'] == level_pick].set_index('series')
+            if level_table.empty:
+                st.info(f"No {level_pick} betas available.")
+            else:
+                fig_beta_map = go.Figure(go.Heatmap(
+                    z=level_table[factor_cols].to_numpy(dtype=float),
+                    x=[factor_label(f) for f in factor_cols],
+                    y=level_table.index.astype(str),
+                    colorscale='RdBu',
+                    zmid=0,
+                    hovertemplate='<b>%{y}</b><br>%{x}: %{z:+.3f}<extra></extra>'
+                ))
+                fig_beta_map.update_layout(
+                    height=max(300, 22 * len(level_table) + 120),
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color=COLORS['text'], family='Inter', size=10),
+                    margin=dict(l=20, r=20, t=20, b=40)
+                )
+                st.plotly_chart(fig_beta_map, use_container_width=True, key="factor_beta_map")
+    
     st.markdown("<br>", unsafe_allow_html=True)
 
     
@@ -1719,7 +2136,7 @@ elif section == "Risk Analytics":
         # Add interactive controls
         col_ctrl1, col_ctrl2, col_ctrl3 = st.columns(3)
         with col_ctrl1:
-            lookback = st.slider("Lookback Period (days)", 30, 250, 100, key="lookback_risk")
+            lookback = st.slider("Lookback Period (days)", 30, max(250, len(risk_metrics)), 100, key="lookback_risk")
         with col_ctrl2:
             show_limits = st.checkbox("Show Risk Limits", value=True, key="show_limits")
         with col_ctrl3:
@@ -1730,6 +2147,9 @@ elif section == "Risk Analytics":
             available_risk = [c for c in risk_cols if c in risk_metrics.columns]
             
             if available_risk:
+                trend_range = zoom_range(min(lookback, len(risk_metrics)), key="zoom_risk_trend")
+                trend_points, trend_gl = chart_points(risk_metrics[available_risk].tail(lookback), trend_range)
+                
                 if chart_type == "Multi-Panel":
                     fig = make_subplots(
                         rows=2, cols=2,
@@ -1743,11 +2163,11 @@ elif section == "Risk Analytics":
                     
                     for idx, col in enumerate(available_risk):
                         row, col_pos = positions[idx]
-                        data = risk_metrics[col].tail(lookback)
+                        data = trend_points[col]
                         
                         fig.add_trace(
-                            go.Scatter(
-                                y=data,
+                            ts_scatter(
+                                data.index, data, trend_gl,
                                 mode='lines',
                                 line=dict(width=2.5, color=colors_risk[idx]),
                                 fill='tozeroy',
@@ -1788,9 +2208,9 @@ elif section == "Risk Analytics":
                     colors_risk = [COLORS['danger'], COLORS['warning'], COLORS['info'], COLORS['primary']]
                     
                     for idx, col in enumerate(available_risk):
-                        data = risk_metrics[col].tail(lookback)
-                        fig.add_trace(go.Scatter(
-                            y=data,
+                        data = trend_points[col]
+                        fig.add_trace(ts_scatter(
+                            data.index, data, trend_gl,
                             name=col,
                             mode='lines',
                             line=dict(width=2.5, color=colors_risk[idx]),
@@ -1855,14 +2275,17 @@ elif section == "Risk Analytics":
                 
                 with col_chart:
                     # Historical stress trends
-                    stress_data = risk_metrics[available_stress].tail(100)
+                    stress_range = zoom_range(len(risk_metrics), key="zoom_stress")
+                    stress_data, stress_gl = chart_points(
+                        risk_metrics[available_stress].tail(100) if stress_range is None
+                        else risk_metrics[available_stress], stress_range)
                     
                     fig = go.Figure()
                     colors_stress = [COLORS['danger'], COLORS['warning'], COLORS['info']]
                     
                     for i, col in enumerate(available_stress):
-                        fig.add_trace(go.Scatter(
-                            y=stress_data[col],
+                        fig.add_trace(ts_scatter(
+                            stress_data.index, stress_data[col], stress_gl,
                             name=col.replace('_', ' '),
                             mode='lines+markers',
                             line=dict(width=2.5, color=colors_stress[i]),
@@ -1948,13 +2371,19 @@ elif section == "Risk Analytics":
         st.markdown("#### Monte Carlo Simulation Results")
         
         # Interactive Monte Carlo parameters
-        col_mc1, col_mc2, col_mc3 = st.columns(3)
+        col_mc1, col_mc2, col_mc3, col_mc4 = st.columns([2, 2, 2, 1])
         with col_mc1:
-            num_simulations = st.slider("Number of Simulations", 1000, 50000, 10000, step=1000, key="mc_sims")
+            num_simulations = st.select_slider(
+                "Number of Simulations",
+                [1_000, 10_000, 50_000, 100_000, 1_000_000, 10_000_000],
+                value=10_000, format_func=lambda n: f"{n:,}", key="mc_sims"
+            )
         with col_mc2:
             confidence_interval = st.slider("Confidence Interval", 90, 99, 95, key="mc_ci")
         with col_mc3:
             dist_type = st.selectbox("Distribution", ["Normal", "Student-t", "Empirical"], key="mc_dist")
+        with col_mc4:
+            mc_seed = st.number_input("Seed", 0, 2**31 - 1, 42, key="mc_seed")
         
         if not risk_metrics.empty and "VaR_95" in risk_metrics.columns:
             historical_var = risk_metrics["VaR_95"].dropna()
@@ -1963,23 +2392,27 @@ elif section == "Risk Analytics":
                 mean_var = historical_var.mean()
                 std_var = historical_var.std()
                 
-                # Generate simulation based on selected distribution
-                if dist_type == "Normal":
-                    simulated = np.random.normal(mean_var, std_var, num_simulations)
-                elif dist_type == "Student-t":
-                    df_param = 5  # degrees of freedom
-                    simulated = np.random.standard_t(df_param, num_simulations) * std_var + mean_var
-                else:  # Empirical
-                    simulated = np.random.choice(historical_var, size=num_simulations, replace=True)
+                sim = simulate_distribution(
+                    dist_type, float(mean_var), float(std_var), int(num_simulations),
+                    historical_var.to_numpy(dtype=float) if dist_type == "Empirical" else None,
+                    int(mc_seed)
+                )
+                tail = (100 - confidence_interval) / 2
+                p_low = sim["percentiles"][tail]
+                p_high = sim["percentiles"][100 - tail]
+                p50 = sim["percentiles"][50.0]
                 
                 col_hist, col_qq = st.columns([2, 1])
                 
                 with col_hist:
                     fig = go.Figure()
                     
-                    fig.add_trace(go.Histogram(
-                        x=simulated,
-                        nbinsx=50,
+                    # Bins are counted server-side; only bin centers and counts are sent
+                    edges = sim["edges"]
+                    fig.add_trace(go.Bar(
+                        x=(edges[:-1] + edges[1:]) / 2,
+                        y=sim["counts"],
+                        width=np.diff(edges),
                         name='Simulated VaR',
                         marker_color=COLORS['primary'],
                         opacity=0.7,
@@ -1987,16 +2420,12 @@ elif section == "Risk Analytics":
                     ))
                     
                     # Add percentile lines
-                    p_low = np.percentile(simulated, (100 - confidence_interval) / 2)
-                    p_high = np.percentile(simulated, confidence_interval + (100 - confidence_interval) / 2)
-                    p50 = np.percentile(simulated, 50)
-                    
                     fig.add_vline(x=p_low, line_dash="dash", line_color=COLORS['danger'],
-                                 annotation_text=f"{(100-confidence_interval)/2:.0f}th %ile")
+                                 annotation_text=f"{tail:.0f}th %ile")
                     fig.add_vline(x=p50, line_dash="solid", line_color=COLORS['info'],
                                  annotation_text="Median", annotation_position="top")
                     fig.add_vline(x=p_high, line_dash="dash", line_color=COLORS['success'],
-                                 annotation_text=f"{confidence_interval + (100-confidence_interval)/2:.0f}th %ile")
+                                 annotation_text=f"{100 - tail:.0f}th %ile")
                     
                     fig.update_layout(
                         height=400,
@@ -2005,6 +2434,7 @@ elif section == "Risk Analytics":
                         font=dict(color=COLORS['text'], family='Inter'),
                         xaxis=dict(title="VaR 95%", gridcolor='rgba(102, 126, 234, 0.1)'),
                         yaxis=dict(title="Frequency", gridcolor='rgba(102, 126, 234, 0.1)'),
+                        bargap=0,
                         showlegend=False
                     )
                     
@@ -2016,12 +2446,12 @@ elif section == "Risk Analytics":
                     stats_data = {
                         'Metric': ['Mean', 'Std Dev', 'Skewness', 'Kurtosis', 'Min', 'Max'],
                         'Value': [
-                            f"{np.mean(simulated):.2f}",
-                            f"{np.std(simulated):.2f}",
-                            f"{pd.Series(simulated).skew():.2f}",
-                            f"{pd.Series(simulated).kurtosis():.2f}",
-                            f"{np.min(simulated):.2f}",
-                            f"{np.max(simulated):.2f}"
+                            f"{sim['mean']:.2f}",
+                            f"{sim['std']:.2f}",
+                            f"{sim['skew']:.2f}",
+                            f"{sim['kurtosis']:.2f}",
+                            f"{sim['min']:.2f}",
+                            f"{sim['max']:.2f}"
                         ]
                     }
                     
@@ -2030,13 +2460,13 @@ elif section == "Risk Analytics":
                 # Percentile metrics
                 col_mc1, col_mc2, col_mc3, col_mc4 = st.columns(4)
                 with col_mc1:
-                    st.metric(f"{(100-confidence_interval)/2:.0f}th Percentile", f"{p_low:.2f}")
+                    st.metric(f"{tail:.0f}th Percentile", f"{p_low:.2f}")
                 with col_mc2:
-                    st.metric("25th Percentile", f"{np.percentile(simulated, 25):.2f}")
+                    st.metric("25th Percentile", f"{sim['percentiles'][25.0]:.2f}")
                 with col_mc3:
-                    st.metric("75th Percentile", f"{np.percentile(simulated, 75):.2f}")
+                    st.metric("75th Percentile", f"{sim['percentiles'][75.0]:.2f}")
                 with col_mc4:
-                    st.metric(f"{confidence_interval + (100-confidence_interval)/2:.0f}th Percentile", f"{p_high:.2f}")
+                    st.metric(f"{100 - tail:.0f}th Percentile", f"{p_high:.2f}")
     
     with tab4:
         st.markdown("#### Maximum Drawdown Analysis")
@@ -2044,7 +2474,7 @@ elif section == "Risk Analytics":
         # Interactive drawdown controls
         col_dd1, col_dd2 = st.columns([3, 1])
         with col_dd1:
-            dd_window = st.slider("Analysis Window (days)", 30, 250, 100, key="dd_window")
+            dd_window = st.slider("Analysis Window (days)", 30, max(250, len(risk_metrics)), 100, key="dd_window")
         with col_dd2:
             show_recovery = st.checkbox("Show Recovery Periods", value=True, key="show_recovery")
         
@@ -2060,8 +2490,9 @@ elif section == "Risk Analytics":
             with col_dd_chart:
                 fig = go.Figure()
                 
-                fig.add_trace(go.Scatter(
-                    y=drawdown,
+                dd_points, dd_gl = chart_points(drawdown, zoom_range(len(drawdown), key="zoom_drawdown"))
+                fig.add_trace(ts_scatter(
+                    dd_points.index, dd_points, dd_gl,
                     mode='lines',
                     fill='tozeroy',
                     line=dict(color=COLORS['danger'], width=2.5),
@@ -2151,13 +2582,18 @@ elif section == "Risk Analytics":
            if len(all_cols) > 1:
                recent_data = risk_metrics[all_cols].tail(corr_window)
             
-            # Calculate correlation
-               if corr_method == "Pearson":
-                    corr_matrix = recent_data.corr(method='pearson')
-               elif corr_method == "Spearman":
-                    corr_matrix = recent_data.corr(method='spearman')
+            # Calculate correlation (precomputed in the bundle for the default window)
+               precomputed = pd.DataFrame()
+               if not risk_correlations.empty:
+                    precomputed = risk_correlations[
+                        (risk_correlations["method"] == corr_method.lower())
+                        & (risk_correlations["window"] == corr_window)
+                    ]
+               if not precomputed.empty:
+                    corr_matrix = precomputed.pivot(index="row", columns="column", values="value").reindex(
+                        index=all_cols, columns=all_cols)
                else:
-                    corr_matrix = recent_data.corr(method='kendall')
+                    corr_matrix = cached_correlation(tuple(all_cols), corr_window, corr_method.lower(), recent_data)
             
                col_heatmap, col_insights = st.columns([2, 1])
             
@@ -2194,15 +2630,8 @@ elif section == "Risk Analytics":
                     st.markdown("##### Key Correlations")
                 
                 # Find strongest positive and negative correlations
-                    corr_pairs = []
-                    for i in range(len(corr_matrix.columns)):
-                        for j in range(i+1, len(corr_matrix.columns)):
-                            corr_pairs.append({
-                            'pair': f"{corr_matrix.columns[i]} × {corr_matrix.columns[j]}",
-                            'value': corr_matrix.iloc[i, j]
-                        })
-                
-                    corr_df = pd.DataFrame(corr_pairs).sort_values('value', key=abs, ascending=False).head(5)
+                    corr_df = top_pairs(corr_matrix, 5)
+                    corr_df['pair'] = corr_df['row'].astype(str) + " × " + corr_df['column'].astype(str)
                 
                     for _, row in corr_df.iterrows():
                         val = row['value']
@@ -2244,6 +2673,40 @@ elif section == "Risk Analytics":
                     - Negative correlations provide diversification benefits
                     """)
 
+               # Correlation through time: rolling window over the full history
+               st.markdown("##### Correlation Through Time")
+               rolling = cached_rolling_correlation(tuple(all_cols), corr_window, risk_metrics[all_cols])
+               pair_labels = [f"{a} × {b}" for a, b in rolling.columns]
+               default_pairs = [f"{r} × {c}" for r, c in zip(corr_df['row'], corr_df['column'])
+                                if (r, c) in rolling.columns][:3]
+               selected_pairs = st.multiselect("Pairs", pair_labels, default=default_pairs, key="corr_pairs")
+            
+               roll_frame = rolling[[p for l, p in zip(pair_labels, rolling.columns) if l in selected_pairs]].copy()
+               roll_frame.columns = [l for l in pair_labels if l in selected_pairs]
+               roll_frame.insert(0, 'Average pairwise', rolling.mean(axis=1))
+               roll_points, roll_gl = chart_points(roll_frame, zoom_range(len(roll_frame), key="zoom_rolling_corr"))
+            
+               fig_roll = go.Figure()
+               fig_roll.add_trace(ts_scatter(
+                    roll_points.index, roll_points['Average pairwise'], roll_gl,
+                    mode='lines',
+                    name='Average pairwise',
+                    line=dict(color=COLORS['text'], width=1, dash='dot')
+               ))
+               for label in roll_points.columns[1:]:
+                    fig_roll.add_trace(ts_scatter(roll_points.index, roll_points[label], roll_gl, mode='lines', name=label))
+               fig_roll.update_layout(
+                    height=350,
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color=COLORS['text'], family='Inter'),
+                    xaxis=dict(title="Observation", gridcolor='rgba(102, 126, 234, 0.1)'),
+                    yaxis=dict(title=f"{corr_window}-day Correlation", range=[-1, 1],
+                               gridcolor='rgba(102, 126, 234, 0.1)'),
+                    hovermode='x unified'
+               )
+               st.plotly_chart(fig_roll, use_container_width=True, key="rolling_correlation")
+
     st.markdown("<br>", unsafe_allow_html=True)
 
 # Enhanced Sector & Factor Exposure with Interactive Features
@@ -2343,9 +2806,15 @@ elif section == "Risk Analytics":
         
             st.markdown("##### Diversification Score")
         
-            weights_squared = (sector_data_sorted['portfolio_weight'] / 100) ** 2
-            herfindahl = weights_squared.sum()
-            diversification_score = (1 - herfindahl) * 100
+            # Precomputed by the pipeline (latest date); recompute only for older outputs
+            if not concentration_metrics.empty:
+                latest_concentration = concentration_metrics.iloc[-1]
+                herfindahl = float(latest_concentration['hhi'])
+                diversification_score = float(latest_concentration['diversification_score'])
+            else:
+                weights_squared = (sector_data_sorted['portfolio_weight'] / 100) ** 2
+                herfindahl = weights_squared.sum()
+                diversification_score = (1 - herfindahl) * 100
         
             fig_gauge = go.Figure(go.Indicator(
                 mode="gauge+number",
@@ -2417,6 +2886,75 @@ elif section == "Risk Analytics":
             </div>
         """, unsafe_allow_html=True)
 
+    # Concentration history (per-date HHI, effective N, max weight, top-5 share)
+    if not concentration_metrics.empty and 'date' in concentration_metrics.columns:
+        st.markdown("##### Concentration History")
+        conc_history, conc_gl = chart_points(
+            concentration_metrics.set_index(pd.to_datetime(concentration_metrics['date'])).select_dtypes('number'))
+        conc_dates = conc_history.index
+        col_conc1, col_conc2 = st.columns(2)
+
+        with col_conc1:
+            fig_hhi = make_subplots(specs=[[{"secondary_y": True}]])
+            fig_hhi.add_trace(ts_scatter(conc_dates, conc_history['hhi'], conc_gl, name='HHI',
+                                         line=dict(color=COLORS['danger'], width=2)), secondary_y=False)
+            fig_hhi.add_trace(ts_scatter(conc_dates, conc_history['effective_n'], conc_gl, name='Effective N',
+                                         line=dict(color=COLORS['info'], width=2)), secondary_y=True)
+            fig_hhi.update_layout(
+                height=300,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(color=COLORS['text'], family='Inter'),
+                legend=dict(orientation="h", y=1.1),
+                margin=dict(l=20, r=20, t=30, b=20)
+            )
+            fig_hhi.update_yaxes(title_text="HHI", secondary_y=False, gridcolor='rgba(102, 126, 234, 0.1)')
+            fig_hhi.update_yaxes(title_text="Effective N", secondary_y=True)
+            st.plotly_chart(fig_hhi, use_container_width=True, key="concentration_hhi_history")
+
+        with col_conc2:
+            top_col = next((c for c in conc_history.columns if c.startswith('top') and c.endswith('_share')), None)
+            fig_weight = go.Figure()
+            fig_weight.add_trace(ts_scatter(conc_dates, conc_history['max_weight'] * 100, conc_gl, name='Max Weight',
+                                            line=dict(color=COLORS['warning'], width=2)))
+            if top_col:
+                fig_weight.add_trace(ts_scatter(conc_dates, conc_history[top_col] * 100, conc_gl,
+                                                name=top_col.replace('_', ' ').title(),
+                                                line=dict(color=COLORS['primary'], width=2)))
+            fig_weight.add_hline(y=RISK_LIMITS['sector_concentration_limit'] * 100, line_dash="dash",
+                                 line_color=COLORS['danger'], annotation_text="Limit")
+            fig_weight.update_layout(
+                height=300,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(color=COLORS['text'], family='Inter'),
+                yaxis=dict(title="Weight (%)", gridcolor='rgba(102, 126, 234, 0.1)'),
+                legend=dict(orientation="h", y=1.1),
+                margin=dict(l=20, r=20, t=30, b=20)
+            )
+            st.plotly_chart(fig_weight, use_container_width=True, key="concentration_weight_history")
+
+    if not sector_weights_history.empty and 'date' in sector_weights_history.columns:
+        # Stacked areas need SVG traces (Scattergl has no stackgroup); downsampling still applies
+        weight_history, _ = chart_points(
+            sector_weights_history.set_index(pd.to_datetime(sector_weights_history['date'])).drop(columns='date').abs() * 100)
+        fig_sector_hist = go.Figure()
+        for sector_name in weight_history.columns:
+            fig_sector_hist.add_trace(ts_scatter(
+                weight_history.index, weight_history[sector_name],
+                name=sector_name, stackgroup='weights', mode='lines', line=dict(width=0.5)
+            ))
+        fig_sector_hist.update_layout(
+            height=320,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color=COLORS['text'], family='Inter'),
+            yaxis=dict(title="Sector Weight (%)", gridcolor='rgba(102, 126, 234, 0.1)'),
+            legend=dict(orientation="h", y=1.1),
+            margin=dict(l=20, r=20, t=30, b=20)
+        )
+        st.plotly_chart(fig_sector_hist, use_container_width=True, key="sector_weights_history")
+
 # Add download button for risk data
     import os
 
@@ -3212,149 +3750,12 @@ elif section == "Alerts & Compliance":
     # ============================================================================
     
     def detect_alerts():
-        """Detect all risk limit breaches and compliance issues"""
-        alerts = []
-        
-        # VaR Breaches
-        if not risk_metrics.empty and "VaR_95" in risk_metrics.columns:
-            current_var95 = get_safe_value(risk_metrics["VaR_95"])
-            if current_var95 < RISK_LIMITS['var_95_limit']:
-                alerts.append({
-                    'severity': 'CRITICAL',
-                    'category': 'Market Risk',
-                    'metric': 'VaR 95%',
-                    'current_value': current_var95,
-                    'limit': RISK_LIMITS['var_95_limit'],
-                    'breach_pct': ((current_var95 - RISK_LIMITS['var_95_limit']) / abs(RISK_LIMITS['var_95_limit'])) * 100,
-                    'timestamp': datetime.now(),
-                    'recommendation': 'Reduce portfolio risk exposure immediately. Consider hedging strategies.'
-                })
-        
-        if not risk_metrics.empty and "VaR_99" in risk_metrics.columns:
-            current_var99 = get_safe_value(risk_metrics["VaR_99"])
-            if current_var99 < RISK_LIMITS['var_99_limit']:
-                alerts.append({
-                    'severity': 'CRITICAL',
-                    'category': 'Market Risk',
-                    'metric': 'VaR 99%',
-                    'current_value': current_var99,
-                    'limit': RISK_LIMITS['var_99_limit'],
-                    'breach_pct': ((current_var99 - RISK_LIMITS['var_99_limit']) / abs(RISK_LIMITS['var_99_limit'])) * 100,
-                    'timestamp': datetime.now(),
-                    'recommendation': 'Extreme risk breach. Initiate emergency risk reduction protocol.'
-                })
-        
-        # Expected Shortfall Breaches
-        if not risk_metrics.empty and "ES_95" in risk_metrics.columns:
-            current_es95 = get_safe_value(risk_metrics["ES_95"])
-            if current_es95 < RISK_LIMITS['es_95_limit']:
-                alerts.append({
-                    'severity': 'HIGH',
-                    'category': 'Tail Risk',
-                    'metric': 'ES 95%',
-                    'current_value': current_es95,
-                    'limit': RISK_LIMITS['es_95_limit'],
-                    'breach_pct': ((current_es95 - RISK_LIMITS['es_95_limit']) / abs(RISK_LIMITS['es_95_limit'])) * 100,
-                    'timestamp': datetime.now(),
-                    'recommendation': 'Tail risk elevated. Review extreme scenario exposure.'
-                })
-        
-        if not risk_metrics.empty and "ES_99" in risk_metrics.columns:
-            current_es99 = get_safe_value(risk_metrics["ES_99"])
-            if current_es99 < RISK_LIMITS['es_99_limit']:
-                alerts.append({
-                    'severity': 'CRITICAL',
-                    'category': 'Tail Risk',
-                    'metric': 'ES 99%',
-                    'current_value': current_es99,
-                    'limit': RISK_LIMITS['es_99_limit'],
-                    'breach_pct': ((current_es99 - RISK_LIMITS['es_99_limit']) / abs(RISK_LIMITS['es_99_limit'])) * 100,
-                    'timestamp': datetime.now(),
-                    'recommendation': 'Critical tail risk breach. Engage risk committee immediately.'
-                })
-        
-        # Sector Concentration
-        if not sector_exposure.empty:
-            max_sector_weight = sector_exposure['portfolio_weight'].abs().max()
-            if max_sector_weight > RISK_LIMITS['sector_concentration_limit']:
-                breach_sector = sector_exposure.loc[sector_exposure['portfolio_weight'].abs().idxmax(), 'sector']
-                alerts.append({
-                    'severity': 'HIGH',
-                    'category': 'Concentration Risk',
-                    'metric': f'Sector: {breach_sector}',
-                    'current_value': max_sector_weight * 100,
-                    'limit': RISK_LIMITS['sector_concentration_limit'] * 100,
-                    'breach_pct': ((max_sector_weight - RISK_LIMITS['sector_concentration_limit']) / RISK_LIMITS['sector_concentration_limit']) * 100,
-                    'timestamp': datetime.now(),
-                    'recommendation': f'Reduce {breach_sector} exposure to below {RISK_LIMITS["sector_concentration_limit"]*100:.0f}%.'
-                })
-        
-        # Single Position Limit
-        if not target_weights.empty:
-            max_position = target_weights['Target Weight'].max()
-            if max_position > RISK_LIMITS['single_position_limit']:
-                breach_instrument = target_weights.loc[target_weights['Target Weight'].idxmax(), 'Instrument']
-                alerts.append({
-                    'severity': 'MEDIUM',
-                    'category': 'Position Limit',
-                    'metric': f'Position: {breach_instrument}',
-                    'current_value': max_position * 100,
-                    'limit': RISK_LIMITS['single_position_limit'] * 100,
-                    'breach_pct': ((max_position - RISK_LIMITS['single_position_limit']) / RISK_LIMITS['single_position_limit']) * 100,
-                    'timestamp': datetime.now(),
-                    'recommendation': f'Trim {breach_instrument} position to below {RISK_LIMITS["single_position_limit"]*100:.0f}%.'
-                })
-        
-        # Transaction Cost Alerts
-        if not tca_summary.empty and "avg_slippage_bps" in tca_summary.columns:
-            recent_slippage = get_safe_value(tca_summary["avg_slippage_bps"])
-            if abs(recent_slippage) > RISK_LIMITS['slippage_threshold_bps']:
-                alerts.append({
-                    'severity': 'MEDIUM',
-                    'category': 'Execution Quality',
-                    'metric': 'Slippage',
-                    'current_value': abs(recent_slippage),
-                    'limit': RISK_LIMITS['slippage_threshold_bps'],
-                    'breach_pct': ((abs(recent_slippage) - RISK_LIMITS['slippage_threshold_bps']) / RISK_LIMITS['slippage_threshold_bps']) * 100,
-                    'timestamp': datetime.now(),
-                    'recommendation': 'Review execution strategy. Consider smaller order sizes or different venues.'
-                })
-        
-        if not tca_summary.empty and "avg_market_impact_bps" in tca_summary.columns:
-            recent_impact = get_safe_value(tca_summary["avg_market_impact_bps"])
-            if abs(recent_impact) > RISK_LIMITS['market_impact_threshold_bps']:
-                alerts.append({
-                    'severity': 'MEDIUM',
-                    'category': 'Execution Quality',
-                    'metric': 'Market Impact',
-                    'current_value': abs(recent_impact),
-                    'limit': RISK_LIMITS['market_impact_threshold_bps'],
-                    'breach_pct': ((abs(recent_impact) - RISK_LIMITS['market_impact_threshold_bps']) / RISK_LIMITS['market_impact_threshold_bps']) * 100,
-                    'timestamp': datetime.now(),
-                    'recommendation': 'High market impact detected. Use algorithmic execution for large orders.'
-                })
-        
-        # Drawdown Monitoring
-        if not risk_metrics.empty and "VaR_95" in risk_metrics.columns:
-            var_data = risk_metrics["VaR_95"].tail(30)
-            cumulative = (1 + var_data / 100).cumprod()
-            running_max = cumulative.cummax()
-            drawdown = (cumulative - running_max) / running_max
-            current_dd = drawdown.iloc[-1]
-            
-            if current_dd < RISK_LIMITS['max_drawdown_limit']:
-                alerts.append({
-                    'severity': 'HIGH',
-                    'category': 'Drawdown',
-                    'metric': 'Maximum Drawdown',
-                    'current_value': current_dd * 100,
-                    'limit': RISK_LIMITS['max_drawdown_limit'] * 100,
-                    'breach_pct': ((current_dd - RISK_LIMITS['max_drawdown_limit']) / abs(RISK_LIMITS['max_drawdown_limit'])) * 100,
-                    'timestamp': datetime.now(),
-                    'recommendation': 'Portfolio drawdown exceeds limit. Implement stop-loss measures.'
-                })
-        
-        return alerts
+        """Active limit breaches: persisted pipeline events plus dashboard-only sources"""
+        local_events = dashboard_limit_events(
+            dashboard_limit_rules(), artifact_signature(PATHS[name] for name in DASHBOARD_LIMIT_SOURCES)
+        )
+        frames = [e for e in (limit_events, local_events) if not e.empty]
+        return alerts_from_events(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
     
     # Detect all alerts
     active_alerts = detect_alerts()
@@ -3505,6 +3906,12 @@ elif section == "Alerts & Compliance":
             """
         
             st.markdown(alert_html, unsafe_allow_html=True)
+            if st.button("✔️ Acknowledge", key=f"ack_{alert['id']}"):
+                log_event("acknowledgement", f"Breach acknowledged: {alert['metric']}",
+                          category=alert['category'], severity=alert['severity'],
+                          payload={'alert': alert['id'], 'current_value': alert['current_value'],
+                                   'limit': alert['limit']})
+                st.success(f"Acknowledged: {alert['metric']}")
 
     else:
         st.markdown(f"""
@@ -3670,48 +4077,31 @@ elif section == "Alerts & Compliance":
     
     st.markdown("<div class='section-header'><h3>📊 Alert History & Trends</h3></div>", unsafe_allow_html=True)
     
-    # Simulate alert history (in production, this would come from a database)
-    alert_history = pd.DataFrame({
-        'Date': pd.date_range(end=datetime.now(), periods=30, freq='D'),
-        'Critical': np.random.randint(0, 3, 30),
-        'High': np.random.randint(0, 5, 30),
-        'Medium': np.random.randint(1, 8, 30)
-    })
+    # Per-date count of rules in breach, persisted by the pipeline's limit engine
+    alert_history = pd.DataFrame(columns=['Date', 'Critical', 'High', 'Medium'])
+    if not limit_history.empty and 'date' in limit_history.columns:
+        alert_history = limit_history.rename(columns={
+            'date': 'Date', 'CRITICAL': 'Critical', 'HIGH': 'High', 'MEDIUM': 'Medium'
+        })
+        alert_history['Date'] = pd.to_datetime(alert_history['Date'])
+    history_points, history_gl = chart_points(alert_history.set_index('Date')[['Critical', 'High', 'Medium']])
     
     col_hist1, col_hist2 = st.columns([2, 1])
     
     with col_hist1:
         fig_alert_trend = go.Figure()
         
-        fig_alert_trend.add_trace(go.Scatter(
-            x=alert_history['Date'],
-            y=alert_history['Critical'],
-            name='Critical',
-            mode='lines+markers',
-            line=dict(color=COLORS['danger'], width=2.5),
-            fill='tonexty',
-            fillcolor='rgba(255, 107, 107, 0.2)'
-        ))
-        
-        fig_alert_trend.add_trace(go.Scatter(
-            x=alert_history['Date'],
-            y=alert_history['High'],
-            name='High',
-            mode='lines+markers',
-            line=dict(color=COLORS['warning'], width=2.5),
-            fill='tonexty',
-            fillcolor='rgba(254, 202, 87, 0.2)'
-        ))
-        
-        fig_alert_trend.add_trace(go.Scatter(
-            x=alert_history['Date'],
-            y=alert_history['Medium'],
-            name='Medium',
-            mode='lines+markers',
-            line=dict(color=COLORS['info'], width=2.5),
-            fill='tonexty',
-            fillcolor='rgba(0, 210, 211, 0.2)'
-        ))
+        for name, color, fill in (('Critical', COLORS['danger'], 'rgba(255, 107, 107, 0.2)'),
+                                  ('High', COLORS['warning'], 'rgba(254, 202, 87, 0.2)'),
+                                  ('Medium', COLORS['info'], 'rgba(0, 210, 211, 0.2)')):
+            fig_alert_trend.add_trace(ts_scatter(
+                history_points.index, history_points[name], history_gl,
+                name=name,
+                mode='lines',
+                line=dict(color=color, width=2.5, shape='hv'),
+                fill='tonexty',
+                fillcolor=fill
+            ))
         
         fig_alert_trend.update_layout(
             height=400,
@@ -3928,6 +4318,7 @@ elif section == "Alerts & Compliance":
                 # Build PDF
                 doc.build(elements)
                 st.success(f"✅ Daily Regulatory Report generated: {file_path}")
+                log_report("Daily Regulatory Report", file_path)
     
     with col_report2:
         if st.button("📥 Generate Breach Exception Report", use_container_width=True, key="gen_breach_report"):
@@ -3941,6 +4332,7 @@ elif section == "Alerts & Compliance":
                     breach_df.to_csv(file_path, index=False)
                     
                     st.success(f"✅ Breach Exception Report saved to: {file_path}")
+                    log_report("Breach Exception Report", file_path)
                 else:
                     st.info("ℹ️ No breaches to report. System is fully compliant.")
     
@@ -4051,47 +4443,27 @@ elif section == "Alerts & Compliance":
     
     st.markdown("<div class='section-header'><h3>📜 Audit Trail & Activity Log</h3></div>", unsafe_allow_html=True)
     
-    # Simulate audit log (in production, this would come from a database)
-    audit_log = pd.DataFrame({
-        'Timestamp': [
-            datetime.now() - timedelta(hours=i) for i in range(10)
-        ],
-        'User': ['system', 'admin', 'risk_manager', 'system', 'compliance_officer',
-                'system', 'risk_manager', 'admin', 'system', 'system'],
-        'Action': [
-            'Alert Generated: VaR 95% Breach',
-            'Risk Limit Updated: VaR 95%',
-            'Breach Acknowledged: Sector Concentration',
-            'Daily Report Generated',
-            'Compliance Review Completed',
-            'Alert Generated: High Slippage',
-            'Exception Approved: Position Limit',
-            'User Login',
-            'Data Refresh Completed',
-            'Alert Generated: Market Impact'
-        ],
-        'Severity': ['CRITICAL', 'INFO', 'HIGH', 'INFO', 'INFO',
-                    'MEDIUM', 'HIGH', 'INFO', 'INFO', 'MEDIUM'],
-        'IP Address': ['127.0.0.1', '192.168.1.100', '192.168.1.101', '127.0.0.1', '192.168.1.102',
-                      '127.0.0.1', '192.168.1.101', '192.168.1.100', '127.0.0.1', '127.0.0.1']
-    })
+    # Audit trail from the event store, one page at a time (keyset pagination)
+    event_store_path = PATHS["event_store"]
     
     # Filter controls
-    col_audit1, col_audit2, col_audit3 = st.columns(3)
+    col_audit1, col_audit2, col_audit3, col_audit4 = st.columns(4)
     
     with col_audit1:
+        audit_users = distinct_values(event_store_path, "user")
         audit_user_filter = st.multiselect(
             "Filter by User",
-            options=audit_log['User'].unique(),
-            default=audit_log['User'].unique(),
+            options=audit_users,
+            default=audit_users,
             key="audit_user_filter"
         )
     
     with col_audit2:
+        audit_severities = distinct_values(event_store_path, "severity")
         audit_severity_filter = st.multiselect(
             "Filter by Severity",
-            options=audit_log['Severity'].unique(),
-            default=audit_log['Severity'].unique(),
+            options=audit_severities,
+            default=audit_severities,
             key="audit_severity_filter"
         )
     
@@ -4099,15 +4471,35 @@ elif section == "Alerts & Compliance":
         audit_lookback = st.selectbox(
             "Time Period",
             ["Last 24 Hours", "Last 7 Days", "Last 30 Days", "All Time"],
-            index=0,
+            index=3,
             key="audit_lookback"
         )
     
-    # Apply filters
-    filtered_audit = audit_log[
-        (audit_log['User'].isin(audit_user_filter)) &
-        (audit_log['Severity'].isin(audit_severity_filter))
-    ]
+    with col_audit4:
+        audit_page_size = st.selectbox("Rows per Page", [25, 100, 500], index=1, key="audit_page_size")
+    
+    lookback_days = {"Last 24 Hours": 1, "Last 7 Days": 7, "Last 30 Days": 30}.get(audit_lookback)
+    audit_filters = dict(
+        users=audit_user_filter,
+        severities=audit_severity_filter,
+        start=datetime.now(timezone.utc) - timedelta(days=lookback_days) if lookback_days else None,
+    )
+    
+    # Cursor stack: the (ts, id) after which each page starts; reset when filters change
+    filter_key = repr(sorted((k, str(v)) for k, v in audit_filters.items() if k != "start")) + audit_lookback + str(audit_page_size)
+    if st.session_state.get("audit_filter_key") != filter_key:
+        st.session_state["audit_filter_key"] = filter_key
+        st.session_state["audit_cursors"] = [None]
+    cursors = st.session_state["audit_cursors"]
+    
+    page = query_events(event_store_path, page_size=audit_page_size, before=cursors[-1], **audit_filters)
+    total_events = count_events(event_store_path, **audit_filters)
+    
+    audit_log = page.rename(columns={
+        'ts': 'Timestamp', 'user': 'User', 'message': 'Action', 'severity': 'Severity',
+        'category': 'Category', 'event_type': 'Type', 'source': 'Source'
+    })[['Timestamp', 'User', 'Action', 'Severity', 'Category', 'Type', 'Source']]
+    filtered_audit = audit_log
     
     # Display audit log
     st.dataframe(
@@ -4122,6 +4514,18 @@ elif section == "Alerts & Compliance":
         height=400
     )
     
+    col_page1, col_page2, col_page3 = st.columns([1, 2, 1])
+    with col_page1:
+        if st.button("◀ Newer", disabled=len(cursors) == 1, use_container_width=True, key="audit_newer"):
+            cursors.pop()
+            st.rerun()
+    with col_page2:
+        st.caption(f"Page {len(cursors)} of {max(1, -(-total_events // audit_page_size))} • {total_events:,} events")
+    with col_page3:
+        if st.button("Older ▶", disabled=len(page) < audit_page_size, use_container_width=True, key="audit_older"):
+            cursors.append((page['ts'].iloc[-1], int(page['id'].iloc[-1])))
+            st.rerun()
+    
     # Export audit log
     if st.button("📥 Export Audit Log", use_container_width=True, key="export_audit"):
         filename = f"Audit_Log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
@@ -4266,6 +4670,7 @@ elif section == "Reporting & Export":
 
                 doc.build(elements)
                 st.success(f"✅ Daily Risk Report saved to {file_path}")
+                log_report("Daily Risk Report", file_path)
 
 
     # -------------------------------------------------------------------------
@@ -4356,6 +4761,7 @@ elif section == "Reporting & Export":
         # Build PDF
                 doc.build(elements)
                 st.success(f"✅ Portfolio Analytics Report saved to {file_path}")
+                log_report("Portfolio Analytics Report", file_path)
 
 
     st.markdown("<br>", unsafe_allow_html=True)
@@ -4395,6 +4801,7 @@ elif section == "Reporting & Export":
                 c.save()
 
                 st.success(f"✅ TCA Report saved to {file_path}")
+                log_report("TCA Report", file_path)
 
     # -------------------------------------------------------------------------
     # STRATEGY PERFORMANCE REPORT
@@ -4430,6 +4837,7 @@ elif section == "Reporting & Export":
                 c.save()
 
                 st.success(f"✅ Strategy Report saved to {file_path}")
+                log_report("Strategy Report", file_path)
 
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("---")
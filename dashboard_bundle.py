@@ -0,0 +1,161 @@
+"""
+Dashboard bundle for Risk Analytics Platform
+One versioned file holding every table the dashboard reads, each stored as an
+uncompressed Arrow IPC file at a 64-byte aligned offset behind a small JSON
+header. Readers memory-map the file and slice tables out of it zero-copy, so
+opening a bundle costs the same regardless of how many tables or rows it holds.
+
+    [magic 8B][format version u32][header length u64][header JSON][pad]
+    [table 0 IPC file][pad][table 1 IPC file][pad]...
+
+Requires pyarrow (imported on first use).
+"""
+
+import json
+import struct
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+
+BUNDLE_MAGIC = b"RABUNDLE"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<8sIQ")
+_ALIGN = 64
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+    except ImportError as e:
+        raise ImportError("The dashboard bundle requires pyarrow (pip install pyarrow)") from e
+    return pa, ipc
+
+
+def _padding(n: int) -> int:
+    return -n % _ALIGN
+
+
+def _to_arrow(pa, df: pd.DataFrame):
+    frame = df
+    if not isinstance(frame.index, pd.RangeIndex) or frame.index.name is not None:
+        frame = frame.reset_index()
+    frame = frame.copy(deep=False)
+    frame.columns = [str(c) for c in frame.columns]
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+def write_bundle(path: Path, tables: Dict[str, pd.DataFrame], metadata: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Write tables (name -> DataFrame; a non-default index is kept as columns) and
+    JSON-serializable metadata to one bundle file, atomically.
+    """
+    from risk_analytics.reporting import atomic_write
+
+    pa, ipc = _arrow()
+    blobs, entries = [], {}
+    for name, df in tables.items():
+        if df is None:
+            continue
+        table = _to_arrow(pa, df)
+        sink = pa.BufferOutputStream()
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        blobs.append((name, sink.getvalue(), table))
+
+    # Offsets depend on the header size, which depends on the offsets: size the
+    # header with placeholder offsets first (fixed-width), then fill them in
+    def header_bytes(offsets):
+        for (name, buf, table), offset in zip(blobs, offsets):
+            entries[name] = {
+                "offset": offset,
+                "length": buf.size,
+                "rows": table.num_rows,
+                "columns": table.column_names,
+            }
+        return json.dumps({
+            "format_version": FORMAT_VERSION,
+            "metadata": metadata or {},
+            "tables": entries,
+        }, default=str).encode("utf-8")
+
+    placeholder = header_bytes([10 ** 15] * len(blobs))
+    header_len = len(placeholder)
+    position = _PREFIX.size + header_len
+    position += _padding(position)
+    offsets = []
+    for _, buf, _ in blobs:
+        offsets.append(position)
+        position += buf.size + _padding(buf.size)
+    header = header_bytes(offsets)
+    header += b" " * (header_len - len(header))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path, "wb") as f:
+        f.write(_PREFIX.pack(BUNDLE_MAGIC, FORMAT_VERSION, header_len))
+        f.write(header)
+        f.write(b"\0" * _padding(_PREFIX.size + header_len))
+        for _, buf, _ in blobs:
+            f.write(buf)
+            f.write(b"\0" * _padding(buf.size))
+    return path
+
+
+class DashboardBundle:
+    """A memory-mapped bundle. Tables are sliced out of the map on first access."""
+
+    def __init__(self, path: Path):
+        pa, ipc = _arrow()
+        self.path = Path(path)
+        self._ipc = ipc
+        self._map = pa.memory_map(str(self.path), "r")
+        self._buffer = self._map.read_buffer()
+
+        magic, version, header_len = _PREFIX.unpack(self._buffer.slice(0, _PREFIX.size).to_pybytes())
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"{self.path} is not a dashboard bundle")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{self.path} has bundle format {version}; this reader supports {FORMAT_VERSION}")
+        header = json.loads(self._buffer.slice(_PREFIX.size, header_len).to_pybytes())
+
+        self.format_version = version
+        self.metadata: Dict[str, Any] = header.get("metadata", {})
+        self._entries: Dict[str, Dict[str, Any]] = header.get("tables", {})
+        self._tables: Dict[str, Any] = {}
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    @property
+    def tables(self) -> List[str]:
+        return list(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def table(self, name: str):
+        """Arrow table backed directly by the memory map (no copy)."""
+        if name not in self._tables:
+            entry = self._entries[name]
+            reader = self._ipc.open_file(self._buffer.slice(entry["offset"], entry["length"]))
+            self._tables[name] = reader.read_all()
+        return self._tables[name]
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """Table as pandas, converted once per bundle (empty if absent)."""
+        if name not in self._entries:
+            return pd.DataFrame()
+        if name not in self._frames:
+            self._frames[name] = self.table(name).to_pandas()
+        return self._frames[name]
+
+    def close(self):
+        self._tables.clear()
+        self._frames.clear()
+        self._map.close()
+
+
+def open_bundle(path: Path) -> DashboardBundle:
+    """Memory-map a bundle written by write_bundle."""
+    return DashboardBundle(path)
@@ -0,0 +1,116 @@
+"""
+Downsampling of long time series for plotting
+Min/max-per-bucket and Largest-Triangle-Three-Buckets (LTTB) point selection.
+Both return indices into the original series so callers keep the exact values.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _as_float(x) -> np.ndarray:
+    """Numeric view of an x axis (datetimes become int64 nanoseconds)."""
+    arr = np.asarray(x)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[ns]").astype(np.int64).astype(float)
+    if arr.dtype == object:
+        try:
+            return pd.to_datetime(arr).asi8.astype(float)
+        except (TypeError, ValueError):
+            return np.arange(len(arr), dtype=float)
+    return arr.astype(float)
+
+
+def minmax_indices(y, n_buckets: int) -> np.ndarray:
+    """
+    Indices of the first, last, min and max point of each of n_buckets equal-count
+    buckets (one bucket per horizontal pixel keeps the visual envelope exact).
+    NaN points are dropped. O(n).
+    """
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if n <= 2 * n_buckets:
+        return valid
+
+    yv = y[valid]
+    starts = (np.arange(n_buckets) * n) // n_buckets
+    counts = np.diff(np.append(starts, n))
+    pos = np.arange(n)
+
+    mins = np.repeat(np.minimum.reduceat(yv, starts), counts)
+    maxs = np.repeat(np.maximum.reduceat(yv, starts), counts)
+    first_min = np.minimum.reduceat(np.where(yv == mins, pos, n), starts)
+    first_max = np.minimum.reduceat(np.where(yv == maxs, pos, n), starts)
+
+    keep = np.unique(np.concatenate([[0, n - 1], first_min, first_max]))
+    return valid[keep]
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets selection of n_out points (Steinarsson 2013).
+    Keeps first and last points; for each inner bucket picks the point forming
+    the largest triangle with the previous pick and the next bucket's mean.
+    """
+    y = np.asarray(y, dtype=float)
+    xf = _as_float(x)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if n_out >= n or n_out < 3:
+        return valid
+
+    xv, yv = xf[valid], y[valid]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    picks = np.empty(n_out, dtype=int)
+    picks[0], picks[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        nxt_lo, nxt_hi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        nxt_hi = max(nxt_hi, nxt_lo + 1)
+        avg_x, avg_y = xv[nxt_lo:nxt_hi].mean(), yv[nxt_lo:nxt_hi].mean()
+
+        area = np.abs((xv[a] - avg_x) * (yv[lo:hi] - yv[a]) - (xv[a] - xv[lo:hi]) * (avg_y - yv[a]))
+        a = lo + int(np.argmax(area))
+        picks[i + 1] = a
+
+    return valid[picks]
+
+
+def downsample_series(series: pd.Series, n_points: int, method: str = "minmax") -> pd.Series:
+    """
+    Reduce a series to about n_points for display ("minmax" keeps 2 points per
+    bucket of n_points / 2 buckets; "lttb" keeps exactly n_points).
+    """
+    if len(series) <= n_points:
+        return series
+    if method == "lttb":
+        idx = lttb_indices(series.index, series.to_numpy(), n_points)
+    elif method == "minmax":
+        idx = minmax_indices(series.to_numpy(), max(n_points // 2, 1))
+    else:
+        raise ValueError(f"Unknown downsampling method '{method}'")
+    return series.iloc[idx]
+
+
+def downsample_frame(frame: pd.DataFrame, n_points: int, method: str = "minmax") -> pd.DataFrame:
+    """
+    Reduce every column of a frame sharing one x axis (the index) to about
+    n_points rows: the union of each column's selected points, so all series
+    keep their envelope and still share x values (needed for stacked fills).
+    """
+    if len(frame) <= n_points or frame.shape[1] == 0:
+        return frame
+    per_column = max(n_points // frame.shape[1], 3)
+    picks = []
+    for i in range(frame.shape[1]):
+        y = frame.iloc[:, i].to_numpy(dtype=float)
+        if method == "lttb":
+            picks.append(lttb_indices(frame.index, y, per_column))
+        elif method == "minmax":
+            picks.append(minmax_indices(y, max(per_column // 2, 1)))
+        else:
+            raise ValueError(f"Unknown downsampling method '{method}'")
+    return frame.iloc[np.unique(np.concatenate(picks))]
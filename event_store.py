@@ -0,0 +1,287 @@
+"""
+Event store for Risk Analytics Platform
+Embedded SQLite database (WAL mode, so the dashboard reads while the pipeline
+writes) holding the alert history and audit trail: limit breaches, limit
+changes, acknowledgements and report generation. Timestamp, category, severity
+and event type are indexed. Writers insert in batched transactions. Readers page
+through results with keyset pagination (timestamp, id), so page N costs the same
+as page 1 however many events the store holds.
+
+    events(id, ts, event_type, category, severity, source, key, message, user, payload)
+    limits(name, definition, updated)   -- current limit rules, for change detection
+"""
+
+import json
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+EVENT_TYPES = ("alert", "limit_change", "acknowledgement", "report")
+EVENT_FIELDS = ("ts", "event_type", "category", "severity", "source", "key", "message", "user", "payload")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    category TEXT,
+    severity TEXT,
+    source TEXT,
+    key TEXT UNIQUE,
+    message TEXT,
+    user TEXT,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts, id);
+CREATE INDEX IF NOT EXISTS idx_events_category_ts ON events(category, ts);
+CREATE INDEX IF NOT EXISTS idx_events_severity_ts ON events(severity, ts);
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events(event_type, ts);
+CREATE INDEX IF NOT EXISTS idx_events_user ON events(user);
+CREATE TABLE IF NOT EXISTS limits (
+    name TEXT PRIMARY KEY,
+    definition TEXT NOT NULL,
+    updated TEXT NOT NULL
+);
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _is_timestamp(value) -> bool:
+    return isinstance(value, (datetime, date, np.datetime64)) and not pd.isna(value)
+
+
+def _ts(value) -> str:
+    """ISO-8601 text for a timestamp (sortable as stored)."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return _now()
+    if isinstance(value, str):
+        return value
+    if not _is_timestamp(value):
+        # pd.Timestamp(int) would silently read a row number as nanoseconds since 1970
+        raise ValueError(f"Expected a timestamp, got {type(value).__name__} {value!r}")
+    return pd.Timestamp(value).isoformat()
+
+
+def connect(path: Path, readonly: bool = False) -> "sqlite3.Connection":
+    """Open the store (created with its schema unless readonly) in WAL mode."""
+    import sqlite3
+    path = Path(path)
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _row(event: Dict[str, Any]) -> Tuple:
+    payload = event.get("payload")
+    if payload is not None and not isinstance(payload, str):
+        payload = json.dumps(payload, default=str)
+    return (
+        _ts(event.get("ts")), event["event_type"], event.get("category"), event.get("severity"),
+        event.get("source"), event.get("key"), event.get("message"), event.get("user", "system"), payload,
+    )
+
+
+def append_events(path: Path, events: Iterable[Dict[str, Any]], batch_size: int = 10000) -> int:
+    """
+    Insert events in batched transactions. An event with a `key` replaces the
+    stored event with the same key (e.g. an ongoing breach re-reported by a
+    later run). Returns the number of events written.
+    """
+    sql = f"""
+        INSERT INTO events ({", ".join(EVENT_FIELDS)}) VALUES ({", ".join("?" * len(EVENT_FIELDS))})
+        ON CONFLICT(key) DO UPDATE SET
+            ts = excluded.ts, category = excluded.category, severity = excluded.severity,
+            message = excluded.message, payload = excluded.payload
+    """
+    conn = connect(path)
+    written, batch = 0, []
+    try:
+        for event in events:
+            batch.append(_row(event))
+            if len(batch) >= batch_size:
+                with conn:
+                    conn.executemany(sql, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            with conn:
+                conn.executemany(sql, batch)
+            written += len(batch)
+    finally:
+        conn.close()
+    return written
+
+
+def record_event(path: Path, event_type: str, message: str, **fields) -> int:
+    """Insert one event (e.g. from a dashboard action)."""
+    return append_events(path, [{"event_type": event_type, "message": message, **fields}])
+
+
+def alert_events(limit_events: pd.DataFrame, book: str = "default",
+                 run_time: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Store rows for breach events from limits.evaluate_limits, keyed by book, rule
+    and breach start so re-runs update an ongoing breach instead of duplicating it.
+    A breach without a dated start (an undated source) is stamped and keyed with
+    the run time instead.
+    """
+    if limit_events.empty:
+        return []
+    run_ts = _ts(run_time)
+    events = []
+    for row in limit_events.to_dict(orient="records"):
+        dated = isinstance(row["start"], str) or _is_timestamp(row["start"])
+        start = _ts(row["start"]) if dated else run_ts
+        events.append({
+            "ts": start,
+            "event_type": "alert",
+            "category": row["category"],
+            "severity": row["severity"],
+            "source": book,
+            "key": f"alert:{book}:{row['rule']}:{start}",
+            "message": f"Limit breach: {row['label']}",
+            "payload": row,
+        })
+    return events
+
+
+def sync_limits(path: Path, rules: List[Dict[str, Any]], user: str = "system") -> int:
+    """
+    Store the current limit rules and record a limit_change event for every
+    rule added, changed or removed since the last sync. Returns the change count.
+    """
+    current = {rule["name"]: json.dumps(rule, sort_keys=True, default=str) for rule in rules}
+    conn = connect(path)
+    try:
+        stored = {row["name"]: row["definition"] for row in conn.execute("SELECT name, definition FROM limits")}
+        now = _now()
+        changes = []
+        for name in sorted(set(current) | set(stored)):
+            old, new = stored.get(name), current.get(name)
+            if old == new:
+                continue
+            action = "added" if old is None else "removed" if new is None else "updated"
+            changes.append(_row({
+                "ts": now, "event_type": "limit_change", "category": "Risk Limit", "severity": "INFO",
+                "message": f"Risk limit {action}: {name}", "user": user,
+                "payload": {"name": name, "old": json.loads(old) if old else None,
+                            "new": json.loads(new) if new else None},
+            }))
+        with conn:
+            conn.executemany(
+                f"INSERT INTO events ({', '.join(EVENT_FIELDS)}) VALUES ({', '.join('?' * len(EVENT_FIELDS))})",
+                changes,
+            )
+            conn.execute("DELETE FROM limits")
+            conn.executemany("INSERT INTO limits (name, definition, updated) VALUES (?, ?, ?)",
+                             [(name, definition, now) for name, definition in current.items()])
+        return len(changes)
+    finally:
+        conn.close()
+
+
+def stored_limits(path: Path) -> List[Dict[str, Any]]:
+    """Limit rules as last synced by the pipeline (empty when the store does not exist yet)."""
+    if not Path(path).exists():
+        return []
+    conn = connect(path, readonly=True)
+    try:
+        return [json.loads(row["definition"]) for row in conn.execute("SELECT definition FROM limits ORDER BY name")]
+    finally:
+        conn.close()
+
+
+def _where(event_types=None, categories=None, severities=None, users=None, start=None, end=None):
+    clauses, params = [], []
+    for column, values in (("event_type", event_types), ("category", categories),
+                           ("severity", severities), ("user", users)):
+        if values is not None:
+            values = list(values)
+            if not values:
+                return "0 = 1", []
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if start is not None:
+        clauses.append("ts >= ?")
+        params.append(_ts(start))
+    if end is not None:
+        clauses.append("ts <= ?")
+        params.append(_ts(end))
+    return (" AND ".join(clauses) or "1 = 1"), params
+
+
+def query_events(
+    path: Path,
+    event_types: Optional[Iterable[str]] = None,
+    categories: Optional[Iterable[str]] = None,
+    severities: Optional[Iterable[str]] = None,
+    users: Optional[Iterable[str]] = None,
+    start=None,
+    end=None,
+    page_size: int = 100,
+    before: Optional[Tuple[str, int]] = None,
+) -> pd.DataFrame:
+    """
+    One page of events, newest first.
+
+    Args:
+        event_types / categories / severities / users: filters (None = all)
+        start / end: inclusive timestamp bounds
+        page_size: rows per page
+        before: (ts, id) of the last row of the previous page (keyset cursor)
+
+    Returns:
+        DataFrame of events (empty if the store does not exist)
+    """
+    if not Path(path).exists():
+        return pd.DataFrame(columns=("id",) + EVENT_FIELDS)
+    where, params = _where(event_types, categories, severities, users, start, end)
+    if before is not None:
+        where += " AND (ts < ? OR (ts = ? AND id < ?))"
+        params += [before[0], before[0], before[1]]
+    conn = connect(path, readonly=True)
+    try:
+        return pd.read_sql_query(
+            f"SELECT id, {', '.join(EVENT_FIELDS)} FROM events WHERE {where} ORDER BY ts DESC, id DESC LIMIT ?",
+            conn, params=params + [int(page_size)],
+        )
+    finally:
+        conn.close()
+
+
+def count_events(path: Path, **filters) -> int:
+    """Number of events matching the query_events filters."""
+    if not Path(path).exists():
+        return 0
+    where, params = _where(**filters)
+    conn = connect(path, readonly=True)
+    try:
+        return int(conn.execute(f"SELECT COUNT(*) FROM events WHERE {where}", params).fetchone()[0])
+    finally:
+        conn.close()
+
+
+def distinct_values(path: Path, column: str) -> List[str]:
+    """Distinct values of an indexed filter column (event_type, category, severity, user)."""
+    if column not in ("event_type", "category", "severity", "user") or not Path(path).exists():
+        return []
+    conn = connect(path, readonly=True)
+    try:
+        return [row[0] for row in conn.execute(f"SELECT DISTINCT {column} FROM events WHERE {column} IS NOT NULL "
+                                               f"ORDER BY {column}")]
+    finally:
+        conn.close()
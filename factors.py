@@ -0,0 +1,399 @@
+"""
+Factor return construction for portfolio analytics
+Builds daily sector, rates and volatility factor series from the merged trading dataset.
+Used by the factor-conditional stress scenarios.
+
+Exposure analysis adds momentum and size style factors and estimates factor betas
+for many return series at once: the normal equations of every series are built
+from one matrix product over per-date factor cross-products and solved as a
+single batched system. Betas through time (rolling window or exponentially
+weighted) update the same cross-products recursively, O(k^2) per series and date.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger("risk_analytics.factors")
+
+RATES_FACTOR = "rates_bps"
+VOL_FACTOR = "vol"
+MOMENTUM_FACTOR = "momentum"
+SIZE_FACTOR = "size"
+BETA_STATS = ["alpha", "r_squared", "observations"]
+
+
+def fixed_income_durations(
+    fixed_income: pd.DataFrame,
+    duration_col: Optional[str],
+    duration_map: Dict[str, float],
+    default_duration: float
+) -> pd.Series:
+    """
+    Per-row duration proxy for fixed income positions.
+    Prefers an explicit duration column, then the credit rating mapping, then the default.
+    """
+    if duration_col and duration_col in fixed_income.columns:
+        return pd.to_numeric(fixed_income[duration_col], errors="coerce").fillna(default_duration)
+    if "credit_rating" in fixed_income.columns:
+        return fixed_income["credit_rating"].map(duration_map).fillna(default_duration)
+    return pd.Series([default_duration] * len(fixed_income), index=fixed_income.index)
+
+
+def sector_factor_returns(
+    df: pd.DataFrame,
+    pnl_col: str,
+    sector_col: str = "sector",
+    exposure_col: str = "market_cap_usd"
+) -> pd.DataFrame:
+    """
+    Daily sector returns as sector P&L over sector exposure.
+    Returns a date x sector DataFrame (NaN where a sector did not trade).
+    """
+    if sector_col not in df.columns or exposure_col not in df.columns:
+        return pd.DataFrame()
+
+    grouped = df.groupby(["date", sector_col])[[pnl_col, exposure_col]].sum()
+    returns = grouped[pnl_col] / grouped[exposure_col].replace(0, np.nan)
+    return returns.unstack(sector_col).sort_index()
+
+
+def rates_factor_returns(
+    df: pd.DataFrame,
+    pnl_col: str,
+    duration_col: Optional[str],
+    duration_map: Dict[str, float],
+    default_duration: float
+) -> pd.Series:
+    """
+    Implied daily yield change (bps) backed out of fixed income returns.
+    A bond return r with duration D implies a yield move of -r / D.
+    """
+    if "asset_class" not in df.columns or "market_cap_usd" not in df.columns:
+        return pd.Series(dtype=float, name=RATES_FACTOR)
+
+    fixed_income = df[df["asset_class"].str.contains("Fixed Income", na=False)]
+    if fixed_income.empty:
+        return pd.Series(dtype=float, name=RATES_FACTOR)
+
+    fixed_income = fixed_income.assign(
+        _duration=fixed_income_durations(fixed_income, duration_col, duration_map, default_duration)
+    )
+    daily = fixed_income.groupby("date").agg(
+        pnl=(pnl_col, "sum"),
+        mv=("market_cap_usd", "sum"),
+        duration=("_duration", "mean"),
+    )
+    fi_return = daily["pnl"] / daily["mv"].replace(0, np.nan)
+    dy_bps = -fi_return / daily["duration"].replace(0, np.nan) * 10000.0
+    return dy_bps.rename(RATES_FACTOR).sort_index()
+
+
+def volatility_factor_changes(df: pd.DataFrame, vol_col: str = "volatility_30d") -> pd.Series:
+    """Daily change in average portfolio volatility (decimal vol points)."""
+    if vol_col not in df.columns:
+        return pd.Series(dtype=float, name=VOL_FACTOR)
+
+    avg_vol = df.groupby("date")[vol_col].mean().sort_index()
+    return avg_vol.diff().rename(VOL_FACTOR)
+
+
+def build_factor_returns(
+    df: pd.DataFrame,
+    pnl_col: str,
+    sector_col: str = "sector",
+    vol_col: str = "volatility_30d",
+    duration_col: Optional[str] = None,
+    duration_map: Optional[Dict[str, float]] = None,
+    default_duration: float = 5.0
+) -> pd.DataFrame:
+    """
+    Date x factor matrix of historical factor moves.
+    Columns are one per sector (returns), `rates_bps` (yield change in bps)
+    and `vol` (change in average volatility). Missing observations are NaN.
+    """
+    parts = [
+        sector_factor_returns(df, pnl_col, sector_col),
+        rates_factor_returns(df, pnl_col, duration_col, duration_map or {}, default_duration),
+        volatility_factor_changes(df, vol_col),
+    ]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame()
+
+    factors = pd.concat(parts, axis=1).sort_index()
+    factors.columns = [str(c) for c in factors.columns]
+    return factors
+
+
+def instrument_returns(
+    df: pd.DataFrame,
+    pnl_col: str,
+    instrument_col: str,
+    exposure_col: str = "market_cap_usd"
+) -> pd.DataFrame:
+    """
+    Daily instrument returns as instrument P&L over instrument exposure.
+    Returns a date x instrument DataFrame (NaN where an instrument did not trade).
+    """
+    if instrument_col not in df.columns or exposure_col not in df.columns:
+        return pd.DataFrame()
+
+    grouped = df.groupby(["date", instrument_col])[[pnl_col, exposure_col]].sum()
+    returns = grouped[pnl_col] / grouped[exposure_col].replace(0, np.nan)
+    return returns.unstack(instrument_col).sort_index()
+
+
+def _long_short(returns: pd.DataFrame, signal: pd.DataFrame, quantile: float) -> pd.Series:
+    """Per date, mean return of the top `quantile` of instruments by signal minus the bottom."""
+    pct = signal.where(returns.notna()).rank(axis=1, pct=True)
+    top = returns.where(pct > 1 - quantile).mean(axis=1)
+    bottom = returns.where(pct <= quantile).mean(axis=1)
+    return top - bottom
+
+
+def momentum_factor_returns(
+    inst_returns: pd.DataFrame,
+    lookback: int = 20,
+    quantile: float = 1 / 3
+) -> pd.Series:
+    """
+    Winners minus losers: instruments ranked each day by their trailing `lookback`-day
+    return (known at the previous close), top minus bottom `quantile` mean return.
+    """
+    if inst_returns.empty:
+        return pd.Series(dtype=float, name=MOMENTUM_FACTOR)
+
+    signal = inst_returns.rolling(lookback, min_periods=max(2, lookback // 2)).sum().shift(1)
+    return _long_short(inst_returns, signal, quantile).rename(MOMENTUM_FACTOR)
+
+
+def size_factor_returns(
+    df: pd.DataFrame,
+    inst_returns: pd.DataFrame,
+    instrument_col: str,
+    exposure_col: str = "market_cap_usd",
+    quantile: float = 0.3
+) -> pd.Series:
+    """
+    Small minus big: instruments ranked each day by market cap, bottom minus
+    top `quantile` mean return.
+    """
+    if inst_returns.empty or exposure_col not in df.columns:
+        return pd.Series(dtype=float, name=SIZE_FACTOR)
+
+    market_cap = df.groupby(["date", instrument_col])[exposure_col].mean().unstack(instrument_col)
+    market_cap = market_cap.reindex(index=inst_returns.index, columns=inst_returns.columns)
+    return _long_short(inst_returns, -market_cap, quantile).rename(SIZE_FACTOR)
+
+
+def build_exposure_factors(
+    df: pd.DataFrame,
+    pnl_col: str,
+    instrument_col: str,
+    momentum_lookback: int = 20,
+    inst_returns: Optional[pd.DataFrame] = None,
+    **factor_kwargs
+) -> pd.DataFrame:
+    """
+    Date x factor matrix for exposure analysis: build_factor_returns (sectors,
+    `rates_bps`, `vol`) plus the `momentum` and `size` style factors.
+    """
+    if inst_returns is None:
+        inst_returns = instrument_returns(df, pnl_col, instrument_col)
+    parts = [
+        build_factor_returns(df, pnl_col, **factor_kwargs),
+        momentum_factor_returns(inst_returns, momentum_lookback),
+        size_factor_returns(df, inst_returns, instrument_col),
+    ]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts, axis=1).sort_index()
+
+
+def _design(factors: pd.DataFrame):
+    """
+    Standardized design matrix [1, z] over the factor dates, with the factor
+    means and scales to map betas back. A missing factor move (e.g. a sector
+    with no trades that day) counts as a zero move, as in the stress factor
+    covariance; only dates with no factor observed at all are dropped.
+    """
+    factors = factors.dropna(how="all").fillna(0.0)
+    values = factors.to_numpy(dtype=float)
+    mean = values.mean(axis=0) if len(values) else np.zeros(values.shape[1])
+    scale = values.std(axis=0) if len(values) else np.ones(values.shape[1])
+    # Constant factors carry no information: zero column, beta reported as NaN
+    usable = scale > 0
+    z = np.where(usable, (values - mean) / np.where(usable, scale, 1.0), 0.0)
+    return factors.index, np.column_stack([np.ones(len(z)), z]), mean, scale, usable
+
+
+def _solve_normal(xtx: np.ndarray, xty: np.ndarray) -> np.ndarray:
+    """Batched solve of (..., k, k) normal equations; pseudo-inverse where singular."""
+    return (np.linalg.pinv(xtx, hermitian=True) @ xty[..., None])[..., 0]
+
+
+def _to_raw(coef: np.ndarray, mean: np.ndarray, scale: np.ndarray, usable: np.ndarray):
+    """(alpha, betas) in the factors' own units from coefficients on [1, z]."""
+    betas = np.where(usable, coef[..., 1:] / np.where(usable, scale, 1.0), np.nan)
+    alpha = coef[..., 0] - np.nansum(betas * mean, axis=-1)
+    return alpha, betas
+
+
+def factor_betas(
+    returns: pd.DataFrame,
+    factors: pd.DataFrame,
+    min_obs: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    OLS factor betas (with intercept) of every return series in one batched solve.
+
+    Each series uses the dates where it is observed and any factor is (missing
+    factor moves count as zero, see _design). Series
+    observed on every date share one set of normal equations; the rest get
+    theirs from one masked matrix product, and all are solved together.
+
+    Args:
+        returns: date x series returns
+        factors: date x factor moves (e.g. build_exposure_factors)
+        min_obs: fewest observations for an estimate (default: 2 x regressors)
+
+    Returns:
+        series x (alpha, r_squared, observations, one beta column per factor);
+        NaN where a series has too few observations
+    """
+    columns = BETA_STATS + [str(c) for c in factors.columns]
+    if returns.empty or factors.empty:
+        return pd.DataFrame(columns=columns, index=returns.columns, dtype=float)
+
+    dates, x, mean, scale, usable = _design(factors)
+    y = returns.reindex(dates).to_numpy(dtype=float)
+    mask = ~np.isnan(y)
+    y0 = np.where(mask, y, 0.0)
+    n_obs = mask.sum(axis=0)
+    k = x.shape[1]
+    min_obs = 2 * k if min_obs is None else min_obs
+
+    full = mask.all(axis=0)
+    if full.all():
+        xtx = np.broadcast_to(x.T @ x, (y.shape[1], k, k))
+    else:
+        # Per-series X'MX from the per-date outer products x_t x_t', one matmul for all series
+        outer = (x[:, :, None] * x[:, None, :]).reshape(len(x), k * k)
+        xtx = (mask.T.astype(float) @ outer).reshape(-1, k, k)
+    coef = _solve_normal(xtx, (x.T @ y0).T)
+
+    fitted = x @ coef.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y_mean = y0.sum(axis=0) / n_obs
+        ss_res = (np.where(mask, y0 - fitted, 0.0) ** 2).sum(axis=0)
+        ss_tot = (np.where(mask, y0 - y_mean, 0.0) ** 2).sum(axis=0)
+        r_squared = 1.0 - ss_res / ss_tot
+
+    alpha, betas = _to_raw(coef, mean, scale, usable)
+    result = pd.DataFrame(
+        np.column_stack([alpha, r_squared, n_obs, betas]),
+        index=returns.columns,
+        columns=columns,
+    )
+    result.loc[n_obs < min_obs, columns[:2] + columns[3:]] = np.nan
+    result["observations"] = n_obs
+    return result
+
+
+def iter_rolling_factor_betas(
+    returns: pd.DataFrame,
+    factors: pd.DataFrame,
+    window: Optional[int] = 60,
+    halflife: Optional[float] = None,
+    min_obs: Optional[int] = None
+) -> Iterator[Tuple[object, np.ndarray]]:
+    """
+    Yield (date, series x factor betas) for every factor date.
+
+    The per-series cross-products X'MX and X'My are updated with the entering
+    row and, for a rolling window, down-dated with the leaving one; with a
+    halflife they decay exponentially instead (window ignored), and window=None
+    without a halflife is an expanding window. Memory stays O(series x k^2)
+    however long the history is. Betas are NaN until a series has min_obs
+    observations in the window (default: 2 x regressors); with a halflife the
+    observation count decays too, so min_obs applies to the effective weight
+    and is lowered (with a warning) when the halflife caps that weight below it.
+    """
+    if window is not None and window < 1:
+        raise ValueError(f"window must be a positive number of dates or None (expanding), got {window}")
+    dates, x, mean, scale, usable = _design(factors)
+    y = returns.reindex(dates).to_numpy(dtype=float)
+    mask = ~np.isnan(y)
+    y0 = np.where(mask, y, 0.0)
+    m = mask.astype(float)
+    n_series, k = y.shape[1], x.shape[1]
+    min_obs = 2 * k if min_obs is None else min_obs
+    decay = 0.5 ** (1.0 / halflife) if halflife else None
+    if decay is not None and min_obs > 1.0 / (1.0 - decay):
+        # The decayed count only approaches the cap, so use the largest whole count below it
+        cap = 1.0 / (1.0 - decay)
+        clamped = max(int(np.ceil(cap)) - 1, 1)
+        logger.warning(f"halflife {halflife} caps the effective weight at {cap:.1f} observations; "
+                       f"lowering min_obs from {min_obs} to {clamped}")
+        min_obs = clamped
+
+    xtx = np.zeros((n_series, k, k))
+    xty = np.zeros((n_series, k))
+    count = np.zeros(n_series)
+    for t, date in enumerate(dates):
+        if decay is not None:
+            xtx *= decay
+            xty *= decay
+            count *= decay
+            updates = ((t, 1.0),)
+        elif window is None:
+            updates = ((t, 1.0),)
+        else:
+            updates = ((t, 1.0), (t - window, -1.0))
+        for row, sign in updates:
+            if row < 0:
+                continue
+            w = sign * m[row]
+            xtx += w[:, None, None] * np.outer(x[row], x[row])
+            xty += np.outer(y0[row] * sign, x[row])
+            count += w
+        betas = np.full((n_series, k - 1), np.nan)
+        ready = count >= min_obs - 1e-9
+        if ready.any():
+            try:
+                coef = np.linalg.solve(xtx[ready], xty[ready][..., None])[..., 0]
+            except np.linalg.LinAlgError:
+                coef = _solve_normal(xtx[ready], xty[ready])
+            betas[ready] = _to_raw(coef, mean, scale, usable)[1]
+        yield date, betas
+
+
+def rolling_factor_betas(
+    returns: pd.DataFrame,
+    factors: pd.DataFrame,
+    window: Optional[int] = 60,
+    halflife: Optional[float] = None,
+    min_obs: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Factor betas through the whole history as a date x series x factor cube:
+    a DataFrame indexed by (date, series) with one column per factor, so
+    `.to_numpy().reshape(dates, series, factors)` gives the array form.
+    See iter_rolling_factor_betas for the window / halflife options.
+    """
+    columns = [str(c) for c in factors.columns]
+    index_names = ["date", "series"]
+    if returns.empty or factors.empty:
+        return pd.DataFrame(columns=columns, index=pd.MultiIndex.from_arrays([[], []], names=index_names))
+
+    dates, cube = [], []
+    for date, betas in iter_rolling_factor_betas(returns, factors, window, halflife, min_obs):
+        dates.append(date)
+        cube.append(betas)
+    index = pd.MultiIndex.from_product([dates, [str(c) for c in returns.columns]], names=index_names)
+    return pd.DataFrame(np.concatenate(cube) if cube else np.empty((0, len(columns))),
+                        index=index, columns=columns)
@@ -0,0 +1,262 @@
+"""
+Declarative limit monitoring for Risk Analytics Platform
+Limits are rules read from the `limits` section of the config. Each rule names a
+source table, a metric column, a direction and a limit. A rule is evaluated over
+the whole history of its source in one vectorized pass. The breach state uses
+hysteresis: it switches on when the limit is crossed and off only once the value
+recovers past a clear level. Runs of breached observations become events with
+start/end, worst value and severity.
+
+    limits:
+      hysteresis: 0.05            # default clear band, as a fraction of |limit|
+      rules:
+        - name: var_95
+          source: daily_risk_metrics
+          metric: VaR_95
+          direction: below        # breach when value < limit ("above": value > limit)
+          limit: -10.0
+          severity: CRITICAL
+          category: Market Risk
+          label: VaR 95%
+          recommendation: Reduce portfolio risk exposure immediately.
+
+Optional rule keys: abs (compare |value|), clear (explicit clear level),
+hysteresis, date_col (column holding the date, default: the index), reduce
+("max"/"min": collapse a cross-sectional table to one observation), label_col
+(column whose value at the worst point is appended to the label) and
+display_scale (multiplier for display, e.g. 100 for weights).
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger("risk_analytics.limits")
+
+SEVERITIES = ("CRITICAL", "HIGH", "MEDIUM")
+DIRECTIONS = ("below", "above")
+DEFAULT_HYSTERESIS = 0.05
+
+EVENT_COLUMNS = [
+    "rule", "source", "metric", "label", "category", "severity", "direction", "limit", "clear_level",
+    "start", "end", "observations", "active", "worst_value", "current_value", "breach_pct",
+    "display_scale", "recommendation",
+]
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {"name": "var_95", "source": "daily_risk_metrics", "metric": "VaR_95", "date_col": "date",
+     "direction": "below", "limit": -10.0, "severity": "CRITICAL", "category": "Market Risk", "label": "VaR 95%",
+     "recommendation": "Reduce portfolio risk exposure immediately. Consider hedging strategies."},
+    {"name": "var_99", "source": "daily_risk_metrics", "metric": "VaR_99", "date_col": "date",
+     "direction": "below", "limit": -40.0, "severity": "CRITICAL", "category": "Market Risk", "label": "VaR 99%",
+     "recommendation": "Extreme risk breach. Initiate emergency risk reduction protocol."},
+    {"name": "es_95", "source": "daily_risk_metrics", "metric": "ES_95", "date_col": "date",
+     "direction": "below", "limit": -50.0, "severity": "HIGH", "category": "Tail Risk", "label": "ES 95%",
+     "recommendation": "Tail risk elevated. Review extreme scenario exposure."},
+    {"name": "es_99", "source": "daily_risk_metrics", "metric": "ES_99", "date_col": "date",
+     "direction": "below", "limit": -150.0, "severity": "CRITICAL", "category": "Tail Risk", "label": "ES 99%",
+     "recommendation": "Critical tail risk breach. Engage risk committee immediately."},
+    {"name": "sector_concentration", "source": "concentration_metrics", "metric": "max_weight",
+     "direction": "above", "limit": 0.15, "severity": "HIGH", "category": "Concentration Risk",
+     "label": "Sector", "label_col": "max_weight_bucket", "display_scale": 100,
+     "recommendation": "Reduce the largest sector exposure below the concentration limit."},
+    {"name": "single_position", "source": "target_weights", "metric": "Target Weight", "direction": "above",
+     "limit": 0.10, "reduce": "max", "severity": "MEDIUM", "category": "Position Limit", "label": "Position",
+     "label_col": "Instrument", "display_scale": 100,
+     "recommendation": "Trim the largest position below the single-position limit."},
+    {"name": "slippage", "source": "tca_summary", "metric": "avg_slippage_bps", "abs": True, "direction": "above",
+     "limit": 10.0, "severity": "MEDIUM", "category": "Execution Quality", "label": "Slippage",
+     "recommendation": "Review execution strategy. Consider smaller order sizes or different venues."},
+    {"name": "market_impact", "source": "tca_summary", "metric": "avg_market_impact_bps", "abs": True,
+     "direction": "above", "limit": 15.0, "severity": "MEDIUM", "category": "Execution Quality",
+     "label": "Market Impact",
+     "recommendation": "High market impact detected. Use algorithmic execution for large orders."},
+    {"name": "max_drawdown", "source": "drawdowns", "metric": "drawdown", "date_col": "date", "direction": "below",
+     "limit": -0.20, "severity": "HIGH", "category": "Drawdown", "label": "Maximum Drawdown", "display_scale": 100,
+     "recommendation": "Portfolio drawdown exceeds limit. Implement stop-loss measures."},
+]
+
+
+def load_rules(config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Limit rules from config["limits"] (DEFAULT_RULES when absent), validated and
+    with the default hysteresis filled in.
+    """
+    section = (config or {}).get("limits", {}) or {}
+    hysteresis = float(section.get("hysteresis", DEFAULT_HYSTERESIS))
+    rules = []
+    for raw in section.get("rules", DEFAULT_RULES):
+        rule = {"hysteresis": hysteresis, "severity": "MEDIUM", "category": "Risk Limit", **raw}
+        for key in ("name", "source", "metric", "limit"):
+            if key not in rule:
+                raise ValueError(f"Limit rule {raw} is missing '{key}'")
+        if rule.get("direction", "above") not in DIRECTIONS:
+            raise ValueError(f"Limit rule '{rule['name']}': direction must be one of {DIRECTIONS}")
+        if rule["severity"] not in SEVERITIES:
+            raise ValueError(f"Limit rule '{rule['name']}': severity must be one of {SEVERITIES}")
+        rules.append(rule)
+    return rules
+
+
+def clear_level(rule: Dict[str, Any]) -> float:
+    """Level the value must recover past for a breach to end."""
+    if "clear" in rule:
+        return float(rule["clear"])
+    limit = float(rule["limit"])
+    band = float(rule.get("hysteresis", DEFAULT_HYSTERESIS)) * abs(limit)
+    return limit + band if rule.get("direction", "above") == "below" else limit - band
+
+
+def _rule_series(rule: Dict[str, Any], frame: pd.DataFrame):
+    """(values, labels) for a rule: the metric per observation and the optional label column."""
+    data = frame
+    date_col = rule.get("date_col")
+    if date_col and date_col in data.columns:
+        data = data.set_index(date_col)
+        # Dates often arrive as datetime.date objects; a DatetimeIndex makes them a time series
+        data.index = pd.DatetimeIndex(pd.to_datetime(data.index, errors="coerce"), name=date_col)
+    values = pd.to_numeric(data[rule["metric"]], errors="coerce")
+    labels = data[rule["label_col"]] if rule.get("label_col") in data.columns else None
+
+    reduce = rule.get("reduce")
+    if reduce:
+        compare = values.abs() if rule.get("abs") else values
+        pos = compare.to_numpy().argmax() if reduce == "max" else compare.to_numpy().argmin()
+        values = values.iloc[[pos]]
+        labels = labels.iloc[[pos]] if labels is not None else None
+    if rule.get("abs"):
+        values = values.abs()
+    return values, labels
+
+
+def breach_state(values: np.ndarray, rule: Dict[str, Any]) -> np.ndarray:
+    """
+    Boolean breach state per observation with hysteresis: on when the limit is
+    crossed, held until the value recovers past clear_level(rule). Missing
+    values hold the previous state.
+    """
+    limit, clear = float(rule["limit"]), clear_level(rule)
+    with np.errstate(invalid="ignore"):
+        if rule.get("direction", "above") == "below":
+            enter, leave = values < limit, values >= clear
+        else:
+            enter, leave = values > limit, values <= clear
+    # 1 on entry, 0 on recovery, NaN in the band (or missing): forward-fill carries the state
+    marks = np.where(enter, 1.0, np.where(leave, 0.0, np.nan))
+    return pd.Series(marks).ffill().fillna(0.0).to_numpy() > 0
+
+
+def rule_events(rule: Dict[str, Any], frame: pd.DataFrame):
+    """
+    Evaluate one rule over a source table.
+
+    Returns:
+        (events DataFrame with EVENT_COLUMNS, breach state Series indexed like the source)
+    """
+    values, labels = _rule_series(rule, frame)
+    v = values.to_numpy(dtype=float)
+    state = breach_state(v, rule)
+    state_series = pd.Series(state, index=values.index, name=rule["name"])
+    if not state.any():
+        return pd.DataFrame(columns=EVENT_COLUMNS), state_series
+
+    edges = np.diff(np.r_[0, state.astype(np.int8), 0])
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+
+    # Worst value per event: segment reductions over the breached runs
+    below = rule.get("direction", "above") == "below"
+    filled = np.where(np.isnan(v), np.inf if below else -np.inf, v)
+    worst = (np.minimum if below else np.maximum).reduceat(filled, starts)
+    lengths = ends - starts + 1
+    segment = np.repeat(np.arange(len(starts)), lengths)
+    positions = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths) + np.arange(lengths.sum())
+    worst_pos = positions[_first_true(filled[positions] == worst[segment], segment)]
+
+    limit = float(rule["limit"])
+    label = rule.get("label", rule["metric"])
+    index = values.index
+    events = pd.DataFrame({
+        "rule": rule["name"],
+        "source": rule["source"],
+        "metric": rule["metric"],
+        "label": (label + ": " + labels.iloc[worst_pos].astype(str).to_numpy()) if labels is not None else label,
+        "category": rule["category"],
+        "severity": rule["severity"],
+        "direction": rule.get("direction", "above"),
+        "limit": limit,
+        "clear_level": clear_level(rule),
+        "start": index[starts],
+        "end": index[ends],
+        "observations": lengths,
+        "active": ends == len(v) - 1,
+        "worst_value": worst,
+        "current_value": v[ends],
+        "breach_pct": np.abs(worst - limit) / abs(limit) * 100 if limit else np.nan,
+        "display_scale": float(rule.get("display_scale", 1)),
+        "recommendation": rule.get("recommendation", ""),
+    })
+    return events, state_series
+
+
+def _first_true(mask: np.ndarray, segment: np.ndarray) -> np.ndarray:
+    """Mask keeping only the first True of each segment (segments are contiguous)."""
+    first = np.zeros(len(mask), dtype=bool)
+    hits = np.flatnonzero(mask)
+    if len(hits):
+        seg = segment[hits]
+        keep = np.r_[True, seg[1:] != seg[:-1]]
+        first[hits[keep]] = True
+    return first
+
+
+def evaluate_limits(rules: List[Dict[str, Any]], sources: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Evaluate every rule whose source table and metric are available.
+
+    Args:
+        rules: rules from load_rules
+        sources: source name -> table (rows are observations, oldest first)
+
+    Returns:
+        {"events": breach events (EVENT_COLUMNS, active first, then by severity),
+         "history": date x severity count of rules in breach (time-series sources only)}
+    """
+    events, states = [], []
+    for rule in rules:
+        frame = sources.get(rule["source"])
+        if frame is None or frame.empty or rule["metric"] not in frame.columns:
+            continue
+        rule_ev, state = rule_events(rule, frame)
+        events.append(rule_ev)
+        if rule.get("reduce"):
+            continue
+        if isinstance(state.index, pd.DatetimeIndex):
+            states.append((rule["severity"], state))
+        else:
+            logger.warning(f"Limit rule '{rule['name']}': source '{rule['source']}' has no dates "
+                           f"(set date_col); breaches are numbered by row and left out of the history")
+
+    frames = [e for e in events if not e.empty]
+    if frames:
+        events = pd.concat(frames, ignore_index=True)
+        order = events["severity"].map({s: i for i, s in enumerate(SEVERITIES)})
+        events = events.assign(_order=order).sort_values(
+            ["active", "_order"], ascending=[False, True], kind="stable"
+        ).drop(columns="_order").reset_index(drop=True)
+    else:
+        events = pd.DataFrame(columns=EVENT_COLUMNS)
+
+    history = pd.DataFrame(columns=list(SEVERITIES))
+    if states:
+        # Align all rule states on the union of dates; a rule is out of breach where it has no data
+        active = pd.concat([s.rename(i) for i, (_, s) in enumerate(states)], axis=1).fillna(False).astype(int)
+        severity = pd.Series([sev for sev, _ in states], index=active.columns)
+        history = active.T.groupby(severity).sum().T.reindex(columns=list(SEVERITIES), fill_value=0)
+        history.index.name = "date"
+
+    n_active = int(events["active"].sum()) if len(events) else 0
+    logger.info(f"Limits: {len(rules)} rules, {len(events)} breach events ({n_active} active)")
+    return {"events": events, "history": history}
@@ -17,9 +17,29 @@ import pandas as pd
 import numpy as np
 
 # Local imports
-from risk_analytics.utils import load_config, ensure_dirs, try_git_commit_hash, sha256
-from risk_analytics.risk_models import calculate_var_es, calculate_drawdowns, calculate_performance
-from risk_analytics.stress import sector_shock_impact, rates_shock_impact, volatility_shock_impact
+from risk_analytics.utils import load_config, ensure_dirs, try_git_commit_hash, sha256_many
+from risk_analytics.risk_models import (
+    calculate_var_es,
+    calculate_drawdowns,
+    calculate_performance,
+    rolling_var_es,
+    rolling_age_weighted_var_es,
+    rolling_filtered_var_es,
+    stressed_var_es,
+)
+from risk_analytics.stress import run_stress_scenario, clear_factor_cache
+from risk_analytics.scenario_executor import execute_scenarios
+from risk_analytics.factors import (
+    build_factor_returns, build_exposure_factors, instrument_returns, factor_betas, rolling_factor_betas
+)
+from risk_analytics.evt import gpd_tail_var_es
+from risk_analytics.hierarchy import hierarchy_risk
+from risk_analytics.concentration import sector_weight_history, concentration_metrics
+from risk_analytics.correlation import correlation_matrix, METHODS as CORRELATION_METHODS
+from risk_analytics.limits import load_rules, evaluate_limits
+from risk_analytics.positions import build_position_ledger, ledger_exposures, ledger_long, exposures_long
+from risk_analytics.report_writer import report_job, run_report_jobs
+from risk_analytics.results_store import flatten_results
 from risk_analytics.reporting import (
     save_var_results,
     save_drawdowns,
@@ -27,10 +47,21 @@ from risk_analytics.reporting import (
     save_stress_summary,
     save_strategy_results,
     save_exposures,
+    save_stressed_var,
+    save_tail_risk,
+    save_hierarchy_risk,
+    save_positions,
+    save_limit_events,
+    save_factor_exposures,
+    save_event_store,
+    save_dashboard_bundle,
     save_audit_log,
     save_csvs,
-    save_plots,
+    save_results_store,
+    performance_plot_specs,
+    strategy_plot_specs,
 )
+from risk_analytics.plotting import render_line_chart
 
 # ... rest of the code stays the same
 # --------------------------------------
@@ -44,14 +75,18 @@ logging.basicConfig(
 )
 
 
-def calculate_rolling_var_es(pnl_series, window=30, levels=None):
+def calculate_rolling_var_es(pnl_series, window=30, levels=None, method="historical", lam=None):
     """
     Calculate rolling VaR and ES metrics using a sliding window.
+    Vectorized via risk_models.rolling_var_es (same values as calculate_var_es per window).
     
     Args:
         pnl_series: pandas Series of P&L values
         window: rolling window size (default 30 days)
         levels: confidence levels (default [0.95, 0.99])
+        method: "historical" (equal weights), "age_weighted" (BRW) or
+            "filtered" (Hull-White EWMA volatility scaling)
+        lam: decay factor for age_weighted / filtered (defaults 0.98 / 0.94)
     
     Returns:
         DataFrame with rolling VaR and ES metrics
@@ -59,23 +94,24 @@ def calculate_rolling_var_es(pnl_series, window=30, levels=None):
     if levels is None:
         levels = [0.95, 0.99]
     
-    results = []
-    
     # Ensure we have enough data
     if len(pnl_series) < window:
         logger.warning(f"Insufficient data for rolling VaR calculation. Need {window}, have {len(pnl_series)}")
         return pd.DataFrame()
     
-    for i in range(window, len(pnl_series) + 1):
-        window_data = pnl_series.iloc[i-window:i]
-        
-        var_es = calculate_var_es(window_data, levels=levels)
-        results.append(var_es)
+    if method == "age_weighted":
+        rolling = rolling_age_weighted_var_es(pnl_series, window, levels, lam=lam or 0.98)
+    elif method == "filtered":
+        rolling = rolling_filtered_var_es(pnl_series, window, levels, lam=lam or 0.94)
+    elif method == "historical":
+        rolling = rolling_var_es(pnl_series, window=window, levels=levels)
+    else:
+        raise ValueError(f"Unknown VaR method '{method}'")
     
-    return pd.DataFrame(results)
+    return rolling.reset_index(drop=True)
 
 
-def calculate_daily_stress_scenarios(df, date, nav_today, config):
+def calculate_daily_stress_scenarios(df, date, nav_today, config, factor_returns=None):
     """
     Calculate stress test scenarios for a specific date.
     
@@ -84,6 +120,7 @@ def calculate_daily_stress_scenarios(df, date, nav_today, config):
         date: specific date to analyze
         nav_today: NAV value for this date
         config: configuration dictionary
+        factor_returns: date x factor history for conditional scenarios (optional)
     
     Returns:
         Dictionary with stress test results
@@ -106,36 +143,9 @@ def calculate_daily_stress_scenarios(df, date, nav_today, config):
     # Calculate each stress scenario
     for name, s in config["stress_scenarios"]["scenarios"].items():
         try:
-            if s["type"] == "sector":
-                result = sector_shock_impact(
-                    day_df,
-                    s["sector_col"],
-                    s["target_sector"],
-                    s["shock_pct"],
-                    nav_series,
-                )
-                stress_results[name] = result.get('impact_pct', 0.0)
-                
-            elif s["type"] == "rates":
-                result = rates_shock_impact(
-                    day_df,
-                    s["delta_bps"],
-                    s["proxy_duration_col"],
-                    nav_series,
-                    config["mappings"]["duration_from_credit_rating"],
-                    config["mappings"]["default_duration"],
-                )
-                stress_results[name] = result.get('impact_pct', 0.0)
-                
-            elif s["type"] == "vol":
-                result = volatility_shock_impact(
-                    day_df,
-                    s["vol_col"],
-                    s["vol_mult"],
-                    nav_series,
-                )
+            result = run_stress_scenario(day_df, s, nav_series, config, factor_returns, as_of=date)
+            if result is not None:
                 stress_results[name] = result.get('impact_pct', 0.0)
-                
         except Exception as e:
             logger.warning(f"Stress scenario '{name}' failed for date {date}: {e}")
             stress_results[name] = 0.0
@@ -143,7 +153,7 @@ def calculate_daily_stress_scenarios(df, date, nav_today, config):
     return stress_results
 
 
-def generate_daily_risk_metrics(df, pnl_col, nav_series, config, window=30):
+def generate_daily_risk_metrics(df, pnl_col, nav_series, config, window=30, factor_returns=None):
     """
     Generate daily risk metrics including VaR, ES, and stress tests.
     This creates the time-series data required by the dashboard.
@@ -154,6 +164,7 @@ def generate_daily_risk_metrics(df, pnl_col, nav_series, config, window=30):
         nav_series: pandas Series of NAV values by date
         config: configuration dictionary
         window: rolling window for VaR/ES calculation
+        factor_returns: date x factor history for conditional scenarios (optional)
     
     Returns:
         DataFrame with daily risk metrics
@@ -171,7 +182,26 @@ def generate_daily_risk_metrics(df, pnl_col, nav_series, config, window=30):
     daily_pnl = df.groupby('date')[pnl_col].sum().sort_index()
     
     # Calculate rolling VaR/ES
-    rolling_var_es = calculate_rolling_var_es(daily_pnl, window=window, levels=config["risk"]["var_levels"])
+    var_method = config["risk"].get("var_method", "historical")
+    var_lambda = config["risk"].get("brw_lambda") if var_method == "age_weighted" \
+        else config["risk"].get("ewma_lambda")
+    logger.info(f"VaR method: {var_method}")
+    rolling_var_es = calculate_rolling_var_es(
+        daily_pnl,
+        window=window,
+        levels=config["risk"]["var_levels"],
+        method=var_method,
+        lam=var_lambda,
+    )
+    
+    # Stress scenarios for every date in one sharded batch (same semantics as
+    # calculate_daily_stress_scenarios: failed scenarios count as 0.0)
+    scenarios = config["stress_scenarios"]["scenarios"]
+    daily_stress, stress_failures = execute_scenarios(
+        df, scenarios, nav_series, config, factor_returns, dates=dates[window-1:],
+    )
+    for failure in stress_failures:
+        daily_stress[(failure["date"], failure["scenario"])] = {'impact_pct': 0.0}
     
     # Initialize results list
     risk_metrics_list = []
@@ -185,15 +215,11 @@ def generate_daily_risk_metrics(df, pnl_col, nav_series, config, window=30):
         else:
             var_es = {}
         
-        # Get NAV for this date
-        nav_today = nav_series[nav_series.index == date]
-        if len(nav_today) > 0:
-            nav_value = float(nav_today.iloc[0])
-        else:
-            nav_value = float(nav_series.iloc[-1])
-        
-        # Calculate stress scenarios for this date
-        stress = calculate_daily_stress_scenarios(df, date, nav_value, config)
+        # Stress scenarios for this date
+        stress = {
+            name: daily_stress[(date, name)].get('impact_pct', 0.0)
+            for name in scenarios if (date, name) in daily_stress
+        }
         
         # Combine all metrics
         daily_metrics = {
@@ -206,6 +232,8 @@ def generate_daily_risk_metrics(df, pnl_col, nav_series, config, window=30):
             'Volatility_Spike': stress.get('Volatility_Spike', 0.0),
             'Sector_Drawdown': stress.get('Sector_Drawdown', 0.0),
         }
+        # Any additional configured scenarios (e.g. conditional) as extra columns
+        daily_metrics.update({k: v for k, v in stress.items() if k not in daily_metrics})
         
         risk_metrics_list.append(daily_metrics)
     
@@ -217,11 +245,51 @@ def generate_daily_risk_metrics(df, pnl_col, nav_series, config, window=30):
     return daily_risk_metrics
 
 
-def calculate_sector_exposure(df, config):
+def calculate_position_exposures(df, config):
+    """
+    Rebuild end-of-day positions from the trade stream and aggregate them into
+    per-date sector / asset-class exposure matrices.
+    
+    Args:
+        df: merged trading DataFrame
+        config: configuration dictionary
+    
+    Returns:
+        (ledger, exposures): date x instrument quantity/price/market_value and
+        "<bucket>_net" / "<bucket>_gross" date x bucket exposures; both empty
+        when the trades carry no quantity
+    """
+    if "quantity" not in df.columns:
+        logger.warning("quantity column missing. Skipping position ledger.")
+        return {}, {}
+    
+    instrument_col = config["data"]["instrument_column"]
+    ledger = build_position_ledger(df, instrument_col, config["data"]["timestamp_column"])
+    exposures = ledger_exposures(ledger, df, instrument_col)
+    return ledger, exposures
+
+
+def calculate_sector_exposure(df, config, exposures=None):
     """
     Calculate sector exposure as percentage of total portfolio value.
-    Uses all positions, not just latest date.
+    Uses end-of-day gross market value of the latest holdings from the position
+    ledger; without a ledger, falls back to summing market_cap_usd over all rows.
     """
+    if exposures and not exposures.get("sector_gross", pd.DataFrame()).empty:
+        latest = exposures["sector_gross"].iloc[-1]
+        total_value = latest.sum()
+        if total_value == 0:
+            logger.warning("Total portfolio value is zero. Cannot calculate sector exposure.")
+            return pd.DataFrame(columns=['sector', 'portfolio_weight'])
+        sector_exposure = pd.DataFrame({
+            'sector': latest.index.astype(str),
+            'portfolio_weight': (latest / total_value).to_numpy(),
+        })
+        logger.info(f"Calculated exposure for {len(sector_exposure)} sectors "
+                    f"(holdings as of {exposures['sector_gross'].index[-1].date()})")
+        logger.info(f"Sector breakdown:\n{sector_exposure.to_string()}")
+        return sector_exposure
+    
     if 'sector' not in df.columns or 'market_cap_usd' not in df.columns:
         logger.warning("Sector or market_cap_usd column missing. Skipping sector exposure.")
         return pd.DataFrame(columns=['sector', 'portfolio_weight'])
@@ -292,7 +360,8 @@ def calculate_portfolio_risk_return(nav_series, config):
     return portfolio_metrics
 
 
-def save_dashboard_csvs(daily_risk_metrics, sector_exposure, portfolio_risk_return, output_dir):
+def save_dashboard_csvs(daily_risk_metrics, sector_exposure, portfolio_risk_return, output_dir,
+                        sector_weights=None, concentration=None):
     """
     Save CSV files in the format required by the dashboard.
     
@@ -301,6 +370,8 @@ def save_dashboard_csvs(daily_risk_metrics, sector_exposure, portfolio_risk_retu
         sector_exposure: DataFrame with sector exposures
         portfolio_risk_return: DataFrame with portfolio metrics
         output_dir: output directory path
+        sector_weights: date x sector weight history (optional)
+        concentration: per-date concentration metrics (optional)
     """
     # Create subdirectories
     risk_dir = output_dir / "Risk Analytics Module"
@@ -322,220 +393,498 @@ def save_dashboard_csvs(daily_risk_metrics, sector_exposure, portfolio_risk_retu
         sector_exposure.to_csv(risk_dir / "sector_exposure.csv", index=False)
         logger.info(f"Saved sector_exposure.csv with {len(sector_exposure)} sectors")
     
+    # Save sector weight and concentration history (dashboard concentration views read these)
+    if sector_weights is not None and not sector_weights.empty:
+        sector_weights.to_csv(risk_dir / "sector_weights_history.csv", index=True)
+        logger.info(f"Saved sector_weights_history.csv with {len(sector_weights)} dates")
+    if concentration is not None and not concentration.empty:
+        concentration.to_csv(risk_dir / "concentration_metrics.csv", index=True)
+        logger.info(f"Saved concentration_metrics.csv with {len(concentration)} dates")
+    
     # Save portfolio risk/return
     if not portfolio_risk_return.empty:
         portfolio_risk_return.to_csv(portfolio_dir / "portfolio_risk_return.csv", index=False)
         logger.info(f"Saved portfolio_risk_return.csv")
 
 
-def main():
-    try:
-        # ==========================
-        # 1. Load Config
-        # ==========================
-        project_root = Path(__file__).resolve().parents[2]
-        cfg_path = project_root / "configs" / "risk_config.yaml"
-        config = load_config(str(cfg_path))
+# Risk horizons offered by the dashboard (square-root-of-time scaling)
+DASHBOARD_HORIZONS = {"1-Day": 1, "5-Day": 5, "10-Day": 10, "Monthly": 22}
+DASHBOARD_RISK_COLS = ["VaR_95", "ES_95", "VaR_99", "ES_99"]
+DASHBOARD_STRESS_COLS = ["Rate_Shock", "Volatility_Spike", "Sector_Drawdown"]
 
-        output_dir = project_root / config["reporting"]["output_dir"]
-        ensure_dirs(output_dir)
 
-        logger.info(f"Config loaded from {cfg_path}")
+def build_dashboard_tables(daily_risk_metrics, correlation_window=100):
+    """
+    Aggregates the dashboard would otherwise derive on every rerun.
+    
+    Args:
+        daily_risk_metrics: DataFrame with daily risk metrics
+        correlation_window: trailing days for the default correlation matrices
+    
+    Returns:
+        Dictionary of DataFrames: risk_horizons (latest VaR/ES per horizon and
+        scale factor) and risk_correlations (long: row, column, value, method,
+        window for pearson, spearman and kendall)
+    """
+    tables = {}
+    
+    risk_cols = [c for c in DASHBOARD_RISK_COLS if c in daily_risk_metrics.columns]
+    if not daily_risk_metrics.empty and risk_cols:
+        latest = daily_risk_metrics[risk_cols].iloc[-1]
+        tables["risk_horizons"] = pd.DataFrame([
+            {"horizon": name, "days": days, "scale": float(np.sqrt(days)),
+             **(latest * np.sqrt(days)).to_dict()}
+            for name, days in DASHBOARD_HORIZONS.items()
+        ])
+    
+    corr_cols = [c for c in DASHBOARD_RISK_COLS + DASHBOARD_STRESS_COLS if c in daily_risk_metrics.columns]
+    if len(corr_cols) > 1:
+        recent = daily_risk_metrics[corr_cols].tail(correlation_window)
+        matrices = {method: correlation_matrix(recent, method) for method in CORRELATION_METHODS}
+        tables["risk_correlations"] = pd.concat([
+            corr.rename_axis(index="row", columns="column").stack().rename("value").reset_index()
+            .assign(method=method, window=correlation_window)
+            for method, corr in matrices.items()
+        ], ignore_index=True)
+    
+    return tables
+
+
+def load_book_data(config, project_root, instruments=None):
+    """
+    Load a book's trading file and merge instrument reference data.
 
-        # ==========================
-        # 2. Load Data
-        # ==========================
-        trading_file = project_root / config["data"]["trading_file"]
-        instruments_file = project_root / config["data"]["instruments_file"]
+    Args:
+        config: configuration dictionary
+        project_root: root that data paths in config are relative to
+        instruments: pre-loaded instruments table (shared by all books in batch runs);
+            read from config["data"]["instruments_file"] when None
 
-        trades = pd.read_csv(trading_file, parse_dates=[config["data"]["timestamp_column"]])
+    Returns:
+        (df, input_files) where input_files maps snapshot names to source paths
+    """
+    trading_file = project_root / config["data"]["trading_file"]
+    instruments_file = project_root / config["data"]["instruments_file"]
+
+    trades = pd.read_csv(trading_file, parse_dates=[config["data"]["timestamp_column"]])
+    if instruments is None:
         instruments = pd.read_csv(instruments_file)
 
-        # Merge enriched dataset
-        df = pd.merge(trades, instruments, on=config["data"]["instrument_column"], how="left")
-        df.sort_values(config["data"]["timestamp_column"], inplace=True)
-        df["date"] = pd.to_datetime(df[config["data"]["timestamp_column"]]).dt.date
+    # Merge enriched dataset
+    df = pd.merge(trades, instruments, on=config["data"]["instrument_column"], how="left")
+    df.sort_values(config["data"]["timestamp_column"], inplace=True)
+    df["date"] = pd.to_datetime(df[config["data"]["timestamp_column"]]).dt.date
 
-        # Fix volatility scaling: ensure it's in decimal form
-        if "volatility_30d" in df.columns:
-            df["volatility_30d"] = df["volatility_30d"] / 100.0
+    # Fix volatility scaling: ensure it's in decimal form
+    if "volatility_30d" in df.columns:
+        df["volatility_30d"] = df["volatility_30d"] / 100.0
 
-        logger.info(f"Trading shape={trades.shape} | Instruments shape={instruments.shape}")
-        logger.info(f"Merged shape={df.shape}")
+    logger.info(f"Trading shape={trades.shape} | Instruments shape={instruments.shape}")
+    logger.info(f"Merged shape={df.shape}")
 
-        # Save merged dataset for debugging / validation
-        df.to_csv(output_dir / "merged_dataset.csv", index=False)
+    return df, {"trading_csv": trading_file, "instruments_csv": instruments_file}
 
-        # ==========================
-        # 3. Portfolio NAV Series
-        # ==========================
-        initial_nav = config["portfolio"]["initial_nav"]
-        pnl_col = config["data"]["pnl_column"]
-        daily_pnl = df.groupby("date")[pnl_col].sum()
-        nav_series = initial_nav + daily_pnl.cumsum()
 
-        logger.info(f"Initial NAV: ${initial_nav:,.2f}")
-        logger.info(f"Final NAV: ${nav_series.iloc[-1]:,.2f}")
-        logger.info(f"Total Return: {((nav_series.iloc[-1] - initial_nav) / initial_nav * 100):.2f}%")
+def run_pipeline(df, config, output_dir, input_files):
+    """
+    Run risk, stress and reporting for one book's merged dataset.
 
-        # ==========================
-        # 4. Daily Risk Metrics (Time Series)
-        # ==========================
-        risk_window = config.get("risk", {}).get("rolling_window", 30)
-        daily_risk_metrics = generate_daily_risk_metrics(
-            df, 
-            pnl_col, 
-            nav_series, 
-            config, 
-            window=risk_window
-        )
+    Args:
+        df: merged trading DataFrame from load_book_data
+        config: configuration dictionary
+        output_dir: directory for dashboard files, reports and the audit journal
+        input_files: snapshot name -> source path, fingerprinted into the audit log
 
-        # ==========================
-        # 5. Portfolio-Level Risk Metrics (Summary)
-        # ==========================
-        var_results = calculate_var_es(df[pnl_col], levels=config["risk"]["var_levels"])
-        drawdowns = calculate_drawdowns(nav_series)
-        performance = calculate_performance(
-            nav_series,
+    Returns:
+        Dictionary summarising the book (NAV, VaR/ES, performance, stress results
+        and the daily P&L series) for firm-level aggregation
+    """
+    output_dir = Path(output_dir)
+    ensure_dirs(output_dir)
+    # Cached factor covariances belong to the previous run's data
+    clear_factor_cache()
+
+    # Save merged dataset for debugging / validation
+    df.to_csv(output_dir / "merged_dataset.csv", index=False)
+
+    # ==========================
+    # 3. Portfolio NAV Series
+    # ==========================
+    initial_nav = config["portfolio"]["initial_nav"]
+    pnl_col = config["data"]["pnl_column"]
+    daily_pnl = df.groupby("date")[pnl_col].sum()
+    nav_series = initial_nav + daily_pnl.cumsum()
+
+    logger.info(f"Initial NAV: ${initial_nav:,.2f}")
+    logger.info(f"Final NAV: ${nav_series.iloc[-1]:,.2f}")
+    logger.info(f"Total Return: {((nav_series.iloc[-1] - initial_nav) / initial_nav * 100):.2f}%")
+
+    # Historical factor moves for factor-conditional stress scenarios
+    factor_returns = build_factor_returns(
+        df,
+        pnl_col,
+        duration_map=config["mappings"]["duration_from_credit_rating"],
+        default_duration=config["mappings"]["default_duration"],
+    )
+
+    # ==========================
+    # 4. Daily Risk Metrics (Time Series)
+    # ==========================
+    risk_window = config.get("risk", {}).get("rolling_window", 30)
+    daily_risk_metrics = generate_daily_risk_metrics(
+        df, 
+        pnl_col, 
+        nav_series, 
+        config, 
+        window=risk_window,
+        factor_returns=factor_returns,
+    )
+
+    # ==========================
+    # 5. Portfolio-Level Risk Metrics (Summary)
+    # ==========================
+    var_results = calculate_var_es(df[pnl_col], levels=config["risk"]["var_levels"])
+    drawdowns = calculate_drawdowns(nav_series)
+    performance = calculate_performance(
+        nav_series,
+        risk_free_rate=config["performance"]["risk_free_rate"],
+    )
+
+    # Add % of NAV to VaR/ES results
+    latest_nav = nav_series.iloc[-1]
+    for k in list(var_results.keys()):
+        if var_results[k] is not None:
+            var_results[f"{k}_pctNAV"] = var_results[k] / latest_nav
+
+    logger.info(f"Portfolio Risk Metrics: {var_results}")
+
+    # Stressed VaR/ES: worst historical window, portfolio and per strategy
+    strategy_col = config["data"]["strategy_column"]
+    stressed_window = config.get("risk", {}).get("stressed_var_window", 250)
+    # A strategy with no trades on a date made no P&L that day, as in the portfolio sum,
+    # so every strategy-level measure sees the same calendar of days
+    strategy_daily_pnl = df.pivot_table(
+        index="date", columns=strategy_col, values=pnl_col, aggfunc="sum", fill_value=0.0
+    ).sort_index()
+    stressed_var = {
+        "portfolio": stressed_var_es(daily_pnl.sort_index(), stressed_window, config["risk"]["var_levels"]),
+        "strategies": stressed_var_es(strategy_daily_pnl, stressed_window, config["risk"]["var_levels"]),
+    }
+    logger.info(f"Stressed VaR ({stressed_window}-day worst window): {stressed_var['portfolio']}")
+
+    # Deep-tail VaR/ES (99%+) from a GPD fit, portfolio / strategies / instruments in one pass each
+    evt_cfg = config.get("risk", {}).get("evt", {}) or {}
+    evt_kwargs = {
+        "levels": evt_cfg.get("levels", [0.99, 0.995, 0.999]),
+        "tail_fraction": evt_cfg.get("tail_fraction", 0.1),
+        "min_exceedances": evt_cfg.get("min_exceedances", 10),
+    }
+    instrument_daily_pnl = df.pivot_table(
+        index="date", columns=config["data"]["instrument_column"], values=pnl_col, aggfunc="sum"
+    )
+    tail_risk = pd.concat([
+        gpd_tail_var_es(daily_pnl.rename("PORTFOLIO"), **evt_kwargs).assign(level="portfolio"),
+        gpd_tail_var_es(strategy_daily_pnl, **evt_kwargs).assign(level="strategy"),
+        gpd_tail_var_es(instrument_daily_pnl, **evt_kwargs).assign(level="instrument"),
+    ])
+    tail_risk.index.name = "series"
+    logger.info(f"GPD tail fits: {int(tail_risk['xi'].notna().sum())} of {len(tail_risk)} series")
+
+    # Factor betas (sectors, rates, vol, momentum, size): portfolio / strategies /
+    # instruments in one batched least-squares solve; returns are P&L over prior NAV
+    # (portfolio, strategy contributions) or over instrument market cap
+    factor_cfg = config.get("factors", {}) or {}
+    inst_returns = instrument_returns(df, pnl_col, config["data"]["instrument_column"])
+    exposure_factors = build_exposure_factors(
+        df,
+        pnl_col,
+        config["data"]["instrument_column"],
+        momentum_lookback=factor_cfg.get("momentum_lookback", 20),
+        inst_returns=inst_returns,
+        duration_map=config["mappings"]["duration_from_credit_rating"],
+        default_duration=config["mappings"]["default_duration"],
+    )
+    prior_nav = nav_series.shift(1).fillna(initial_nav)
+    factor_series = [
+        ("portfolio", (daily_pnl / prior_nav).rename("PORTFOLIO").to_frame()),
+        ("strategy", strategy_daily_pnl.div(prior_nav, axis=0)),
+        ("instrument", inst_returns),
+    ]
+    level_of = {str(col): level for level, frame in factor_series for col in frame.columns}
+    all_returns = pd.concat([frame for _, frame in factor_series], axis=1)
+    all_returns.columns = [str(c) for c in all_returns.columns]
+    factor_exposures = factor_betas(all_returns, exposure_factors, factor_cfg.get("min_observations"))
+    factor_exposures.insert(0, "level", factor_exposures.index.map(level_of))
+    factor_exposures.index.name = "series"
+    logger.info(f"Factor betas: {len(factor_exposures)} series on {exposure_factors.shape[1]} factors")
+
+    # Betas through time (style drift): rolling window, or exponentially weighted
+    # when a halflife is configured; instruments only when listed in rolling_levels
+    rolling_levels = factor_cfg.get("rolling_levels", ["portfolio", "strategy"])
+    rolling_returns = all_returns[[c for c in all_returns.columns if level_of[c] in rolling_levels]]
+    rolling_betas = rolling_factor_betas(
+        rolling_returns,
+        exposure_factors,
+        window=factor_cfg.get("rolling_window", 60),
+        halflife=factor_cfg.get("rolling_halflife"),
+        min_obs=factor_cfg.get("min_observations"),
+    )
+    logger.info(f"Rolling factor betas: {rolling_returns.shape[1]} series x {len(exposure_factors)} dates")
+
+    # ==========================
+    # 6. Strategy-Level Performance
+    # ==========================
+    strategy_results = {}
+    for strat, strat_df in df.groupby(strategy_col):
+        strat_pnl = strat_df.groupby("date")[pnl_col].sum()
+        strat_nav = initial_nav + strat_pnl.cumsum()
+        strategy_results[strat] = calculate_performance(
+            strat_nav,
             risk_free_rate=config["performance"]["risk_free_rate"],
         )
+    logger.info(f"Strategy-level performance computed: {list(strategy_results.keys())}")
+
+    # Firm > strategy > sector > asset class > instrument VaR/ES, vol and diversification
+    hierarchy_levels = config.get("hierarchy", {}).get("levels") or [
+        strategy_col, "sector", "asset_class", config["data"]["instrument_column"]
+    ]
+    hierarchy = hierarchy_risk(
+        df,
+        pnl_col,
+        levels=[lvl for lvl in hierarchy_levels if lvl in df.columns],
+        var_levels=config["risk"]["var_levels"],
+    )
+
+    # ==========================
+    # 7. Positions & Sector Exposure
+    # ==========================
+    ledger, position_exposures = calculate_position_exposures(df, config)
+    sector_exposure = calculate_sector_exposure(df, config, position_exposures)
+
+    # Per-date sector weights and HHI / effective N / max weight / top-5 share
+    sector_weights = sector_weight_history(df, position_exposures.get("sector_gross"))
+    concentration = concentration_metrics(sector_weights)
+
+    # ==========================
+    # 8. Portfolio Risk/Return Metrics
+    # ==========================
+    portfolio_risk_return = calculate_portfolio_risk_return(nav_series, config)
+
+    # ==========================
+    # 9. Asset Class Exposures (Legacy)
+    # ==========================
+    # Net market value of the latest end-of-day holdings
+    exposures = {
+        bucket: position_exposures[f"{bucket}_net"].iloc[-1].to_dict()
+        if not position_exposures.get(f"{bucket}_net", pd.DataFrame()).empty else {}
+        for bucket in ("sector", "asset_class")
+    }
+    positions_eod = ledger_long(ledger) if ledger else pd.DataFrame()
+    exposure_history = exposures_long(position_exposures)
+
+    # ==========================
+    # 10. Daily Returns
+    # ==========================
+    daily_return = nav_series.pct_change().fillna(0.0)
+
+    # ==========================
+    # 11. Stress Testing (Portfolio-Level Summary)
+    # ==========================
+    stress_results, stress_failures = {}, []
+    if config["stress_scenarios"]["enabled"]:
+        stress_results, stress_failures = execute_scenarios(
+            df,
+            config["stress_scenarios"]["scenarios"],
+            nav_series,
+            config,
+            factor_returns,
+        )
 
-        # Add % of NAV to VaR/ES results
-        latest_nav = nav_series.iloc[-1]
-        for k in list(var_results.keys()):
-            if var_results[k] is not None:
-                var_results[f"{k}_pctNAV"] = var_results[k] / latest_nav
-
-        logger.info(f"Portfolio Risk Metrics: {var_results}")
-
-        # ==========================
-        # 6. Strategy-Level Performance
-        # ==========================
-        strategy_col = config["data"]["strategy_column"]
-        strategy_results = {}
-        for strat, strat_df in df.groupby(strategy_col):
-            strat_pnl = strat_df.groupby("date")[pnl_col].sum()
-            strat_nav = initial_nav + strat_pnl.cumsum()
-            strategy_results[strat] = calculate_performance(
-                strat_nav,
-                risk_free_rate=config["performance"]["risk_free_rate"],
-            )
-        logger.info(f"Strategy-level performance computed: {list(strategy_results.keys())}")
-
-        # ==========================
-        # 7. Sector Exposure
-        # ==========================
-        sector_exposure = calculate_sector_exposure(df, config)
-
-        # ==========================
-        # 8. Portfolio Risk/Return Metrics
-        # ==========================
-        portfolio_risk_return = calculate_portfolio_risk_return(nav_series, config)
+    logger.info(f"Stress Test Results: {stress_results}")
+
+    # Limit rules (config "limits") over the full history: breach events with
+    # hysteresis and per-date counts of rules in breach, persisted for the dashboard
+    limit_rules = load_rules(config)
+    limit_results = evaluate_limits(limit_rules, {
+        "daily_risk_metrics": daily_risk_metrics,
+        "concentration_metrics": concentration,
+        "drawdowns": drawdowns,
+    })
+
+    # ==========================
+    # 12. Save Dashboard-Compatible CSV Files
+    # ==========================
+    save_dashboard_csvs(
+        daily_risk_metrics,
+        sector_exposure,
+        portfolio_risk_return,
+        output_dir,
+        sector_weights=sector_weights,
+        concentration=concentration,
+    )
+
+    # Versioned, memory-mappable bundle of every dashboard table plus precomputed aggregates
+    run_time = datetime.utcnow().isoformat() + "Z"
+    git_commit = try_git_commit_hash()
+    dashboard_tables = {
+        "daily_risk_metrics": daily_risk_metrics,
+        "sector_exposure": sector_exposure,
+        "sector_weights_history": sector_weights,
+        "concentration_metrics": concentration,
+        "portfolio_risk_return": portfolio_risk_return,
+        "hierarchy_risk": hierarchy,
+        "stress_results": flatten_results(stress_results, "scenario"),
+        "strategy_daily_pnl": strategy_daily_pnl,
+        "limit_events": limit_results["events"],
+        "limit_history": limit_results["history"],
+        "factor_exposures": factor_exposures,
+        "factor_betas_rolling": rolling_betas,
+        **build_dashboard_tables(daily_risk_metrics),
+    }
+
+    # ==========================
+    # 13. Legacy Reporting (Keep existing reports)
+    # ==========================
+    # Writers run concurrently (threads for JSON/CSV, processes for plots);
+    # portfolio and per-strategy charts are rendered one figure per task
+    sharpe_window = config["performance"]["sharpe_window"]
+    drawdown_series = drawdowns.set_index("date")["drawdown"]
+    plot_specs = performance_plot_specs(
+        daily_pnl, nav_series, daily_return, drawdown_series, output_dir, sharpe_window
+    )
+    results_tables = {
+        "daily_risk_metrics": daily_risk_metrics,
+        "daily_pnl": pd.DataFrame({"date": daily_pnl.index, "pnl": daily_pnl.values, "nav": nav_series.values}),
+        "drawdowns": drawdowns,
+        "var_results": pd.DataFrame([var_results]),
+        "performance": pd.DataFrame([performance]),
+        "strategy_results": flatten_results(strategy_results, "strategy"),
+        "stress_results": flatten_results(stress_results, "scenario"),
+        "sector_exposure": sector_exposure,
+        "tail_risk": tail_risk,
+        "hierarchy_risk": hierarchy,
+        "positions": positions_eod,
+        "exposures": exposure_history,
+        "concentration": concentration,
+        "limit_events": limit_results["events"],
+        "limit_history": limit_results["history"],
+        "factor_exposures": factor_exposures,
+        "factor_betas_rolling": rolling_betas,
+    }
+    plot_specs += strategy_plot_specs(
+        strategy_daily_pnl,
+        initial_nav,
+        output_dir,
+        sharpe_window,
+        risk_free_rate=config["performance"]["risk_free_rate"],
+    )
+    report_manifest = run_report_jobs(
+        [
+            report_job(f"plot:{Path(spec['path']).relative_to(output_dir)}",
+                       render_line_chart, spec, kind="render")
+            for spec in plot_specs
+        ] + [
+            report_job("var_results", save_var_results, var_results, output_dir),
+            report_job("stressed_var", save_stressed_var, stressed_var, output_dir),
+            report_job("tail_risk", save_tail_risk, tail_risk, output_dir),
+            report_job("hierarchy_risk", save_hierarchy_risk, hierarchy, output_dir),
+            report_job("positions", save_positions, positions_eod, exposure_history, output_dir),
+            report_job("limit_events", save_limit_events, limit_results["events"], limit_results["history"],
+                       output_dir / "Risk Analytics Module"),
+            report_job("factor_exposures", save_factor_exposures, factor_exposures, rolling_betas,
+                       output_dir / "Risk Analytics Module"),
+            report_job("event_store", save_event_store, limit_results["events"], limit_rules,
+                       output_dir / config["reporting"].get("event_store", "events.sqlite"),
+                       config.get("book", "default"), run_time),
+            report_job("drawdowns", save_drawdowns, drawdowns, output_dir),
+            report_job("performance", save_performance, performance, output_dir),
+            report_job("strategy_results", save_strategy_results, strategy_results, output_dir),
+            report_job("exposures", save_exposures, exposures, output_dir),
+            report_job("stress_summary", save_stress_summary, stress_results, output_dir),
+            report_job("csvs", save_csvs, daily_pnl, daily_return, {}, output_dir),
+            report_job("dashboard_bundle", save_dashboard_bundle, dashboard_tables,
+                       {"run_time": run_time, "book": config.get("book", "default"),
+                        "git_commit": git_commit}, output_dir),
+            report_job("results_store", save_results_store, results_tables,
+                       output_dir / config["reporting"].get("results_store_dir", "results_store"),
+                       config["reporting"].get("run_date") or datetime.utcnow().date(),
+                       config.get("book", "default")),
+        ],
+        output_dir,
+        io_workers=config["reporting"].get("io_workers", 4),
+        render_workers=config["reporting"].get("render_workers", 2),
+    )
+
+    # ==========================
+    # 14. Audit Log
+    # ==========================
+    # Digests are cached next to the audit journal, keyed by each file's stat
+    snapshots = sha256_many(input_files.values(), cache_db=output_dir / "audit" / "fingerprints.sqlite")
+    audit_data = {
+        "run_time": run_time,
+        "git_commit": git_commit,
+        "snapshots": {name: snapshots[str(path)] for name, path in input_files.items()},
+        "config": config,
+        "var_results": var_results,
+        "stressed_var": stressed_var,
+        "tail_risk_portfolio": tail_risk[tail_risk["level"] == "portfolio"].to_dict("records"),
+        "performance": performance,
+        "strategy_results": strategy_results,
+        "exposures": exposures,
+        "stress_results": stress_results,
+        "stress_failures": stress_failures,
+        "report_manifest": report_manifest,
+        "latest_nav": float(latest_nav),
+        "daily_risk_metrics_count": len(daily_risk_metrics),
+        "portfolio_metrics": portfolio_risk_return.to_dict('records')[0] if not portfolio_risk_return.empty else {}
+    }
+    save_audit_log(audit_data, output_dir)
+
+    logger.info("=" * 80)
+    logger.info("Risk Analytics Pipeline Completed Successfully")
+    logger.info("=" * 80)
+    logger.info(f"Dashboard files saved to: {output_dir}")
+    logger.info(f"  - daily_risk_metrics.csv: {len(daily_risk_metrics)} rows")
+    logger.info(f"  - sector_exposure.csv: {len(sector_exposure)} sectors")
+    logger.info(f"  - portfolio_risk_return.csv: 1 row")
+    logger.info("=" * 80)
+
+    return {
+        "book": config.get("book", "default"),
+        "output_dir": str(output_dir),
+        "initial_nav": float(initial_nav),
+        "latest_nav": float(latest_nav),
+        "total_return": float((latest_nav - initial_nav) / initial_nav),
+        "var_results": var_results,
+        "performance": performance,
+        "stress_results": stress_results,
+        "daily_pnl": daily_pnl,
+    }
 
-        # ==========================
-        # 9. Asset Class Exposures (Legacy)
-        # ==========================
-        exposures = {
-            "sector": df.groupby("sector")["market_cap_usd"].sum().to_dict()
-            if "sector" in df.columns else {},
-            "asset_class": df.groupby("asset_class")["market_cap_usd"].sum().to_dict()
-            if "asset_class" in df.columns else {}
-        }
 
+def main():
+    try:
         # ==========================
-        # 10. Daily Returns
+        # 1. Load Config
         # ==========================
-        daily_return = nav_series.pct_change().fillna(0.0)
+        project_root = Path(__file__).resolve().parents[2]
+        cfg_path = project_root / "configs" / "risk_config.yaml"
+        config = load_config(str(cfg_path))
 
-        # ==========================
-        # 11. Stress Testing (Portfolio-Level Summary)
-        # ==========================
-        stress_results = {}
-        if config["stress_scenarios"]["enabled"]:
-            for name, s in config["stress_scenarios"]["scenarios"].items():
-                if s["type"] == "sector":
-                    stress_results[name] = sector_shock_impact(
-                        df,
-                        s["sector_col"],
-                        s["target_sector"],
-                        s["shock_pct"],
-                        nav_series,
-                    )
-                elif s["type"] == "rates":
-                    stress_results[name] = rates_shock_impact(
-                        df,
-                        s["delta_bps"],
-                        s["proxy_duration_col"],
-                        nav_series,
-                        config["mappings"]["duration_from_credit_rating"],
-                        config["mappings"]["default_duration"],
-                    )
-                elif s["type"] == "vol":
-                    stress_results[name] = volatility_shock_impact(
-                        df,
-                        s["vol_col"],
-                        s["vol_mult"],
-                        nav_series,
-                    )
-
-        logger.info(f"Stress Test Results: {stress_results}")
+        output_dir = project_root / config["reporting"]["output_dir"]
+        ensure_dirs(output_dir)
 
-        # ==========================
-        # 12. Save Dashboard-Compatible CSV Files
-        # ==========================
-        save_dashboard_csvs(
-            daily_risk_metrics,
-            sector_exposure,
-            portfolio_risk_return,
-            output_dir
-        )
+        logger.info(f"Config loaded from {cfg_path}")
 
         # ==========================
-        # 13. Legacy Reporting (Keep existing reports)
+        # 2. Load Data
         # ==========================
-        save_var_results(var_results, output_dir)
-        save_drawdowns(drawdowns, output_dir)
-        save_performance(performance, output_dir)
-        save_strategy_results(strategy_results, output_dir)
-        save_exposures(exposures, output_dir)
-        save_stress_summary(stress_results, output_dir)
-
-        # Save CSV + plots
-        save_csvs(daily_pnl, daily_return, {}, output_dir)
-        sharpe_window = config["performance"]["sharpe_window"]
-        drawdown_series = drawdowns.set_index("date")["drawdown"]
-        save_plots(daily_pnl, nav_series, daily_return, drawdown_series, output_dir, sharpe_window)
+        df, input_files = load_book_data(config, project_root)
 
         # ==========================
-        # 14. Audit Log
+        # 3-14. Risk, Stress, Reporting, Audit
         # ==========================
-        audit_data = {
-            "run_time": datetime.utcnow().isoformat() + "Z",
-            "git_commit": try_git_commit_hash(),
-            "snapshots": {
-                "trading_csv": sha256(str(trading_file)),
-                "instruments_csv": sha256(str(instruments_file)),
-            },
-            "config": config,
-            "var_results": var_results,
-            "performance": performance,
-            "strategy_results": strategy_results,
-            "exposures": exposures,
-            "stress_results": stress_results,
-            "latest_nav": float(latest_nav),
-            "daily_risk_metrics_count": len(daily_risk_metrics),
-            "portfolio_metrics": portfolio_risk_return.to_dict('records')[0] if not portfolio_risk_return.empty else {}
-        }
-        save_audit_log(audit_data, output_dir)
-
-        logger.info("=" * 80)
-        logger.info("Risk Analytics Pipeline Completed Successfully")
-        logger.info("=" * 80)
-        logger.info(f"Dashboard files saved to: {output_dir}")
-        logger.info(f"  - daily_risk_metrics.csv: {len(daily_risk_metrics)} rows")
-        logger.info(f"  - sector_exposure.csv: {len(sector_exposure)} sectors")
-        logger.info(f"  - portfolio_risk_return.csv: 1 row")
-        logger.info("=" * 80)
+        run_pipeline(df, config, output_dir, input_files)
 
     except Exception as e:
         logger.error(f"Pipeline failed: {e}", exc_info=True)
@@ -0,0 +1,160 @@
+"""
+Position ledger for portfolio analytics
+Rebuilds end-of-day holdings per instrument from the trade stream (signed
+quantities cumulated over trades sorted by instrument and timestamp), marks them
+at the last execution price of the day and aggregates them into per-date
+sector / asset-class exposure matrices.
+"""
+
+import logging
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger("risk_analytics.positions")
+
+SIDE_SIGN = {"BUY": 1.0, "SELL": -1.0}
+
+
+def signed_quantity(trades: pd.DataFrame, quantity_col: str = "quantity", side_col: str = "trade_type") -> np.ndarray:
+    """Trade quantity signed by side (BUY +, SELL -); quantities without a side are taken as signed."""
+    qty = pd.to_numeric(trades[quantity_col], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    if side_col not in trades.columns:
+        return qty
+    sign = trades[side_col].astype(str).str.upper().map(SIDE_SIGN).to_numpy(dtype=float)
+    return np.where(np.isnan(sign), qty, np.abs(qty) * sign)
+
+
+def build_position_ledger(
+    trades: pd.DataFrame,
+    instrument_col: str,
+    timestamp_col: str,
+    quantity_col: str = "quantity",
+    side_col: str = "trade_type",
+    price_cols: Sequence[str] = ("execution_price", "price"),
+    opening_positions: Optional[pd.Series] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    End-of-day positions from trades.
+
+    Args:
+        trades: trade rows (one per fill)
+        instrument_col / timestamp_col: instrument and trade time columns
+        quantity_col / side_col: quantity and BUY/SELL side
+        price_cols: price columns in order of preference for marking
+        opening_positions: instrument -> quantity held before the first trade
+
+    Returns:
+        {"quantity", "price", "market_value"}: date x instrument DataFrames.
+        Positions and marks carry forward over dates without trades.
+    """
+    if trades.empty:
+        empty = pd.DataFrame()
+        return {"quantity": empty, "price": empty, "market_value": empty}
+
+    ts = pd.to_datetime(trades[timestamp_col])
+    instrument = trades[instrument_col].to_numpy()
+    order = np.lexsort((ts.to_numpy(), instrument))
+
+    qty = signed_quantity(trades, quantity_col, side_col)[order]
+    inst_sorted = instrument[order]
+    dates = ts.dt.normalize().to_numpy()[order]
+
+    # Per-instrument running position: global cumsum minus the cumsum before each block
+    running = np.cumsum(qty)
+    block_start = np.r_[True, inst_sorted[1:] != inst_sorted[:-1]]
+    offsets = np.where(block_start, running - qty, np.nan)
+    running = running - pd.Series(offsets).ffill().to_numpy()
+
+    price_col = next((c for c in price_cols if c in trades.columns), None)
+    prices = (pd.to_numeric(trades[price_col], errors="coerce").to_numpy(dtype=float)[order]
+              if price_col else np.full(len(order), np.nan))
+
+    # Last trade of each (instrument, date) carries the end-of-day position and mark
+    flat = pd.DataFrame({"date": dates, "instrument": inst_sorted, "quantity": running, "price": prices})
+    eod = flat.groupby(["date", "instrument"], sort=True).last()
+    all_dates = pd.DatetimeIndex(np.unique(dates), name="date")
+
+    quantity = eod["quantity"].unstack("instrument").reindex(all_dates).ffill().fillna(0.0)
+    if opening_positions is not None:
+        opening = opening_positions.reindex(quantity.columns).fillna(0.0)
+        quantity = quantity + opening
+    price = eod["price"].unstack("instrument").reindex(all_dates).ffill()
+    market_value = (quantity * price).fillna(0.0)
+
+    quantity.columns.name = price.columns.name = market_value.columns.name = instrument_col
+    logger.info(f"Position ledger: {quantity.shape[1]} instruments x {len(all_dates)} dates "
+                f"from {len(trades)} trades")
+    return {"quantity": quantity, "price": price, "market_value": market_value}
+
+
+def exposure_matrix(market_value: pd.DataFrame, mapping: pd.Series, gross: bool = False) -> pd.DataFrame:
+    """
+    Date x bucket exposure: market_value @ indicator(instrument -> bucket).
+    Net exposure sums signed values; gross sums absolute values.
+    """
+    if market_value.empty:
+        return pd.DataFrame(index=market_value.index)
+    buckets = mapping.reindex(market_value.columns).fillna("UNKNOWN").astype(str)
+    codes, labels = pd.factorize(buckets, sort=True)
+    indicator = np.zeros((len(codes), len(labels)))
+    indicator[np.arange(len(codes)), codes] = 1.0
+    values = market_value.to_numpy(dtype=float)
+    out = (np.abs(values) if gross else values) @ indicator
+    return pd.DataFrame(out, index=market_value.index, columns=pd.Index(labels, name=mapping.name))
+
+
+def ledger_exposures(
+    ledger: Dict[str, pd.DataFrame],
+    instruments: pd.DataFrame,
+    instrument_col: str,
+    buckets: Sequence[str] = ("sector", "asset_class"),
+) -> Dict[str, pd.DataFrame]:
+    """
+    Per-date net and gross exposure matrices by each bucket column of the
+    instruments table, keyed "<bucket>_net" / "<bucket>_gross".
+    """
+    attrs = instruments.drop_duplicates(instrument_col).set_index(instrument_col)
+    exposures = {}
+    for bucket in buckets:
+        if bucket not in attrs.columns:
+            continue
+        mapping = attrs[bucket].rename(bucket)
+        exposures[f"{bucket}_net"] = exposure_matrix(ledger["market_value"], mapping)
+        exposures[f"{bucket}_gross"] = exposure_matrix(ledger["market_value"], mapping, gross=True)
+    return exposures
+
+
+def ledger_long(ledger: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Ledger as rows of date, instrument, quantity, price, market_value (open positions only)."""
+    if ledger["quantity"].empty:
+        return pd.DataFrame(columns=["date", "instrument", "quantity", "price", "market_value"])
+    quantity = ledger["quantity"]
+    frame = pd.DataFrame({
+        "date": np.repeat(quantity.index.to_numpy(), quantity.shape[1]),
+        "instrument": np.tile(quantity.columns.to_numpy(), len(quantity)),
+        **{name: ledger[name].to_numpy(dtype=float).ravel() for name in ("quantity", "price", "market_value")},
+    })
+    return frame[frame["quantity"] != 0].reset_index(drop=True)
+
+
+def exposures_long(exposures: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """ledger_exposures output as rows of date, bucket_type, bucket, net, gross."""
+    frames = []
+    for name in exposures:
+        bucket_type, kind = name.rsplit("_", 1)
+        if kind != "net":
+            continue
+        net, gross = exposures[name], exposures[f"{bucket_type}_gross"]
+        frames.append(pd.DataFrame({
+            "date": np.repeat(net.index.to_numpy(), net.shape[1]),
+            "bucket_type": bucket_type,
+            "bucket": np.tile(net.columns.to_numpy(), len(net)),
+            "net": net.to_numpy(dtype=float).ravel(),
+            "gross": gross.to_numpy(dtype=float).ravel(),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["date", "bucket_type", "bucket", "net", "gross"])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,113 @@
+"""
+Concurrent report writer for Risk Analytics Platform
+Runs the reporting.save_* writers in parallel: a thread pool for JSON/CSV I/O
+and a process pool for matplotlib rendering. Writers write atomically
+(temp file + rename) and the run returns a manifest of files, sizes and durations.
+"""
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from risk_analytics.reporting import atomic_write, ensure_dir
+
+
+logger = logging.getLogger("risk_analytics.report_writer")
+
+
+def report_job(name: str, func, *args, kind: str = "io", **kwargs) -> Dict[str, Any]:
+    """
+    Describe one writer call. kind is "io" (thread pool) or "render"
+    (process pool; func and arguments must be picklable).
+    """
+    if kind not in ("io", "render"):
+        raise ValueError(f"Unknown report job kind '{kind}'")
+    return {"name": name, "func": func, "args": args, "kwargs": kwargs, "kind": kind}
+
+
+def _timed_call(func, args, kwargs):
+    """Run a writer and time it where it executes (thread or worker process)."""
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs), time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+def _as_paths(result) -> List[Path]:
+    if result is None:
+        return []
+    if isinstance(result, (list, tuple)):
+        return [Path(p) for p in result]
+    return [Path(result)]
+
+
+def run_report_jobs(
+    jobs: List[Dict[str, Any]],
+    out_dir: Path,
+    io_workers: int = 4,
+    render_workers: int = 2,
+    manifest_name: Optional[str] = "report_manifest.json",
+) -> List[Dict[str, Any]]:
+    """
+    Run report jobs concurrently and return the manifest.
+
+    Each manifest entry has writer, path, bytes, seconds and status. A writer
+    that returns no paths (the save_* functions log and return None on failure)
+    is recorded once with status "failed". The manifest is also written to
+    out_dir/manifest_name unless manifest_name is None.
+    """
+    ensure_dir(out_dir)
+    started = time.perf_counter()
+
+    render_jobs = [j for j in jobs if j["kind"] == "render"]
+    io_jobs = [j for j in jobs if j["kind"] == "io"]
+
+    futures = {}
+    render_pool = None
+    if render_jobs and render_workers > 0:
+        # multiprocessing is only imported when there is something to render
+        from concurrent.futures import ProcessPoolExecutor
+        render_pool = ProcessPoolExecutor(max_workers=render_workers)
+    io_pool = ThreadPoolExecutor(max_workers=max(io_workers, 1), thread_name_prefix="report-io")
+    try:
+        # Rendering is the long pole, so submit it first
+        for job in render_jobs:
+            pool = render_pool or io_pool
+            futures[job["name"]] = pool.submit(_timed_call, job["func"], job["args"], job["kwargs"])
+        for job in io_jobs:
+            futures[job["name"]] = io_pool.submit(_timed_call, job["func"], job["args"], job["kwargs"])
+
+        manifest = []
+        for job in jobs:
+            try:
+                result, seconds, error = futures[job["name"]].result()
+            except Exception as e:
+                result, seconds, error = None, None, f"{type(e).__name__}: {e}"
+
+            paths = _as_paths(result)
+            if not paths:
+                manifest.append({"writer": job["name"], "path": None, "bytes": None,
+                                 "seconds": seconds, "status": "failed", "error": error})
+                logger.error(f"❌ Report writer '{job['name']}' produced no output: {error}")
+            for path in paths:
+                size = path.stat().st_size if path.exists() else None
+                manifest.append({"writer": job["name"], "path": str(path), "bytes": size,
+                                 "seconds": seconds, "status": "ok" if size is not None else "missing"})
+    finally:
+        io_pool.shutdown(wait=True)
+        if render_pool is not None:
+            render_pool.shutdown(wait=True)
+
+    total = time.perf_counter() - started
+    n_bytes = sum(m["bytes"] or 0 for m in manifest)
+    logger.info(f"📦 {len(manifest)} report files ({n_bytes / 1e6:.2f} MB) written in {total:.2f}s")
+
+    if manifest_name:
+        with atomic_write(out_dir / manifest_name) as f:
+            json.dump({"elapsed_seconds": total, "files": manifest}, f, indent=2, default=str)
+
+    return manifest
@@ -7,11 +7,17 @@ Industry-ready with JSON, CSV, and PNG outputs for reproducibility.
 import os
 import json
 import logging
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 import pandas as pd
-import matplotlib.pyplot as plt
+
+from risk_analytics.metrics import compute_drawdown, rolling_sharpe_ratio
+from risk_analytics.plotting import line_chart_spec, render_figures
+from risk_analytics.results_store import write_tables
+from risk_analytics.audit import append_run, JOURNAL_NAME
 
 
 # ---------------------------------
@@ -20,6 +26,10 @@ import matplotlib.pyplot as plt
 logger = logging.getLogger("risk_analytics.reporting")
 logger.setLevel(logging.INFO)
 
+# Process umask, read once at import so atomic writes get normal file permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 
 # ---------------------------------
 # Core Utilities
@@ -29,6 +39,25 @@ def ensure_dir(path: Path):
     path.mkdir(parents=True, exist_ok=True)
 
 
+@contextmanager
+def atomic_write(filepath: Path, mode: str = "w", newline=None):
+    """
+    Write to a temp file in the target directory and rename it over the target
+    on success, so readers never see a partially written artifact.
+    """
+    filepath = Path(filepath)
+    fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, newline=newline) as f:
+            yield f
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 # ---------------------------------
 # Save Functions
 # ---------------------------------
@@ -37,21 +66,143 @@ def save_var_results(var_results: Dict[str, Any], out_dir: Path):
     ensure_dir(out_dir)
     filepath = out_dir / "var_results.json"
     try:
-        with open(filepath, "w") as f:
+        with atomic_write(filepath) as f:
             json.dump(var_results, f, indent=2, default=str)
         logger.info(f"✅ VaR/ES results saved at {filepath}")
+        return filepath
     except Exception as e:
         logger.error(f"❌ Failed to save VaR/ES results: {e}")
 
 
+def save_stressed_var(stressed_var: Dict[str, Any], out_dir: Path):
+    """Save stressed VaR/ES (worst historical window) results to JSON."""
+    ensure_dir(out_dir)
+    filepath = out_dir / "stressed_var.json"
+    try:
+        with atomic_write(filepath) as f:
+            json.dump(stressed_var, f, indent=2, default=str)
+        logger.info(f"✅ Stressed VaR/ES results saved at {filepath}")
+        return filepath
+    except Exception as e:
+        logger.error(f"❌ Failed to save stressed VaR/ES results: {e}")
+
+
+def save_tail_risk(tail_risk: pd.DataFrame, out_dir: Path):
+    """Save GPD tail VaR/ES estimates (portfolio, strategies, instruments) to CSV."""
+    ensure_dir(out_dir)
+    filepath = out_dir / "evt_tail_risk.csv"
+    try:
+        with atomic_write(filepath, newline="") as f:
+            tail_risk.to_csv(f, index=True)
+        logger.info(f"✅ EVT tail risk saved at {filepath}")
+        return filepath
+    except Exception as e:
+        logger.error(f"❌ Failed to save EVT tail risk: {e}")
+
+
+def save_firm_summary(
+    book_summary: pd.DataFrame,
+    firm_summary: Dict[str, Any],
+    firm_daily_pnl: pd.DataFrame,
+    out_dir: Path,
+):
+    """Save batch-run outputs: per-book summary CSV, firm summary JSON and firm daily P&L CSV."""
+    ensure_dir(out_dir)
+    paths = [out_dir / "book_summary.csv", out_dir / "firm_summary.json", out_dir / "firm_daily_pnl.csv"]
+    try:
+        with atomic_write(paths[0], newline="") as f:
+            book_summary.to_csv(f, index=False)
+        with atomic_write(paths[1]) as f:
+            json.dump(firm_summary, f, indent=2, default=str)
+        with atomic_write(paths[2], newline="") as f:
+            firm_daily_pnl.to_csv(f, index=True)
+        logger.info(f"✅ Firm summary saved in {out_dir}")
+        return paths
+    except Exception as e:
+        logger.error(f"❌ Failed to save firm summary: {e}")
+
+
+def save_hierarchy_risk(hierarchy: pd.DataFrame, out_dir: Path):
+    """Save per-node hierarchy VaR/ES, volatility and diversification benefit to CSV."""
+    ensure_dir(out_dir)
+    filepath = out_dir / "hierarchy_risk.csv"
+    try:
+        with atomic_write(filepath, newline="") as f:
+            hierarchy.to_csv(f, index=False)
+        logger.info(f"✅ Hierarchy risk saved at {filepath}")
+        return filepath
+    except Exception as e:
+        logger.error(f"❌ Failed to save hierarchy risk: {e}")
+
+
+def save_positions(positions: pd.DataFrame, exposures: pd.DataFrame, out_dir: Path):
+    """Save end-of-day positions and per-date sector/asset-class exposures to CSV."""
+    ensure_dir(out_dir)
+    paths = [out_dir / "positions_eod.csv", out_dir / "exposure_timeseries.csv"]
+    try:
+        with atomic_write(paths[0], newline="") as f:
+            positions.to_csv(f, index=False)
+        with atomic_write(paths[1], newline="") as f:
+            exposures.to_csv(f, index=False)
+        logger.info(f"✅ Positions and exposures saved at {paths[0]}, {paths[1]}")
+        return paths
+    except Exception as e:
+        logger.error(f"❌ Failed to save positions: {e}")
+
+
+def save_limit_events(events: pd.DataFrame, history: pd.DataFrame, out_dir: Path):
+    """Save limit breach events and the per-date count of rules in breach to CSV."""
+    ensure_dir(out_dir)
+    paths = [out_dir / "limit_events.csv", out_dir / "limit_history.csv"]
+    try:
+        with atomic_write(paths[0], newline="") as f:
+            events.to_csv(f, index=False)
+        with atomic_write(paths[1], newline="") as f:
+            history.to_csv(f, index=True)
+        logger.info(f"✅ Limit events ({len(events)}) saved at {paths[0]}, {paths[1]}")
+        return paths
+    except Exception as e:
+        logger.error(f"❌ Failed to save limit events: {e}")
+
+
+def save_factor_exposures(exposures: pd.DataFrame, rolling: pd.DataFrame, out_dir: Path):
+    """Save factor betas per series and the (date, series) x factor rolling betas to CSV."""
+    ensure_dir(out_dir)
+    paths = [out_dir / "factor_exposures.csv", out_dir / "factor_betas_rolling.csv"]
+    try:
+        with atomic_write(paths[0], newline="") as f:
+            exposures.to_csv(f, index=True)
+        with atomic_write(paths[1], newline="") as f:
+            rolling.to_csv(f, index=True)
+        logger.info(f"✅ Factor exposures ({len(exposures)} series) saved at {paths[0]}, {paths[1]}")
+        return paths
+    except Exception as e:
+        logger.error(f"❌ Failed to save factor exposures: {e}")
+
+
+def save_dashboard_bundle(tables: Dict[str, pd.DataFrame], metadata: Dict[str, Any], out_dir: Path):
+    """Save all dashboard tables to one memory-mappable bundle (dashboard_bundle.arrow)."""
+    from risk_analytics.dashboard_bundle import write_bundle, FORMAT_VERSION
+
+    ensure_dir(out_dir)
+    filepath = out_dir / "dashboard_bundle.arrow"
+    try:
+        write_bundle(filepath, tables, {**metadata, "format_version": FORMAT_VERSION})
+        logger.info(f"✅ Dashboard bundle ({len(tables)} tables) saved at {filepath}")
+        return filepath
+    except Exception as e:
+        logger.error(f"❌ Failed to save dashboard bundle: {e}")
+
+
 def save_strategy_results(strategy_results: Dict[str, Dict[str, Any]], out_dir: Path):
     """Save strategy-level performance metrics."""
     ensure_dir(out_dir)
     filepath = out_dir / "strategy_results.json"
     try:
-        with open(filepath, "w") as f:
+        with atomic_write(filepath) as f:
             json.dump(strategy_results, f, indent=2, default=str)
         logger.info(f"✅ Strategy results saved at {filepath}")
+        return filepath
     except Exception as e:
         logger.error(f"❌ Failed to save strategy results: {e}")
 
@@ -61,9 +212,10 @@ def save_exposures(exposures: Dict[str, Any], out_dir: Path):
     ensure_dir(out_dir)
     filepath = out_dir / "exposures.json"
     try:
-        with open(filepath, "w") as f:
+        with atomic_write(filepath) as f:
             json.dump(exposures, f, indent=2, default=str)
         logger.info(f"✅ Exposures saved at {filepath}")
+        return filepath
     except Exception as e:
         logger.error(f"❌ Failed to save exposures: {e}")
 
@@ -73,8 +225,10 @@ def save_drawdowns(drawdowns: pd.DataFrame, out_dir: Path):
     ensure_dir(out_dir)
     filepath = out_dir / "drawdowns.csv"
     try:
-        drawdowns.to_csv(filepath, index=False)
+        with atomic_write(filepath, newline="") as f:
+            drawdowns.to_csv(f, index=False)
         logger.info(f"✅ Drawdowns saved at {filepath}")
+        return filepath
     except Exception as e:
         logger.error(f"❌ Failed to save drawdowns: {e}")
 
@@ -84,9 +238,10 @@ def save_performance(performance: Dict[str, Any], out_dir: Path):
     ensure_dir(out_dir)
     filepath = out_dir / "performance.json"
     try:
-        with open(filepath, "w") as f:
+        with atomic_write(filepath) as f:
             json.dump(performance, f, indent=2, default=str)
         logger.info(f"✅ Performance metrics saved at {filepath}")
+        return filepath
     except Exception as e:
         logger.error(f"❌ Failed to save performance metrics: {e}")
 
@@ -96,25 +251,55 @@ def save_stress_summary(stress_results: Dict[str, Any], out_dir: Path):
     ensure_dir(out_dir)
     filepath = out_dir / "stress_summary.json"
     try:
-        with open(filepath, "w") as f:
+        with atomic_write(filepath) as f:
             json.dump(stress_results, f, indent=2, default=str)
         logger.info(f"✅ Stress test summary saved at {filepath}")
+        return filepath
     except Exception as e:
         logger.error(f"❌ Failed to save stress test summary: {e}")
 
 
 def save_audit_log(audit_dict: Dict[str, Any], out_dir: Path):
-    """Save full audit metadata as JSON."""
-    ensure_dir(out_dir)
-    filepath = out_dir / "audit.json"
+    """Append full audit metadata to the audit journal (out_dir/audit)."""
+    audit_dir = out_dir / "audit"
+    ensure_dir(audit_dir)
     try:
-        with open(filepath, "w") as f:
-            json.dump(audit_dict, f, indent=2, default=str)
-        logger.info(f"✅ Audit log saved at {filepath}")
+        run_id = append_run(audit_dict, audit_dir)
+        logger.info(f"✅ Audit run {run_id} appended to {audit_dir / JOURNAL_NAME}")
+        return audit_dir / JOURNAL_NAME
     except Exception as e:
         logger.error(f"❌ Failed to save audit log: {e}")
 
 
+def save_results_store(tables: Dict[str, pd.DataFrame], store_dir: Path, run_date, book: str = "default"):
+    """Append this run's result tables to the partitioned Parquet results store."""
+    ensure_dir(store_dir)
+    written = []
+    try:
+        written = write_tables(store_dir, tables, run_date, book)
+        logger.info(f"🗄️ {len(written)} tables written to results store {store_dir} (book={book})")
+    except Exception as e:
+        logger.error(f"❌ Failed to write results store: {e}")
+    return written
+
+
+def save_event_store(limit_events: pd.DataFrame, rules: List[Dict[str, Any]], store_path: Path,
+                     book: str = "default", run_time: str = None):
+    """Record limit changes, breach alerts and this run's report generation in the event store."""
+    from risk_analytics.event_store import append_events, alert_events, sync_limits
+
+    try:
+        changes = sync_limits(store_path, rules)
+        report = {"ts": run_time, "event_type": "report", "category": "Reporting", "severity": "INFO",
+                  "source": book, "message": f"Risk reports generated (book={book})",
+                  "payload": {"output_dir": str(store_path.parent), "breach_events": len(limit_events)}}
+        written = append_events(store_path, alert_events(limit_events, book, run_time) + [report])
+        logger.info(f"✅ Event store updated at {store_path} ({written} events, {changes} limit changes)")
+        return store_path
+    except Exception as e:
+        logger.error(f"❌ Failed to update event store: {e}")
+
+
 def save_csvs(
     daily_pnl: pd.Series,
     daily_return: pd.Series,
@@ -123,16 +308,63 @@ def save_csvs(
 ):
     """Save PnL and returns to CSVs."""
     ensure_dir(out_dir)
+    written = []
     try:
-        daily_pnl.to_csv(out_dir / "daily_pnl.csv", index=True)
-        daily_return.to_csv(out_dir / "daily_returns.csv", index=True)
+        outputs = {"daily_pnl.csv": daily_pnl, "daily_returns.csv": daily_return}
+        outputs.update({f"strategy_returns_{strat}.csv": series for strat, series in strat_returns.items()})
 
-        for strat, series in strat_returns.items():
-            series.to_csv(out_dir / f"strategy_returns_{strat}.csv", index=True)
+        for filename, series in outputs.items():
+            with atomic_write(out_dir / filename, newline="") as f:
+                series.to_csv(f, index=True)
+            written.append(out_dir / filename)
 
         logger.info(f"📊 CSV outputs saved under: {out_dir}")
     except Exception as e:
         logger.error(f"❌ Failed to save CSV outputs: {e}")
+    return written
+
+
+def performance_plot_specs(
+    daily_pnl: pd.Series,
+    cum_returns: pd.Series,
+    rolling_sharpe: pd.Series,
+    drawdown: pd.Series,
+    out_dir: Path,
+    sharpe_window: int,
+    prefix: str = "",
+) -> List[Dict[str, Any]]:
+    """Chart specs for the standard performance plot set (PnL, cumulative, Sharpe, drawdowns)."""
+    return [
+        line_chart_spec(daily_pnl, f"{prefix}Daily PnL", out_dir / "daily_pnl.png"),
+        line_chart_spec(cum_returns, f"{prefix}Cumulative Returns", out_dir / "cumulative_returns.png"),
+        line_chart_spec(rolling_sharpe, f"{prefix}Rolling Sharpe Ratio ({sharpe_window}-day)",
+                        out_dir / "rolling_sharpe.png", hlines=[{"y": 0, "color": "red"}]),
+        line_chart_spec(drawdown, f"{prefix}Drawdowns", out_dir / "drawdowns.png",
+                        hlines=[{"y": 0, "color": "black"}]),
+    ]
+
+
+def strategy_plot_specs(
+    strategy_pnl: pd.DataFrame,
+    initial_nav: float,
+    out_dir: Path,
+    sharpe_window: int,
+    risk_free_rate: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """Chart specs for one performance plot set per strategy under out_dir/strategies/<name>/."""
+    specs = []
+    for strat in strategy_pnl.columns:
+        pnl = strategy_pnl[strat].fillna(0.0)
+        nav = initial_nav + pnl.cumsum()
+        daily_return = nav.pct_change().fillna(0.0)
+        drawdown, _ = compute_drawdown(nav)
+        sharpe = rolling_sharpe_ratio(daily_return, risk_free_rate / 252, window=sharpe_window)
+
+        strat_dir = out_dir / "strategies" / str(strat)
+        ensure_dir(strat_dir)
+        specs += performance_plot_specs(pnl, nav, sharpe, drawdown, strat_dir, sharpe_window,
+                                        prefix=f"{strat}: ")
+    return specs
 
 
 def save_plots(
@@ -142,36 +374,35 @@ def save_plots(
     drawdown: pd.Series,
     out_dir: Path,
     sharpe_window: int,
+    max_workers: int = None,
 ):
-    """Save key performance plots for visualization."""
-    ensure_dir(out_dir)
-    try:
-        # Daily PnL
-        daily_pnl.plot(title="Daily PnL", figsize=(10, 4))
-        plt.tight_layout()
-        plt.savefig(out_dir / "daily_pnl.png")
-        plt.close()
-
-        # Cumulative Returns
-        cum_returns.plot(title="Cumulative Returns", figsize=(10, 4))
-        plt.tight_layout()
-        plt.savefig(out_dir / "cumulative_returns.png")
-        plt.close()
-
-        # Rolling Sharpe
-        rolling_sharpe.plot(title=f"Rolling Sharpe Ratio ({sharpe_window}-day)", figsize=(10, 4))
-        plt.axhline(0, color="red", linestyle="--", linewidth=1)
-        plt.tight_layout()
-        plt.savefig(out_dir / "rolling_sharpe.png")
-        plt.close()
-
-        # Drawdowns
-        drawdown.plot(title="Drawdowns", figsize=(10, 4))
-        plt.axhline(0, color="black", linestyle="--", linewidth=1)
-        plt.tight_layout()
-        plt.savefig(out_dir / "drawdowns.png")
-        plt.close()
-
+    """Save key performance plots for visualization (rendered in parallel)."""
+    ensure_dir(out_dir)
+    written = []
+    try:
+        specs = performance_plot_specs(daily_pnl, cum_returns, rolling_sharpe, drawdown, out_dir, sharpe_window)
+        written = render_figures(specs, max_workers)
         logger.info(f"📈 Plots saved under: {out_dir}")
     except Exception as e:
         logger.error(f"❌ Failed to save plots: {e}")
+    return written
+
+
+def save_strategy_plots(
+    strategy_pnl: pd.DataFrame,
+    initial_nav: float,
+    out_dir: Path,
+    sharpe_window: int,
+    risk_free_rate: float = 0.0,
+    max_workers: int = None,
+):
+    """Save one performance plot set per strategy (rendered in parallel)."""
+    ensure_dir(out_dir)
+    written = []
+    try:
+        specs = strategy_plot_specs(strategy_pnl, initial_nav, out_dir, sharpe_window, risk_free_rate)
+        written = render_figures(specs, max_workers)
+        logger.info(f"📈 Strategy plots saved under: {out_dir / 'strategies'}")
+    except Exception as e:
+        logger.error(f"❌ Failed to save strategy plots: {e}")
+    return written
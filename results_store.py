@@ -0,0 +1,173 @@
+"""
+Columnar results store for Risk Analytics Platform
+Partitioned Parquet dataset keyed by run date and book:
+
+    <root>/<table>/run_date=YYYY-MM-DD/book=<book>/part-0.parquet
+
+Re-running a (run_date, book) replaces that partition; other runs accumulate.
+Readers select columns, books and run/date ranges with predicate pushdown.
+Requires pyarrow (imported on first use).
+"""
+
+import os
+import logging
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable
+
+import pandas as pd
+
+
+logger = logging.getLogger("risk_analytics.results_store")
+
+PARTITION_KEYS = ("run_date", "book")
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("The results store requires pyarrow (pip install pyarrow)") from e
+    return pa, ds, pq
+
+
+def _run_date_str(run_date) -> str:
+    if isinstance(run_date, (datetime, date)):
+        return run_date.strftime("%Y-%m-%d")
+    return pd.Timestamp(run_date).strftime("%Y-%m-%d")
+
+
+def partition_path(root: Path, table: str, run_date, book: str) -> Path:
+    """Directory holding one (table, run_date, book) partition."""
+    return Path(root) / table / f"run_date={_run_date_str(run_date)}" / f"book={book}"
+
+
+def write_table(root: Path, table: str, df: pd.DataFrame, run_date, book: str = "default") -> Path:
+    """
+    Write one result table for a run as a Parquet partition (atomic replace).
+    A non-default index is stored as regular columns.
+    """
+    pa, _, pq = _arrow()
+
+    frame = df
+    if not isinstance(frame.index, pd.RangeIndex) or frame.index.name is not None:
+        frame = frame.reset_index()
+    frame = frame.drop(columns=[c for c in PARTITION_KEYS if c in frame.columns])
+    frame.columns = [str(c) for c in frame.columns]
+
+    part_dir = partition_path(root, table, run_date, book)
+    part_dir.mkdir(parents=True, exist_ok=True)
+    path = part_dir / "part-0.parquet"
+    tmp_path = part_dir / f".part-0.parquet.{os.getpid()}.tmp"
+    try:
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return path
+
+
+def write_tables(root: Path, tables: Dict[str, pd.DataFrame], run_date, book: str = "default") -> List[Path]:
+    """Write several result tables for one run; empty tables are skipped."""
+    return [write_table(root, name, df, run_date, book) for name, df in tables.items()
+            if df is not None and not df.empty]
+
+
+def list_tables(root: Path) -> List[str]:
+    """Names of tables present in the store."""
+    root = Path(root)
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+
+def _scalar_for(pa, value, arrow_type):
+    """Convert a date-like bound to a scalar comparable with the column type."""
+    ts = pd.Timestamp(value)
+    if pa.types.is_date(arrow_type):
+        return pa.scalar(ts.date(), type=arrow_type)
+    if pa.types.is_timestamp(arrow_type):
+        return pa.scalar(ts.to_pydatetime(), type=pa.timestamp("us")).cast(arrow_type)
+    return pa.scalar(str(ts.date()))
+
+
+def read_table(
+    root: Path,
+    table: str,
+    columns: Optional[Iterable[str]] = None,
+    books: Optional[Iterable[str]] = None,
+    run_start=None,
+    run_end=None,
+    start=None,
+    end=None,
+    date_column: str = "date",
+) -> pd.DataFrame:
+    """
+    Read a result table across runs.
+
+    Args:
+        root: store root directory
+        table: table name (e.g. "daily_risk_metrics")
+        columns: columns to read (partition keys run_date/book may be included)
+        books: restrict to these books
+        run_start / run_end: inclusive run_date bounds
+        start / end: inclusive bounds on `date_column` when the table has it
+
+    Returns:
+        DataFrame (empty if the table does not exist)
+    """
+    pa, ds, pq = _arrow()
+    table_dir = Path(root) / table
+    files = sorted(table_dir.glob("run_date=*/book=*/*.parquet"))
+    if not files:
+        return pd.DataFrame(columns=list(columns) if columns else None)
+
+    # Unify schemas so columns added in later runs stay readable
+    partition_schema = pa.schema([(k, pa.string()) for k in PARTITION_KEYS])
+    data_schema = pa.unify_schemas([pq.read_schema(f) for f in files])
+    schema = pa.unify_schemas([data_schema, partition_schema])
+    dataset = ds.dataset(
+        table_dir,
+        schema=schema,
+        format="parquet",
+        partitioning=ds.partitioning(partition_schema, flavor="hive"),
+    )
+
+    expr = None
+
+    def _and(e):
+        return e if expr is None else expr & e
+
+    if books is not None:
+        expr = _and(ds.field("book").isin([str(b) for b in books]))
+    if run_start is not None:
+        expr = _and(ds.field("run_date") >= _run_date_str(run_start))
+    if run_end is not None:
+        expr = _and(ds.field("run_date") <= _run_date_str(run_end))
+    if date_column in data_schema.names:
+        date_type = data_schema.field(date_column).type
+        if start is not None:
+            expr = _and(ds.field(date_column) >= _scalar_for(pa, start, date_type))
+        if end is not None:
+            expr = _and(ds.field(date_column) <= _scalar_for(pa, end, date_type))
+
+    cols = list(columns) if columns is not None else None
+    return dataset.to_table(columns=cols, filter=expr).to_pandas()
+
+
+def flatten_results(results: Dict[str, Any], key_name: str) -> pd.DataFrame:
+    """
+    Dict-of-dicts results (strategy_results, stress_results, ...) as one row per key,
+    keeping only scalar fields so the frame is columnar.
+    """
+    rows = []
+    for key, values in results.items():
+        if not isinstance(values, dict):
+            continue
+        row = {key_name: str(key)}
+        row.update({k: v for k, v in values.items() if v is None or isinstance(v, (str, int, float, bool))})
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -104,3 +104,235 @@ def calculate_performance(nav_series: pd.Series, risk_free_rate=0.0, ann_factor=
         "cagr": float(cagr) if cagr is not None else None,
         "max_drawdown": max_dd
     }
+
+
+def _tail_from_partition(part: np.ndarray, window: int, level: float):
+    """
+    VaR cutoff and ES for each row of a partitioned window matrix.
+    Matches np.percentile (linear) and the `arr <= cutoff` tail mean of calculate_var_es.
+    """
+    q = (1 - level) * 100 / 100
+    pos = (window - 1) * q
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, window - 1)
+    t = pos - lo
+
+    a, b = part[:, lo], part[:, hi]
+    diff = b - a
+    cutoff = np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+    # positions <= lo are all <= cutoff; anything after may tie with it
+    head = part[:, :lo + 1].sum(axis=1)
+    rest = part[:, lo + 1:]
+    in_tail = rest <= cutoff[:, None]
+    total = head + np.where(in_tail, rest, 0.0).sum(axis=1)
+    count = (lo + 1) + in_tail.sum(axis=1)
+    return cutoff, total / count
+
+
+def _tail_kth(window: int, levels) -> list:
+    kth = set()
+    for level in levels:
+        lo = int(np.floor((window - 1) * ((1 - level) * 100 / 100)))
+        kth.update({lo, min(lo + 1, window - 1)})
+    return sorted(kth)
+
+
+def rolling_var_es(pnl_series: pd.Series, window: int = 30, levels=[0.95, 0.99],
+                   chunk_size: int = 2_000_000) -> pd.DataFrame:
+    """
+    Rolling historical VaR/ES over every full window, vectorized.
+    Each window is reduced with a partial sort (np.partition) at the quantile ranks
+    only, so the whole series costs O(n*w) instead of n full sorts.
+    Returns a DataFrame indexed by window end with VaR_xx/ES_xx columns
+    (positive losses, same definition as calculate_var_es).
+    """
+    pnl_clean = pnl_series.dropna()
+    cols = [f"{m}_{int(l*100)}" for l in levels for m in ("VaR", "ES")]
+    if len(pnl_clean) < window:
+        return pd.DataFrame(columns=cols, dtype=float)
+
+    arr = np.asarray(pnl_clean, dtype=float)
+    windows = np.lib.stride_tricks.sliding_window_view(arr, window)
+    kth = _tail_kth(window, levels)
+    rows = max(1, chunk_size // window)
+
+    out = {c: np.empty(len(windows)) for c in cols}
+    for start in range(0, len(windows), rows):
+        part = np.partition(windows[start:start + rows], kth, axis=1)
+        for level in levels:
+            cutoff, es = _tail_from_partition(part, window, level)
+            out[f"VaR_{int(level*100)}"][start:start + rows] = -cutoff
+            out[f"ES_{int(level*100)}"][start:start + rows] = -es
+
+    return pd.DataFrame(out, index=pnl_clean.index[window - 1:])[cols]
+
+
+def var_es_matrix(values: np.ndarray, levels=[0.95, 0.99]) -> dict:
+    """
+    Historical VaR/ES for each row of a (series x observations) matrix in one
+    partial sort, same definition as calculate_var_es (rows must be NaN-free).
+    Returns {VaR_xx: array, ES_xx: array} as positive losses.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_obs = values.shape[1]
+    if n_obs == 0:
+        return {f"{m}_{int(l*100)}": np.full(values.shape[0], np.nan) for l in levels for m in ("VaR", "ES")}
+
+    part = np.partition(values, _tail_kth(n_obs, levels), axis=1)
+    results = {}
+    for level in levels:
+        cutoff, es = _tail_from_partition(part, n_obs, level)
+        results[f"VaR_{int(level*100)}"] = -cutoff
+        results[f"ES_{int(level*100)}"] = -es
+    return results
+
+
+def stressed_var_es(pnl, window: int = 250, levels=[0.95, 0.99]) -> dict:
+    """
+    Stressed VaR/ES: scan every `window`-day period with rolling_var_es and, per
+    confidence level, report VaR/ES from the period with the largest VaR.
+    Accepts a Series, or a DataFrame (one result per column, e.g. per strategy).
+    If the history is shorter than the window, the full history is used.
+    """
+    if isinstance(pnl, pd.DataFrame):
+        return {str(col): stressed_var_es(pnl[col], window, levels) for col in pnl.columns}
+
+    pnl_clean = pnl.dropna()
+    if pnl_clean.empty:
+        return {**{f"sVaR_{int(l*100)}": None for l in levels},
+                **{f"sES_{int(l*100)}": None for l in levels}}
+
+    eff_window = min(window, len(pnl_clean))
+    rolling = rolling_var_es(pnl_clean, eff_window, levels)
+
+    results = {"window": eff_window, "observations": len(pnl_clean)}
+    for level in levels:
+        label = int(level * 100)
+        pos = int(np.argmax(rolling[f"VaR_{label}"].to_numpy()))
+        results[f"sVaR_{label}"] = float(rolling[f"VaR_{label}"].iloc[pos])
+        results[f"sES_{label}"] = float(rolling[f"ES_{label}"].iloc[pos])
+        results[f"window_start_{label}"] = str(pnl_clean.index[pos])
+        results[f"window_end_{label}"] = str(pnl_clean.index[pos + eff_window - 1])
+
+    return results
+
+
+def weighted_var_es(values: np.ndarray, weights: np.ndarray, levels=[0.95, 0.99]) -> dict:
+    """
+    Weighted historical VaR/ES for each row of a (rows x window) matrix.
+    The quantile interpolates linearly between sorted P&L placed at plotting
+    positions (S_i - w_i/2 - w_1/2) / (1 - w_1/2 - w_n/2), where S_i is the
+    cumulative weight; with equal weights these are i/(n-1), so the result is
+    np.percentile (linear) as in calculate_var_es. ES is the weighted mean of
+    the P&L at or below the cutoff. Only the smallest observations that can
+    hold the tail mass are sorted (np.argpartition first).
+    `weights` is (window,) or (rows x window) and is normalized per row.
+    Returns {VaR_xx: array, ES_xx: array} as positive losses.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    weights = np.asarray(weights, dtype=float)
+    shared = weights.ndim == 1
+    weights = np.broadcast_to(weights, values.shape)
+    weights = weights / weights.sum(axis=1, keepdims=True)
+    n = values.shape[1]
+    rows = np.arange(values.shape[0])[:, None]
+
+    # The lowest `head` observations always carry more than the largest tail mass:
+    # enough of the smallest weights (shared weights) or of the minimum weight to cover it
+    q_max = max(1 - level for level in levels)
+    if shared:
+        head = int(np.searchsorted(np.cumsum(np.sort(weights[0])), q_max)) + 3
+    else:
+        w_min = weights.min()
+        head = n if w_min <= 0 else int(np.ceil(q_max / w_min)) + 2
+    head = min(n, head)
+    if head < n:
+        # Partition, then restore index order so ties sort as in a full stable sort
+        idx = np.sort(np.argpartition(values, head - 1, axis=1)[:, :head], axis=1)
+    else:
+        idx = np.broadcast_to(np.arange(n), values.shape)
+    idx = np.take_along_axis(idx, np.argsort(values[rows, idx], axis=1, kind="stable"), axis=1)
+    x, w = values[rows, idx], weights[rows, idx]
+
+    # End weights of the stable sorted order; beyond the head, the last of tied maxima
+    w_first = w[:, :1]
+    w_last = w[:, -1:] if head == n else weights[rows[:, 0], n - 1 - values[:, ::-1].argmax(axis=1)][:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pos = (np.cumsum(w, axis=1) - w / 2 - w_first / 2) / (1 - w_first / 2 - w_last / 2)
+
+    results = {}
+    for level in levels:
+        q = 1 - level
+        if n == 1:
+            cutoff = x[:, 0]
+        else:
+            k = np.clip((pos <= q).sum(axis=1) - 1, 0, head - 2)[:, None]
+            x_k, x_next = np.take_along_axis(x, k, axis=1), np.take_along_axis(x, k + 1, axis=1)
+            p_k, p_next = np.take_along_axis(pos, k, axis=1), np.take_along_axis(pos, k + 1, axis=1)
+            cutoff = (x_k + (q - p_k) / (p_next - p_k) * (x_next - x_k))[:, 0]
+        in_tail = values <= cutoff[:, None]
+        tail_w = np.where(in_tail, weights, 0.0)
+        results[f"VaR_{int(level*100)}"] = -cutoff
+        results[f"ES_{int(level*100)}"] = -(tail_w * values).sum(axis=1) / tail_w.sum(axis=1)
+    return results
+
+
+def rolling_age_weighted_var_es(pnl_series: pd.Series, window: int = 30, levels=[0.95, 0.99],
+                                lam: float = 0.98, chunk_size: int = 2_000_000) -> pd.DataFrame:
+    """
+    Rolling BRW (Boudoukh-Richardson-Whitelaw) age-weighted historical VaR/ES.
+    The observation of age a in the window gets weight proportional to lam**a,
+    so recent P&L dominates. All windows are evaluated in batched weighted_var_es calls.
+    """
+    pnl_clean = pnl_series.dropna()
+    cols = [f"{m}_{int(l*100)}" for l in levels for m in ("VaR", "ES")]
+    if len(pnl_clean) < window:
+        return pd.DataFrame(columns=cols, dtype=float)
+
+    arr = np.asarray(pnl_clean, dtype=float)
+    windows = np.lib.stride_tricks.sliding_window_view(arr, window)
+    age = np.arange(window - 1, -1, -1)
+    weights = lam ** age
+
+    rows = max(1, chunk_size // window)
+    out = {c: np.empty(len(windows)) for c in cols}
+    for start in range(0, len(windows), rows):
+        chunk = weighted_var_es(windows[start:start + rows], weights, levels)
+        for c in cols:
+            out[c][start:start + rows] = chunk[c]
+
+    return pd.DataFrame(out, index=pnl_clean.index[window - 1:])[cols]
+
+
+def ewma_volatility(pnl_series: pd.Series, lam: float = 0.94) -> pd.DataFrame:
+    """
+    EWMA (RiskMetrics) volatility of a P&L/return series.
+    Returns a DataFrame with `sigma_prior` (estimate using data up to t-1, used to
+    standardize observation t) and `sigma_post` (estimate including t, i.e. the
+    forecast for t+1).
+    """
+    var_post = (pnl_series.astype(float) ** 2).ewm(alpha=1 - lam, adjust=True).mean()
+    sigma_post = np.sqrt(var_post)
+    sigma_prior = sigma_post.shift(1).bfill()
+    return pd.DataFrame({"sigma_prior": sigma_prior, "sigma_post": sigma_post})
+
+
+def rolling_filtered_var_es(pnl_series: pd.Series, window: int = 30, levels=[0.95, 0.99],
+                            lam: float = 0.94) -> pd.DataFrame:
+    """
+    Rolling Hull-White volatility-scaled (filtered) historical VaR/ES.
+    Each P&L in the window is rescaled to the current EWMA volatility,
+    x_i * sigma_T / sigma_i. Because sigma_T is common to the whole window, the
+    order statistics are those of the standardized series x_i / sigma_i, so this
+    is rolling_var_es on the standardized series times sigma_T.
+    """
+    pnl_clean = pnl_series.dropna()
+    cols = [f"{m}_{int(l*100)}" for l in levels for m in ("VaR", "ES")]
+    if len(pnl_clean) < window:
+        return pd.DataFrame(columns=cols, dtype=float)
+
+    vol = ewma_volatility(pnl_clean, lam)
+    standardized = pnl_clean / vol["sigma_prior"].replace(0, np.nan)
+    rolling = rolling_var_es(standardized.fillna(0.0), window, levels)
+    return rolling.mul(vol["sigma_post"].iloc[window - 1:].to_numpy(), axis=0)
@@ -0,0 +1,259 @@
+"""
+Parallel executor for stress scenario libraries.
+Shards scenarios (optionally x dates) across a process pool. The trading snapshot
+is copied once into shared memory and attached by each worker at start-up, so
+tasks only carry scenario definitions. Runs serially unless execution.max_workers
+is set, and falls back to the identical serial path when the memory budget does
+not allow parallelism.
+"""
+
+import logging
+import math
+import traceback
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from risk_analytics.stress import run_stress_scenario
+
+
+logger = logging.getLogger("risk_analytics.scenario_executor")
+
+_ALIGN = 64
+_INDEX_KEY = "__index__"
+
+# Per-process state populated by _init_worker (or by the serial path)
+_WORKER: Dict[str, Any] = {}
+
+
+# ---------------------------------
+# Shared-Memory Snapshot
+# ---------------------------------
+def _column_payload(values: pd.Series) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Split a column into a shareable numpy array plus small metadata."""
+    dtype = values.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        return np.ascontiguousarray(values.to_numpy()), {"kind": "array", "dtype": dtype}
+
+    # Strings, dates, categoricals etc. travel as integer codes + uniques
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    return codes.astype(np.int32), {
+        "kind": "codes",
+        "dtype": dtype,
+        "uniques": np.asarray(uniques, dtype=object),
+    }
+
+
+def export_snapshot(df: pd.DataFrame) -> Tuple["shared_memory.SharedMemory", List[Dict[str, Any]]]:
+    """
+    Copy a DataFrame into one shared memory block.
+    Returns the block and the column spec needed to re-attach it.
+    """
+    from multiprocessing import shared_memory
+    payloads = [(_INDEX_KEY, *_column_payload(pd.Series(df.index)))]
+    payloads += [(col, *_column_payload(df[col])) for col in df.columns]
+
+    spec, offset = [], 0
+    for name, arr, meta in payloads:
+        offset = int(math.ceil(offset / _ALIGN) * _ALIGN)
+        spec.append({**meta, "name": name, "offset": offset,
+                     "shape": arr.shape, "array_dtype": arr.dtype})
+        offset += arr.nbytes
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (_, arr, _), entry in zip(payloads, spec):
+        target = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf, offset=entry["offset"])
+        target[...] = arr
+    return shm, spec
+
+
+def attach_snapshot(shm: "shared_memory.SharedMemory", spec: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Rebuild the DataFrame from a shared memory block (numeric columns are not copied)."""
+    columns = {}
+    index = None
+    for entry in spec:
+        arr = np.ndarray(entry["shape"], dtype=entry["array_dtype"], buffer=shm.buf, offset=entry["offset"])
+        arr.flags.writeable = False
+        if entry["kind"] == "array":
+            values = arr
+        else:
+            uniques = entry["uniques"]
+            decoded = np.full(arr.shape, np.nan, dtype=object)
+            valid = arr >= 0
+            if len(uniques):
+                decoded[valid] = uniques.take(arr[valid])
+            values = pd.Series(decoded, dtype=entry["dtype"])
+
+        if entry["name"] == _INDEX_KEY:
+            index = pd.Index(values)
+        else:
+            columns[entry["name"]] = values
+
+    frame = pd.DataFrame(columns, copy=False)
+    if index is not None:
+        frame.index = index
+    return frame
+
+
+# ---------------------------------
+# Task Execution
+# ---------------------------------
+def _init_worker(shm_name, spec, nav_series, config, factor_returns):
+    """Process-pool initializer: attach the shared snapshot once per worker."""
+    from multiprocessing import shared_memory
+    # Workers share the parent's resource tracker; the parent unlinks the block
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _set_context(attach_snapshot(shm, spec), nav_series, config, factor_returns, shm=shm)
+
+
+def _set_context(df, nav_series, config, factor_returns, shm=None):
+    _WORKER.clear()
+    _WORKER.update({
+        "df": df,
+        "nav_series": nav_series,
+        "config": config,
+        "factor_returns": factor_returns,
+        "shm": shm,
+        "date_rows": None,
+    })
+
+
+def _day_frame(date) -> pd.DataFrame:
+    """Rows for one date, using a per-process date -> row index built once."""
+    if _WORKER["date_rows"] is None:
+        _WORKER["date_rows"] = _WORKER["df"].groupby("date").indices
+    rows = _WORKER["date_rows"].get(date)
+    df = _WORKER["df"]
+    return df.iloc[rows].copy() if rows is not None else df.iloc[0:0].copy()
+
+
+def _run_shard(items: List[Tuple[Any, Any, Optional[float], Dict[str, Any]]]) -> List[Tuple]:
+    """
+    Run a shard of (name, date, nav, scenario) tasks.
+    Date tasks run against that day's rows with a single-value NAV series,
+    mirroring calculate_daily_stress_scenarios.
+    """
+    out = []
+    for name, date, nav_today, scenario in items:
+        try:
+            if date is None:
+                df, nav_series, as_of = _WORKER["df"], _WORKER["nav_series"], None
+            else:
+                df = _day_frame(date)
+                nav_series = pd.Series([nav_today], index=[date])
+                as_of = date
+            result = run_stress_scenario(
+                df, scenario, nav_series, _WORKER["config"], _WORKER["factor_returns"], as_of=as_of,
+            )
+            out.append((name, date, result, None))
+        except Exception as e:
+            out.append((name, date, None, {"error": f"{type(e).__name__}: {e}",
+                                           "traceback": traceback.format_exc()}))
+    return out
+
+
+def _plan_workers(snapshot_bytes: int, n_tasks: int, max_workers: int, memory_budget_mb: Optional[float]) -> int:
+    """
+    Worker count allowed by config and memory budget.
+    Budget model: one shared snapshot plus one snapshot-sized working set per worker.
+    """
+    workers = min(max_workers, n_tasks)
+    if memory_budget_mb:
+        budget = memory_budget_mb * 1024 * 1024
+        per_worker = max(snapshot_bytes, 1)
+        workers = min(workers, int((budget - snapshot_bytes) // per_worker))
+    return max(workers, 1)
+
+
+def execute_scenarios(
+    df: pd.DataFrame,
+    scenarios: Dict[str, Dict[str, Any]],
+    nav_series: pd.Series,
+    config: Dict[str, Any],
+    factor_returns: Optional[pd.DataFrame] = None,
+    dates: Optional[List[Any]] = None,
+    max_workers: Optional[int] = None,
+    memory_budget_mb: Optional[float] = None,
+) -> Tuple[Dict[Any, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Run a scenario library, in parallel where config allows.
+
+    Args:
+        df: merged trading DataFrame (snapshot shared with workers)
+        scenarios: name -> scenario definition (as in config["stress_scenarios"]["scenarios"])
+        nav_series: NAV series by date
+        config: configuration dictionary; `execution.max_workers` and
+            `execution.memory_budget_mb` are used when arguments are not given
+            (no max_workers anywhere: serial, in this process)
+        factor_returns: date x factor history for conditional scenarios
+        dates: if given, run every scenario for each date on that day's rows
+
+    Returns:
+        (results, failures). results is keyed by scenario name, or by (date, name)
+        when dates are given; unknown scenario types are omitted. failures is a
+        list of dicts with scenario, date, error and traceback.
+    """
+    exec_cfg = config.get("execution", {}) or {}
+    if max_workers is None:
+        max_workers = exec_cfg.get("max_workers") or 1
+    if memory_budget_mb is None:
+        memory_budget_mb = exec_cfg.get("memory_budget_mb")
+
+    if dates is None:
+        tasks = [(name, None, None, s) for name, s in scenarios.items()]
+    else:
+        tasks = []
+        for date in dates:
+            nav_today = nav_series[nav_series.index == date]
+            nav_value = float(nav_today.iloc[0]) if len(nav_today) > 0 else float(nav_series.iloc[-1])
+            tasks += [(name, date, nav_value, s) for name, s in scenarios.items()]
+
+    if not tasks:
+        return {}, []
+
+    snapshot_bytes = int(df.memory_usage(index=True, deep=False).sum())
+    workers = _plan_workers(snapshot_bytes, len(tasks), int(max_workers), memory_budget_mb)
+
+    if workers <= 1:
+        logger.info(f"Running {len(tasks)} scenario tasks serially")
+        _set_context(df, nav_series, config, factor_returns)
+        try:
+            shard_results = [_run_shard(tasks)]
+        finally:
+            _WORKER.clear()
+    else:
+        n_shards = min(len(tasks), workers * 4)
+        shards = [tasks[i::n_shards] for i in range(n_shards)]
+        logger.info(f"Running {len(tasks)} scenario tasks on {workers} workers in {n_shards} shards "
+                    f"(snapshot {snapshot_bytes / 1e6:.1f} MB)")
+        from concurrent.futures import ProcessPoolExecutor
+        shm, spec = export_snapshot(df)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(shm.name, spec, nav_series, config, factor_returns),
+            ) as pool:
+                shard_results = list(pool.map(_run_shard, shards))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    # Re-assemble in task order so output matches the serial path exactly
+    by_key = {}
+    for shard in shard_results:
+        for name, date, result, error in shard:
+            by_key[(name, date)] = (result, error)
+
+    results, failures = {}, []
+    for name, date, _, _ in tasks:
+        result, error = by_key[(name, date)]
+        key = name if dates is None else (date, name)
+        if error is not None:
+            failures.append({"scenario": name, "date": date, **error})
+            logger.warning(f"Stress scenario '{name}' failed" + (f" for date {date}" if date is not None else "")
+                           + f": {error['error']}")
+        elif result is not None:
+            results[key] = result
+    return results, failures
@@ -1,11 +1,17 @@
 """
 Stress testing functions for portfolio scenarios.
-Supports sector shocks, rate shocks, and volatility scenarios.
+Supports sector shocks, rate shocks, volatility scenarios and
+factor-conditional shocks propagated through the historical covariance.
 Industry-ready with audit logging.
 """
 
+import weakref
+
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+
+from risk_analytics.factors import RATES_FACTOR, VOL_FACTOR, fixed_income_durations
 
 
 def sector_shock_impact(
@@ -74,12 +80,7 @@ def rates_shock_impact(
         return result
 
     # Duration mapping
-    if duration_col in fixed_income.columns:
-        durations = pd.to_numeric(fixed_income[duration_col], errors="coerce").fillna(default_duration)
-    elif "credit_rating" in fixed_income.columns:
-        durations = fixed_income["credit_rating"].map(duration_map).fillna(default_duration)
-    else:
-        durations = pd.Series([default_duration] * len(fixed_income))
+    durations = fixed_income_durations(fixed_income, duration_col, duration_map, default_duration)
 
     avg_duration = durations.mean()
 
@@ -115,7 +116,8 @@ def volatility_shock_impact(
 ) -> Dict[str, Any]:
     """
     Estimate impact of higher volatility regime by scaling portfolio volatility.
-    Uses volatility_30d in decimal form (e.g., 0.02 = 2%).
+    Uses volatility_30d in decimal form (e.g., 0.02 = 2%). Like the other
+    scenarios, impact_usd is P&L (negative = loss).
     """
     result = {"shock": "volatility", "vol_mult": vol_mult}
 
@@ -134,8 +136,8 @@ def volatility_shock_impact(
     stressed_vol = base_vol * vol_mult
 
     nav_last = nav_series.get(last_date, nav_series.iloc[-1])
-    # Assume 1-day VaR impact ~ vol × NAV
-    impact_usd = (stressed_vol - base_vol) * nav_last
+    # Assume 1-day VaR impact ~ vol × NAV; higher vol is a loss
+    impact_usd = -(stressed_vol - base_vol) * nav_last
     impact_pct = impact_usd / nav_last if nav_last else None
 
     result.update({
@@ -147,3 +149,256 @@ def volatility_shock_impact(
         "status": "ok"
     })
     return result
+
+
+# ---------------------------------
+# Factor-Conditional Stress
+# ---------------------------------
+# Covariance and conditional-expectation blocks keyed by
+# (cache_key, factor history fingerprint, as_of, lookback).
+# Each entry holds the factor list, the covariance matrix and a dict of
+# regression blocks Sigma_US @ inv(Sigma_SS) keyed by the shocked factor subset.
+_FACTOR_COV_CACHE: Dict[Tuple, Dict[str, Any]] = {}
+# id(factor_returns) -> (weakref, fingerprint): hash each history once, not per call
+_FINGERPRINTS: Dict[int, Tuple[Any, Tuple]] = {}
+
+
+def clear_factor_cache():
+    """Drop all cached factor covariances (e.g. after reloading data)."""
+    _FACTOR_COV_CACHE.clear()
+    _FINGERPRINTS.clear()
+
+
+def factor_fingerprint(factor_returns: pd.DataFrame) -> Tuple:
+    """
+    Identity of a factor history for cache keys: shape, columns, index bounds
+    and a hash of the values, so different books never share a covariance.
+    """
+    memo = _FINGERPRINTS.get(id(factor_returns))
+    if memo is not None and memo[0]() is factor_returns:
+        return memo[1]
+    index = factor_returns.index
+    fingerprint = (
+        factor_returns.shape,
+        tuple(map(str, factor_returns.columns)),
+        str(index.min()) if len(index) else None,
+        str(index.max()) if len(index) else None,
+        int(pd.util.hash_pandas_object(factor_returns, index=True).sum()),
+    )
+    _FINGERPRINTS[id(factor_returns)] = (weakref.ref(factor_returns), fingerprint)
+    return fingerprint
+
+
+def factor_covariance(
+    factor_returns: pd.DataFrame,
+    as_of,
+    lookback: Optional[int] = None,
+    cache_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Historical factor covariance as of a date, cached per (cache_key, factor
+    history, as_of, lookback). Missing factor observations are treated as zero moves.
+    """
+    key = (cache_key, factor_fingerprint(factor_returns), as_of, lookback)
+    entry = _FACTOR_COV_CACHE.get(key)
+    if entry is not None:
+        return entry
+
+    hist = factor_returns[factor_returns.index <= as_of]
+    if lookback:
+        hist = hist.iloc[-lookback:]
+
+    values = hist.fillna(0.0).to_numpy(dtype=float)
+    if values.shape[0] > 1:
+        cov = np.cov(values, rowvar=False).reshape(values.shape[1], values.shape[1])
+    else:
+        cov = np.zeros((values.shape[1], values.shape[1]))
+
+    entry = {"factors": list(hist.columns), "cov": cov, "n_obs": int(values.shape[0]), "blocks": {}}
+    _FACTOR_COV_CACHE[key] = entry
+    return entry
+
+
+def conditional_factor_shock(entry: Dict[str, Any], shocks: Dict[str, float]) -> pd.Series:
+    """
+    Propagate shocks on a subset of factors to all factors via the conditional mean
+    E[x_U | x_S = s] = Sigma_US @ inv(Sigma_SS) @ s. Shocked factors keep their values.
+    """
+    factors = entry["factors"]
+    shocked = tuple(sorted(shocks))
+    index = {f: i for i, f in enumerate(factors)}
+    s_idx = [index[f] for f in shocked]
+    u_idx = [i for i in range(len(factors)) if factors[i] not in shocks]
+
+    block = entry["blocks"].get(shocked)
+    if block is None:
+        cov = entry["cov"]
+        sigma_ss = cov[np.ix_(s_idx, s_idx)]
+        sigma_us = cov[np.ix_(u_idx, s_idx)]
+        # pinv keeps degenerate (non-trading) factors from blowing up the solve
+        block = sigma_us @ np.linalg.pinv(sigma_ss)
+        entry["blocks"][shocked] = block
+
+    full = np.zeros(len(factors))
+    x_s = np.array([shocks[f] for f in shocked], dtype=float)
+    full[s_idx] = x_s
+    if u_idx:
+        full[u_idx] = block @ x_s
+    return pd.Series(full, index=factors)
+
+
+def factor_sensitivities(
+    latest: pd.DataFrame,
+    factors: list,
+    nav_last: float,
+    sector_col: str,
+    vol_col: str,
+    duration_col: Optional[str],
+    duration_map: Dict[str, float],
+    default_duration: float
+) -> pd.Series:
+    """
+    USD P&L per unit move of each factor, using the same exposure conventions
+    as the single-factor scenarios above (negative P&L = loss).
+    """
+    sens = pd.Series(0.0, index=factors)
+
+    if sector_col in latest.columns and "market_cap_usd" in latest.columns:
+        sector_mv = latest.groupby(sector_col)["market_cap_usd"].sum()
+        sector_mv.index = sector_mv.index.astype(str)
+        common = sens.index.intersection(sector_mv.index)
+        sens[common] = sector_mv[common]
+
+    if RATES_FACTOR in sens.index and "asset_class" in latest.columns:
+        fixed_income = latest[latest["asset_class"].str.contains("Fixed Income", na=False)]
+        if not fixed_income.empty and "market_cap_usd" in fixed_income.columns:
+            avg_duration = fixed_income_durations(
+                fixed_income, duration_col, duration_map, default_duration
+            ).mean()
+            sens[RATES_FACTOR] = -avg_duration * fixed_income["market_cap_usd"].sum() / 10000.0
+
+    if VOL_FACTOR in sens.index and vol_col in latest.columns:
+        # Same 1-day VaR proxy (vol x NAV) and loss sign as volatility_shock_impact
+        sens[VOL_FACTOR] = -nav_last
+
+    return sens
+
+
+def factor_conditional_shock_impact(
+    df: pd.DataFrame,
+    factor_returns: pd.DataFrame,
+    shocks: Dict[str, float],
+    nav_series: pd.Series,
+    sector_col: str = "sector",
+    vol_col: str = "volatility_30d",
+    duration_col: Optional[str] = None,
+    duration_map: Optional[Dict[str, float]] = None,
+    default_duration: float = 5.0,
+    lookback: Optional[int] = None,
+    as_of=None,
+    cache_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Estimate impact of shocks on a subset of factors (sectors, `rates_bps`, `vol`)
+    propagated to the remaining factors through their conditional expectation
+    under the historical covariance, applied to the latest exposures.
+    """
+    result = {"shock": "conditional", "shocks": dict(shocks)}
+
+    if factor_returns is None or factor_returns.empty:
+        result.update({"impact_usd": None, "impact_pct": None, "status": "no factor history"})
+        return result
+
+    unknown = [f for f in shocks if f not in factor_returns.columns]
+    if unknown:
+        result.update({"impact_usd": None, "impact_pct": None, "status": f"unknown factors: {unknown}"})
+        return result
+
+    last_date = df["date"].max() if as_of is None else as_of
+    latest = df[df["date"] == last_date]
+
+    if latest.empty:
+        result.update({"impact_usd": None, "impact_pct": None, "status": "no data"})
+        return result
+
+    entry = factor_covariance(factor_returns, last_date, lookback, cache_key)
+    full_shock = conditional_factor_shock(entry, shocks)
+
+    nav_last = nav_series.get(last_date, nav_series.iloc[-1])
+    sens = factor_sensitivities(
+        latest, entry["factors"], nav_last, sector_col, vol_col,
+        duration_col, duration_map or {}, default_duration,
+    )
+
+    impact_by_factor = sens * full_shock
+    impact_usd = float(impact_by_factor.sum())
+    impact_pct = impact_usd / nav_last if nav_last else None
+
+    result.update({
+        "impact_usd": impact_usd,
+        "impact_pct": float(impact_pct) if impact_pct is not None else None,
+        "full_shock": {k: float(v) for k, v in full_shock.items()},
+        "impact_by_factor": {k: float(v) for k, v in impact_by_factor.items()},
+        "n_obs": entry["n_obs"],
+        "nav": float(nav_last),
+        "status": "ok"
+    })
+    return result
+
+
+# ---------------------------------
+# Scenario Dispatch
+# ---------------------------------
+def run_stress_scenario(
+    df: pd.DataFrame,
+    scenario: Dict[str, Any],
+    nav_series: pd.Series,
+    config: Dict[str, Any],
+    factor_returns: Optional[pd.DataFrame] = None,
+    as_of=None
+) -> Optional[Dict[str, Any]]:
+    """
+    Run one configured stress scenario (sector / rates / vol / conditional).
+    Returns the scenario result dict, or None for unknown scenario types.
+    """
+    s = scenario
+    if s["type"] == "sector":
+        return sector_shock_impact(
+            df,
+            s["sector_col"],
+            s["target_sector"],
+            s["shock_pct"],
+            nav_series,
+        )
+    elif s["type"] == "rates":
+        return rates_shock_impact(
+            df,
+            s["delta_bps"],
+            s["proxy_duration_col"],
+            nav_series,
+            config["mappings"]["duration_from_credit_rating"],
+            config["mappings"]["default_duration"],
+        )
+    elif s["type"] == "vol":
+        return volatility_shock_impact(
+            df,
+            s["vol_col"],
+            s["vol_mult"],
+            nav_series,
+        )
+    elif s["type"] == "conditional":
+        return factor_conditional_shock_impact(
+            df,
+            factor_returns,
+            s["shocks"],
+            nav_series,
+            sector_col=s.get("sector_col", "sector"),
+            vol_col=s.get("vol_col", "volatility_30d"),
+            duration_col=s.get("proxy_duration_col"),
+            duration_map=config["mappings"]["duration_from_credit_rating"],
+            default_duration=config["mappings"]["default_duration"],
+            lookback=s.get("lookback"),
+            as_of=as_of,
+            cache_key=config.get("book"),
+        )
+    return None
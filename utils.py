@@ -4,24 +4,157 @@ Handles configuration, hashing, Git commit tracking, and directory setup.
 """
 
 import os
+import mmap
+import zlib
 import hashlib
+import time
 import subprocess
-import yaml
+from pathlib import Path
+
+# yaml, sqlite3 and concurrent.futures are imported on first use to keep CLI start-up lean
+
+
+# Files at or above this size are hashed through mmap, smaller ones via a large buffer
+_MMAP_THRESHOLD = 64 * 1024 * 1024
+_READ_BUFFER = 8 * 1024 * 1024
+# Coarsest common file-system timestamp resolution (FAT: 2 s); younger mtimes are not trusted
+_MTIME_GRANULARITY_NS = 2 * 1_000_000_000
 
 
 def load_config(path: str) -> dict:
     """Load YAML configuration file."""
+    import yaml
     with open(path, "r") as f:
         return yaml.safe_load(f)
 
 
-def sha256(path: str) -> str:
-    """Compute SHA256 hash of a file for audit snapshots."""
-    h = hashlib.sha256()
+def _hash_file(path: str, h):
+    """Feed a file into a hash object using mmap for large files, big buffered reads otherwise."""
+    size = os.path.getsize(path)
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
+        if size >= _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    for start in range(0, size, _READ_BUFFER):
+                        h.update(view[start:start + _READ_BUFFER])
+                finally:
+                    view.release()
+        else:
+            buf = bytearray(_READ_BUFFER)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                h.update(view[:n])
+    return h
+
+
+class _Crc32:
+    """hashlib-style wrapper around zlib.crc32."""
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return f"{self.value:08x}"
+
+
+def quick_checksum(path: str) -> str:
+    """
+    Fast non-cryptographic checksum of a file (xxh3_64 if the xxhash package is
+    installed, else CRC32). Used to skip SHA256 for files that were touched but not changed.
+    """
+    try:
+        import xxhash
+        h = xxhash.xxh3_64()
+    except ImportError:
+        h = _Crc32()
+    return _hash_file(path, h).hexdigest()
+
+
+def _fingerprint_db(db_path):
+    """Connection to the fingerprint cache at db_path (None if unavailable)."""
+    import sqlite3
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = sqlite3.connect(str(db_path), timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                quick TEXT,
+                sha256 TEXT NOT NULL
+            )
+        """)
+    except (OSError, sqlite3.Error):
+        return None
+    return conn
+
+
+def sha256(path: str, cache_db: str = None, precheck: bool = False) -> str:
+    """
+    Compute SHA256 hash of a file for audit snapshots.
+    With cache_db (a SQLite file, e.g. under the run's output directory), digests
+    are cached by (path, size, mtime_ns, inode), so unchanged inputs cost one stat
+    and one indexed lookup. Files modified within _MTIME_GRANULARITY_NS of now are
+    always hashed and never cached: a write in the same timestamp tick would leave
+    the stat unchanged. With precheck=True, a file whose stat changed but whose
+    quick checksum matches the cached one reuses the digest.
+    """
+    import sqlite3
+    abspath = os.path.abspath(path)
+    st = os.stat(abspath)
+    racy = time.time_ns() - st.st_mtime_ns < _MTIME_GRANULARITY_NS
+    conn = _fingerprint_db(cache_db) if cache_db and not racy else None
+    if conn is None:
+        return _hash_file(abspath, hashlib.sha256()).hexdigest()
+
+    try:
+        try:
+            row = conn.execute(
+                "SELECT size, mtime_ns, inode, quick, sha256 FROM fingerprints WHERE path = ?", (abspath,)
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+
+        if row is not None and tuple(row[:3]) == (st.st_size, st.st_mtime_ns, st.st_ino):
+            return row[4]
+
+        quick = quick_checksum(abspath) if precheck else None
+        if row is not None and quick is not None and row[0] == st.st_size and row[3] == quick:
+            digest = row[4]
+        else:
+            digest = _hash_file(abspath, hashlib.sha256()).hexdigest()
+
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, inode, quick, sha256) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (abspath, st.st_size, st.st_mtime_ns, st.st_ino, quick, digest),
+                )
+        except sqlite3.Error:
+            pass
+        return digest
+    finally:
+        conn.close()
+
+
+def sha256_many(paths, max_workers: int = None, **kwargs) -> dict:
+    """Fingerprint several files concurrently (hashlib releases the GIL on large updates)."""
+    from concurrent.futures import ThreadPoolExecutor
+    paths = [str(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, len(paths) or 1)) as pool:
+        digests = list(pool.map(lambda p: sha256(p, **kwargs), paths))
+    return dict(zip(paths, digests))
 
 
 def try_git_commit_hash():